@@ -11,12 +11,13 @@ Fluxo:
 Usuario → LLM Planejador → Ferramentas → LLM Sintetizador → Resposta
 """
 
+import asyncio
 import json
 from typing import Dict, Any, List, Tuple, Optional
-import ollama
 
 from query_tools import QueryTools
 from embedding_manager import EmbeddingManager
+from ollama_client import OllamaClient
 
 
 class RAGAgent:
@@ -28,7 +29,11 @@ class RAGAgent:
         self,
         embedding_model: str = "mxbai-embed-large",
         generation_model: str = "qwen3:30b",
-        planning_model: str = "qwen3:30b"
+        planning_model: str = "qwen3:30b",
+        vector_backend: str = "chroma",
+        shard_by_profile: bool = False,
+        fast_search: bool = False,
+        ollama_client: Optional[OllamaClient] = None
     ):
         """
         Inicializa o agente RAG.
@@ -37,11 +42,24 @@ class RAGAgent:
             embedding_model: Modelo para embeddings
             generation_model: Modelo para gerar resposta final
             planning_model: Modelo para planejar ações (pode ser menor/mais rápido)
+            vector_backend: Banco vetorial: "chroma" ou "numpy" (ver vector_store.py)
+            shard_by_profile: Se True, uma coleção por perfil (ver sharded_collection.py)
+            fast_search: Se True, buscas semânticas usam os vetores truncados
+                (EmbeddingManager.search(fast=True)), quando a coleção os tiver
+            ollama_client: Cliente Ollama compartilhado (ver ollama_client.py);
+                padrão: cliente compartilhado do processo
         """
-        self.embedding_manager = EmbeddingManager(embedding_model=embedding_model)
+        self.embedding_manager = EmbeddingManager(
+            embedding_model=embedding_model,
+            vector_backend=vector_backend,
+            shard_by_profile=shard_by_profile,
+            ollama_client=ollama_client
+        )
+        self.ollama_client = self.embedding_manager.ollama_client
         self.query_tools = QueryTools(self.embedding_manager, llm_model=generation_model)
         self.generation_model = generation_model
         self.planning_model = planning_model
+        self.fast_search = fast_search
         
         print(f"✓ Agente RAG inicializado")
         print(f"  - Modelo de planejamento: {planning_model}")
@@ -118,6 +136,12 @@ class RAGAgent:
    - Exemplo: {"tool": "semantic_search", "query": "HUAP hospital atendimento saúde", "n_results": 8}
    - IMPORTANTE: Reformule a query do usuário para termos mais específicos e relevantes
 
+12. **search_comments**
+   - Uso: Buscar nos COMENTÁRIOS do público (alunos, servidores, seguidores), não no texto dos posts
+   - Quando usar: "o que os alunos dizem sobre X", "como o público reagiu a Y", "reclamações sobre Z"
+   - Parâmetros: query (str), limit (int, default=10), profile (str, opcional - perfil dos posts comentados)
+   - Exemplo: {"tool": "search_comments", "query": "bandejão preço comida restaurante universitário", "limit": 15}
+
 ## PERFIS DISPONÍVEIS:
 - dceuff (Diretório Central dos Estudantes)
 - reitor (Reitor da UFF)
@@ -132,6 +156,9 @@ class RAGAgent:
 ✅ TEMPORAL + CONTEÚDO: "o que foi dito em 2024 sobre X"
 ✅ Contexto específico: "última aparição pública", "pronunciamento sobre"
 
+### Use SEARCH_COMMENTS quando:
+✅ Pergunta sobre a OPINIÃO DO PÚBLICO: "o que os estudantes falam de X", "reação nos comentários"
+
 ### Use FERRAMENTAS ESTRUTURADAS quando:
 ✅ RANKING MAIORES: "mais curtidos", "top 10", "maior engajamento"
 ✅ RANKING MENORES: "menos curtidos", "posts com menos comentários", "menor engajamento" (use get_bottom_*)
@@ -167,6 +194,50 @@ class RAGAgent:
         Returns:
             Lista de ações (ferramentas) a executar
         """
+        try:
+            # Chama o LLM para planejar
+            response = self.ollama_client.chat(
+                model=self.planning_model,
+                messages=self._planning_messages(user_question, profile_filter),
+                format='json'  # Força saída em JSON
+            )
+            return self._parse_plan(response['message']['content'])
+        
+        except Exception as e:
+            return self._fallback_plan(user_question, profile_filter, e)
+            
+    async def _aplan_action(
+        self,
+        user_question: str,
+        profile_filter: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Versão assíncrona de _plan_action."""
+        try:
+            response = await self.ollama_client.achat(
+                model=self.planning_model,
+                messages=self._planning_messages(user_question, profile_filter),
+                format='json'
+            )
+            return self._parse_plan(response['message']['content'])
+        
+        except Exception as e:
+            return self._fallback_plan(user_question, profile_filter, e)
+            
+    def _planning_messages(
+        self,
+        user_question: str,
+        profile_filter: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Monta as mensagens do planejamento (ferramentas, contexto e exemplos).
+        
+        Args:
+            user_question: Pergunta do usuário
+            profile_filter: Filtro de perfil (opcional)
+            
+        Returns:
+            Mensagens para o LLM planejador
+        """
         tools_desc = self._create_tools_description()
         
         planning_prompt = f"""{tools_desc}
@@ -268,54 +339,60 @@ IMPORTANTE:
 - Retorne APENAS o JSON, nada mais!
 """
 
-        try:
-            # Chama o LLM para planejar
-            response = ollama.chat(
-                model=self.planning_model,
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': 'Você é um planejador especializado em análise de dados do Instagram. Retorne APENAS JSON válido, sem markdown ou texto adicional.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': planning_prompt
-                    }
-                ],
-                format='json'  # Força saída em JSON
-            )
-            
-            # Parse da resposta
-            plan_text = response['message']['content']
-            
-            # Tenta parsear o JSON
-            try:
-                plan = json.loads(plan_text)
-            except json.JSONDecodeError:
-                # Se falhar, tenta extrair JSON do texto
-                import re
-                json_match = re.search(r'\{.*\}', plan_text, re.DOTALL)
-                if json_match:
-                    plan = json.loads(json_match.group())
-                else:
-                    raise ValueError("LLM não retornou JSON válido")
-            
-            print(f"\n🤔 Raciocínio do agente: {plan.get('reasoning', 'N/A')}")
-            print(f"🔧 Ações planejadas: {len(plan.get('actions', []))} ferramenta(s)")
-            
-            return plan.get('actions', [])
+        return [
+            {
+                'role': 'system',
+                'content': 'Você é um planejador especializado em análise de dados do Instagram. Retorne APENAS JSON válido, sem markdown ou texto adicional.'
+            },
+            {
+                'role': 'user',
+                'content': planning_prompt
+            }
+        ]
+        
+    def _parse_plan(self, plan_text: str) -> List[Dict[str, Any]]:
+        """
+        Extrai as ações da resposta do planejador.
+        
+        Args:
+            plan_text: Resposta do LLM (JSON, possivelmente com texto em volta)
             
-        except Exception as e:
-            print(f"⚠️ Erro no planejamento: {e}")
-            # Fallback: busca semântica simples
-            return [{
-                'tool': 'semantic_search',
-                'params': {
-                    'query': user_question,
-                    'n_results': 5,
-                    'profile': profile_filter
-                }
-            }]
+        Returns:
+            Lista de ações (ferramentas) a executar
+        """
+        # Tenta parsear o JSON
+        try:
+            plan = json.loads(plan_text)
+        except json.JSONDecodeError:
+            # Se falhar, tenta extrair JSON do texto
+            import re
+            json_match = re.search(r'\{.*\}', plan_text, re.DOTALL)
+            if json_match:
+                plan = json.loads(json_match.group())
+            else:
+                raise ValueError("LLM não retornou JSON válido")
+        
+        print(f"\n🤔 Raciocínio do agente: {plan.get('reasoning', 'N/A')}")
+        print(f"🔧 Ações planejadas: {len(plan.get('actions', []))} ferramenta(s)")
+        
+        return plan.get('actions', [])
+        
+    def _fallback_plan(
+        self,
+        user_question: str,
+        profile_filter: Optional[str],
+        error: Exception
+    ) -> List[Dict[str, Any]]:
+        """Plano usado quando o planejamento falha: busca semântica simples."""
+        print(f"⚠️ Erro no planejamento: {error}")
+        return [{
+            'tool': 'semantic_search',
+            'params': {
+                'query': user_question,
+                'n_results': 5,
+                'profile': profile_filter
+            }
+        }]
     
     def _execute_action(
         self,
@@ -399,6 +476,14 @@ IMPORTANTE:
                 )
                 return [{'metadata': result, 'is_sentiment': True}]
             
+            elif tool == 'search_comments':
+                return self.query_tools.search_comments(
+                    query=params.get('query', ''),
+                    limit=params.get('limit', 10),
+                    profile=params.get('profile'),
+                    fast=self.fast_search
+                )
+            
             elif tool == 'semantic_search':
                 query = params.get('query', '')
                 n_results = params.get('n_results', 5)
@@ -408,23 +493,12 @@ IMPORTANTE:
                 raw_results = self.embedding_manager.search(
                     query=query,
                     n_results=n_results,
-                    profile_filter=profile
+                    profile_filter=profile,
+                    fast=self.fast_search
                 )
                 
                 # Converte para formato padrão (lista de dicts)
-                if not raw_results or 'ids' not in raw_results or not raw_results['ids']:
-                    return []
-                
-                formatted_results = []
-                for i in range(len(raw_results['ids'][0])):
-                    formatted_results.append({
-                        'id': raw_results['ids'][0][i],
-                        'metadata': raw_results['metadatas'][0][i],
-                        'document': raw_results['documents'][0][i],
-                        'distance': raw_results['distances'][0][i] if 'distances' in raw_results else None
-                    })
-                
-                return formatted_results
+                return self._format_search_results(raw_results)
             
             else:
                 print(f"⚠️ Ferramenta desconhecida: {tool}")
@@ -433,6 +507,99 @@ IMPORTANTE:
         except Exception as e:
             print(f"❌ Erro ao executar {tool}: {e}")
             return []
+            
+    async def _aexecute_action(
+        self,
+        action: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Versão assíncrona de _execute_action.
+        
+        semantic_search usa EmbeddingManager.asearch; as ferramentas
+        estruturadas (leituras da coleção e, em analyze_sentiment, uma chamada
+        ao LLM) rodam em uma thread com asyncio.to_thread.
+        
+        Args:
+            action: Dicionário com tool e params
+            
+        Returns:
+            Resultados da ferramenta
+        """
+        if action.get('tool') != 'semantic_search':
+            return await asyncio.to_thread(self._execute_action, action)
+        
+        params = action.get('params', {})
+        print(f"  ⚙️ Executando: semantic_search com params {params}")
+        try:
+            raw_results = await self.embedding_manager.asearch(
+                query=params.get('query', ''),
+                n_results=params.get('n_results', 5),
+                profile_filter=params.get('profile'),
+                fast=self.fast_search
+            )
+        except Exception as e:
+            print(f"❌ Erro ao executar semantic_search: {e}")
+            return []
+        return self._format_search_results(raw_results)
+            
+    def _format_search_results(self, raw_results: Dict[str, Any], index: int = 0) -> List[Dict[str, Any]]:
+        """
+        Converte uma busca de um resultado de collection.query em lista de dicts.
+        
+        Args:
+            raw_results: Resultado de EmbeddingManager.search ou search_many
+            index: Posição da busca no resultado
+            
+        Returns:
+            Lista de posts com id, metadados, documento e distância
+        """
+        if not raw_results or 'ids' not in raw_results or len(raw_results['ids']) <= index:
+            return []
+        
+        distances = raw_results.get('distances')
+        formatted_results = []
+        for i in range(len(raw_results['ids'][index])):
+            formatted_results.append({
+                'id': raw_results['ids'][index][i],
+                'metadata': raw_results['metadatas'][index][i],
+                'document': raw_results['documents'][index][i],
+                'distance': distances[index][i] if distances else None
+            })
+        
+        return formatted_results
+        
+    def _run_semantic_searches(self, actions: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Executa juntas todas as ações semantic_search do plano (EmbeddingManager.search_many).
+        
+        Args:
+            actions: Ações planejadas
+            
+        Returns:
+            Dicionário posição da ação -> resultados formatados (vazio se
+            houver menos de duas buscas ou se a busca em lote falhar)
+        """
+        positions = [i for i, action in enumerate(actions) if action.get('tool') == 'semantic_search']
+        if len(positions) < 2:
+            return {}
+        
+        params = [actions[i].get('params', {}) for i in positions]
+        try:
+            raw_results = self.embedding_manager.search_many(
+                queries=[p.get('query', '') for p in params],
+                n_results=max(p.get('n_results', 5) for p in params),
+                filters=[p.get('profile') for p in params],
+                fast=self.fast_search
+            )
+        except Exception as e:
+            print(f"⚠️ Erro nas buscas em lote, executando uma a uma: {e}")
+            return {}
+        
+        print(f"🔎 {len(positions)} buscas semânticas executadas em lote")
+        return {
+            i: self._format_search_results(raw_results, j)[:p.get('n_results', 5)]
+            for j, (i, p) in enumerate(zip(positions, params))
+        }
     
     def _format_results_for_llm(
         self,
@@ -568,6 +735,18 @@ IMPORTANTE:
             
             return text
         
+        # Verifica se são comentários
+        if results[0].get('is_comment'):
+            text = f"## Comentários encontrados ({tool_name}):\n\n"
+            for i, comment in enumerate(results[:20], 1):
+                meta = comment.get('metadata', {})
+                text += f"**Comentário {i}** (@{meta.get('owner', 'anônimo')} em post de @{meta.get('profile', 'unknown')})\n"
+                text += f"- Data: {meta.get('timestamp', 'N/A')[:10]}\n"
+                text += f"- Curtidas: {meta.get('likesCount', 0)}\n"
+                text += f"- Post: {meta.get('post_url', 'N/A')}\n"
+                text += f"- Texto: {comment.get('document', '')[:300]}\n\n"
+            return text
+        
         # Posts regulares
         text = f"## Resultados de {tool_name}:\n\n"
         for i, post in enumerate(results[:10], 1):
@@ -607,6 +786,64 @@ IMPORTANTE:
         Returns:
             Resposta final sintetizada
         """
+        try:
+            response = self.ollama_client.chat(
+                model=self.generation_model,
+                messages=self._synthesis_messages(user_question, all_results),
+                stream=stream
+            )
+            
+            if stream:
+                return response
+            else:
+                return response['message']['content']
+        
+        except Exception as e:
+            return f"❌ Erro ao gerar resposta: {e}"
+            
+    async def _asynthesize_response(
+        self,
+        user_question: str,
+        all_results: List[Tuple[str, List[Dict[str, Any]]]],
+        stream: bool = False
+    ):
+        """
+        Versão assíncrona de _synthesize_response.
+        
+        Returns:
+            Resposta final sintetizada (com stream, um iterador assíncrono de
+            pedaços da resposta)
+        """
+        try:
+            response = await self.ollama_client.achat(
+                model=self.generation_model,
+                messages=self._synthesis_messages(user_question, all_results),
+                stream=stream
+            )
+            
+            if stream:
+                return response
+            else:
+                return response['message']['content']
+        
+        except Exception as e:
+            return f"❌ Erro ao gerar resposta: {e}"
+            
+    def _synthesis_messages(
+        self,
+        user_question: str,
+        all_results: List[Tuple[str, List[Dict[str, Any]]]]
+    ) -> List[Dict[str, str]]:
+        """
+        Monta as mensagens da síntese (resultados das ferramentas e diretrizes).
+        
+        Args:
+            user_question: Pergunta original do usuário
+            all_results: Lista de (nome_ferramenta, resultados)
+            
+        Returns:
+            Mensagens para o LLM sintetizador
+        """
         # Monta contexto com todos os resultados
         context = ""
         for tool_name, results in all_results:
@@ -633,29 +870,16 @@ DIRETRIZES:
 NÃO invente informações que não estão no contexto!
 """
 
-        try:
-            response = ollama.chat(
-                model=self.generation_model,
-                messages=[
-                    {
-                        'role': 'system',
-                        'content': 'Você é um assistente especializado em análise de posts do Instagram da UFF. Responda de forma clara, objetiva e bem formatada.'
-                    },
-                    {
-                        'role': 'user',
-                        'content': synthesis_prompt
-                    }
-                ],
-                stream=stream
-            )
-            
-            if stream:
-                return response
-            else:
-                return response['message']['content']
-        
-        except Exception as e:
-            return f"❌ Erro ao gerar resposta: {e}"
+        return [
+            {
+                'role': 'system',
+                'content': 'Você é um assistente especializado em análise de posts do Instagram da UFF. Responda de forma clara, objetiva e bem formatada.'
+            },
+            {
+                'role': 'user',
+                'content': synthesis_prompt
+            }
+        ]
     
     def query(
         self,
@@ -697,9 +921,16 @@ NÃO invente informações que não estão no contexto!
         all_results = []
         all_posts = []
         
+        # Buscas semânticas do plano: embedadas e consultadas de uma vez
+        prefetched = self._run_semantic_searches(actions)
+        
         for i, action in enumerate(actions, 1):
             print(f"\n  Ação {i}/{len(actions)}:")
-            results = self._execute_action(action)
+            if i - 1 in prefetched:
+                print(f"  ⚙️ Executando: semantic_search com params {action.get('params', {})} (lote)")
+                results = prefetched[i - 1]
+            else:
+                results = self._execute_action(action)
             
             if results:
                 tool_name = action.get('tool', 'unknown')
@@ -724,6 +955,72 @@ NÃO invente informações que não estão no contexto!
         print(f"{'='*60}\n")
         
         return response, all_posts
+        
+    async def aquery(
+        self,
+        question: str,
+        profile_filter: Optional[str] = None,
+        stream: bool = False
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        """
+        Versão assíncrona de query.
+        
+        Planejamento e síntese usam o cliente assíncrono do Ollama, e as ações
+        do plano são executadas concorrentemente (asyncio.gather): as buscas
+        semânticas são aguardadas juntas, em vez de uma após a outra. Várias
+        consultas podem ser atendidas no mesmo event loop.
+        
+        Args:
+            question: Pergunta do usuário
+            profile_filter: Filtro de perfil (opcional)
+            stream: Streaming da resposta (iterador assíncrono de pedaços)
+            
+        Returns:
+            Tupla (resposta, todos_os_posts_recuperados)
+        """
+        print(f"\n{'='*60}")
+        print(f"🎯 Nova consulta: {question}")
+        if profile_filter:
+            print(f"👤 Perfil: {profile_filter}")
+        print(f"{'='*60}\n")
+        
+        # Fase 1: Planejamento
+        print("📋 Fase 1: Planejamento de ações...")
+        actions = await self._aplan_action(question, profile_filter)
+        
+        if not actions:
+            return "Não consegui determinar como responder sua pergunta. Tente reformular.", []
+        
+        # Fase 2: Execução (todas as ações ao mesmo tempo)
+        print(f"\n⚙️ Fase 2: Executando {len(actions)} ação(ões)...")
+        action_results = await asyncio.gather(*(self._aexecute_action(action) for action in actions))
+        
+        all_results = []
+        all_posts = []
+        for i, (action, results) in enumerate(zip(actions, action_results), 1):
+            tool_name = action.get('tool', 'unknown')
+            if results:
+                all_results.append((tool_name, results))
+                all_posts.extend(results)
+                print(f"  ✓ Ação {i}/{len(actions)} ({tool_name}): {len(results)} resultado(s) obtido(s)")
+            else:
+                print(f"  ⚠️ Ação {i}/{len(actions)} ({tool_name}): nenhum resultado")
+        
+        if not all_results:
+            return "Não encontrei informações relevantes para sua pergunta.", []
+        
+        # Fase 3: Síntese
+        print(f"\n🎨 Fase 3: Sintetizando resposta final...")
+        response = await self._asynthesize_response(
+            user_question=question,
+            all_results=all_results,
+            stream=stream
+        )
+        
+        print(f"\n✓ Resposta gerada!")
+        print(f"{'='*60}\n")
+        
+        return response, all_posts
 
 
 if __name__ == "__main__":
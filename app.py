@@ -3,9 +3,12 @@ Aplicação Gradio para Chat RAG de Posts do Instagram.
 Agora usando sistema de agente inteligente!
 """
 
+import asyncio
 import gradio as gr
 from agent_system import RAGAgent
 from rag_system import RAGSystem
+from data_loader import parse_iso_timestamp
+from ollama_client import OllamaClient
 from datetime import datetime
 from typing import List, Tuple
 import json
@@ -18,7 +21,10 @@ class InstagramRAGApp:
         self,
         embedding_model: str = "mxbai-embed-large",
         generation_model: str = "qwen3:30b",
-        use_agent: bool = True
+        use_agent: bool = True,
+        vector_backend: str = "chroma",
+        shard_by_profile: bool = False,
+        keep_alive: str = "30m"
     ):
         """
         Inicializa a aplicação.
@@ -27,18 +33,29 @@ class InstagramRAGApp:
             embedding_model: Modelo para embeddings
             generation_model: Modelo para geração
             use_agent: Se True, usa sistema de agente (recomendado)
+            vector_backend: Banco vetorial: "chroma" ou "numpy" (ver vector_store.py)
+            shard_by_profile: Se True, uma coleção por perfil (ver sharded_collection.py)
+            keep_alive: Tempo que o Ollama mantém os modelos carregados entre consultas
         """
         print("🚀 Iniciando aplicação RAG...")
         
         self.use_agent = use_agent
         
+        # Um cliente Ollama para todos os componentes; os modelos já começam a carregar
+        self.ollama_client = OllamaClient(keep_alive=keep_alive)
+        self.ollama_client.preload(chat_models=[generation_model], embedding_models=[embedding_model])
+        
         if use_agent:
             # Inicializa sistema de agente inteligente
             print("🤖 Modo: Agente Inteligente (LLM decide quais ferramentas usar)")
             self.agent = RAGAgent(
                 embedding_model=embedding_model,
                 generation_model=generation_model,
-                planning_model=generation_model  # Pode usar modelo mais leve aqui
+                planning_model=generation_model,  # Pode usar modelo mais leve aqui
+                vector_backend=vector_backend,
+                shard_by_profile=shard_by_profile,
+                ollama_client=self.ollama_client,
+                fast_search=True  # Interface: busca rápida nos vetores truncados, se existirem
             )
             # Mantém referência ao embedding_manager para stats
             self.embedding_manager = self.agent.embedding_manager
@@ -47,7 +64,11 @@ class InstagramRAGApp:
             print("🔧 Modo: Sistema Clássico (detecção por palavras-chave)")
             self.rag = RAGSystem(
                 embedding_model=embedding_model,
-                generation_model=generation_model
+                generation_model=generation_model,
+                vector_backend=vector_backend,
+                shard_by_profile=shard_by_profile,
+                ollama_client=self.ollama_client,
+                fast_search=True
             )
             self.embedding_manager = self.rag.embedding_manager
         
@@ -62,7 +83,7 @@ class InstagramRAGApp:
             em_stats = self.embedding_manager.get_stats()
             # Adapta estrutura para compatibilidade
             self.stats = {
-                'indexed_posts': em_stats.get('total_documents', 0),
+                'indexed_posts': em_stats.get('total_posts', 0),
                 'profiles': em_stats.get('profiles', []),
                 'embedding_model': em_stats.get('embedding_model', 'unknown'),
                 'collection_name': em_stats.get('collection_name', 'unknown')
@@ -149,12 +170,8 @@ class InstagramRAGApp:
                     doc = post.get('document', '')
                     
                     # Parse data
-                    try:
-                        from dateutil import parser as date_parser
-                        timestamp = date_parser.parse(metadata['timestamp'])
-                        date_str = timestamp.strftime('%d/%m/%Y às %H:%M')
-                    except:
-                        date_str = "Data não disponível"
+                    timestamp = parse_iso_timestamp(metadata.get('timestamp'))
+                    date_str = timestamp.strftime('%d/%m/%Y às %H:%M') if timestamp else "Data não disponível"
                     
                     # Formata caption/documento
                     caption = doc if doc else metadata.get('caption', 'Sem legenda')
@@ -334,12 +351,8 @@ class InstagramRAGApp:
                 continue
             
             # Parse data
-            try:
-                from dateutil import parser as date_parser
-                timestamp = date_parser.parse(metadata['timestamp'])
-                date_str = timestamp.strftime('%d/%m/%Y às %H:%M')
-            except:
-                date_str = "Data não disponível"
+            timestamp = parse_iso_timestamp(metadata.get('timestamp'))
+            date_str = timestamp.strftime('%d/%m/%Y às %H:%M') if timestamp else "Data não disponível"
             
             # Formata caption
             caption = metadata.get('caption', 'Sem legenda')
@@ -456,7 +469,43 @@ class InstagramRAGApp:
         sources_html = self.format_sources(posts)
         
         return response, sources_html
-    
+        
+    async def achat_response(
+        self,
+        message: str,
+        history: List[Tuple[str, str]],
+        n_results: int,
+        profile_filter: str
+    ) -> Tuple[str, str]:
+        """
+        Versão assíncrona de chat_response, usada pela interface.
+        
+        No modo agente, a consulta é aguardada no event loop do Gradio
+        (RAGAgent.aquery), sem ocupar uma thread do pool enquanto espera o
+        Ollama; o modo clássico roda em uma thread (asyncio.to_thread).
+        
+        Args:
+            message: Mensagem do usuário
+            history: Histórico do chat
+            n_results: Número de posts a recuperar (ignorado no modo agente)
+            profile_filter: Filtro de perfil
+            
+        Returns:
+            Tupla (resposta, fontes_html)
+        """
+        if not self.use_agent:
+            return await asyncio.to_thread(self.chat_response, message, history, n_results, profile_filter)
+        
+        if not message.strip():
+            return "Por favor, faça uma pergunta.", ""
+        
+        profile = profile_filter if profile_filter != "Todos" else None
+        response, posts = await self.agent.aquery(
+            question=message,
+            profile_filter=profile
+        )
+        return response, self.format_sources(posts)
+        
     def get_stats_html(self) -> str:
         """
         Retorna HTML com estatísticas do sistema.
@@ -631,7 +680,7 @@ class InstagramRAGApp:
                         )
             
             # Lógica do chat
-            def respond(message, chat_history, n_res, profile_filt):
+            async def respond(message, chat_history, n_res, profile_filt):
                 if not message.strip():
                     return message, chat_history, ""
                 
@@ -642,7 +691,7 @@ class InstagramRAGApp:
                     profile = profile_filt.replace("@", "")
                 
                 # Gera resposta
-                response, sources_html = self.chat_response(
+                response, sources_html = await self.achat_response(
                     message, 
                     chat_history, 
                     n_res, 
@@ -715,6 +764,22 @@ def main():
         default="qwen3:30b",
         help="Modelo Ollama para geração de respostas"
     )
+    parser.add_argument(
+        "--vector-backend",
+        choices=["chroma", "numpy"],
+        default="chroma",
+        help="Banco vetorial: ChromaDB ou busca exata em NumPy"
+    )
+    parser.add_argument(
+        "--shard-by-profile",
+        action="store_true",
+        help="Usa o índice com uma coleção por perfil (criado com index_posts.py --shard-by-profile)"
+    )
+    parser.add_argument(
+        "--keep-alive",
+        default="30m",
+        help="Tempo que o Ollama mantém os modelos carregados entre consultas (ex: 30m, 2h, -1 = sempre)"
+    )
     parser.add_argument(
         "--share",
         action="store_true",
@@ -732,7 +797,10 @@ def main():
     # Inicializa aplicação
     app = InstagramRAGApp(
         embedding_model=args.embedding_model,
-        generation_model=args.generation_model
+        generation_model=args.generation_model,
+        vector_backend=args.vector_backend,
+        shard_by_profile=args.shard_by_profile,
+        keep_alive=args.keep_alive
     )
     
     # Lança interface
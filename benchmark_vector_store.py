@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos backends vetoriais: ChromaDB (HNSW + SQLite) x NumPy (busca exata).
+
+Usa vetores sintéticos (não precisa do Ollama) e coleções em diretórios
+temporários. Mede tempo de gravação, tempo de abertura (recarregar do disco),
+latência das buscas com e sem filtro de perfil e o recall@k do ChromaDB em
+relação à busca exata.
+
+Uso:
+    uv run python benchmark_vector_store.py
+    uv run python benchmark_vector_store.py --docs 100000 --dim 1024 --queries 200
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+from vector_store import NumpyVectorStore
+
+
+def make_corpus(n_docs: int, dim: int, n_profiles: int, seed: int = 42):
+    """
+    Gera vetores e metadados sintéticos.
+    
+    Os vetores formam grupos (um centro por tópico + ruído), como embeddings
+    reais, para que o HNSW não tenha um caso artificialmente fácil.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((64, dim)).astype(np.float32)
+    topics = rng.integers(0, len(centers), n_docs)
+    vectors = centers[topics] + 0.8 * rng.standard_normal((n_docs, dim)).astype(np.float32)
+    
+    ids = [f"post_{i}" for i in range(n_docs)]
+    metadatas = [{'profile': f"perfil_{i % n_profiles}", 'likesCount': int(i % 500)} for i in range(n_docs)]
+    documents = [f"documento {i}" for i in range(n_docs)]
+    return ids, vectors, metadatas, documents
+
+
+def timed_queries(collection, queries: np.ndarray, n_results: int, where=None):
+    """Executa as buscas uma a uma e retorna (latências em ms, ids encontrados)."""
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=[query.tolist()], n_results=n_results, where=where)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(results['ids'][0])
+    return latencies, found
+
+
+def describe(latencies) -> str:
+    """Resumo p50/p95 das latências."""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered):7.2f} ms | p95 {p95:7.2f} ms"
+
+
+def recall(found, expected) -> float:
+    """Fração média dos ids exatos que aparecem no resultado."""
+    hits = [len(set(f) & set(e)) / len(e) for f, e in zip(found, expected) if e]
+    return sum(hits) / len(hits) if hits else 0.0
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Benchmark ChromaDB x NumPy")
+    parser.add_argument("--docs", type=int, default=20000, help="Número de documentos")
+    parser.add_argument("--dim", type=int, default=1024, help="Dimensão dos vetores (mxbai-embed-large: 1024)")
+    parser.add_argument("--profiles", type=int, default=10, help="Número de perfis nos metadados")
+    parser.add_argument("--queries", type=int, default=100, help="Número de buscas")
+    parser.add_argument("--k", type=int, default=10, help="Resultados por busca")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Tamanho do lote de gravação")
+    args = parser.parse_args()
+    
+    print(f"📋 {args.docs} documentos | dim {args.dim} | {args.profiles} perfis | {args.queries} buscas | k={args.k}")
+    ids, vectors, metadatas, documents = make_corpus(args.docs, args.dim, args.profiles)
+    rng = np.random.default_rng(7)
+    queries = vectors[rng.integers(0, args.docs, args.queries)] + 0.5 * rng.standard_normal(
+        (args.queries, args.dim)
+    ).astype(np.float32)
+    where = {'profile': 'perfil_0'}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            'chroma': lambda: chromadb.PersistentClient(path=f"{tmp}/chroma"),
+            'numpy': lambda: NumpyVectorStore(f"{tmp}/numpy"),
+        }
+        results = {}
+        
+        for name, open_client in backends.items():
+            print(f"\n🔄 {name}")
+            client = open_client()
+            collection = client.create_collection(name="benchmark", metadata={"hnsw:space": "cosine"})
+            
+            start = time.perf_counter()
+            for i in range(0, args.docs, args.batch_size):
+                collection.add(
+                    ids=ids[i:i + args.batch_size],
+                    embeddings=vectors[i:i + args.batch_size].tolist(),
+                    metadatas=metadatas[i:i + args.batch_size],
+                    documents=documents[i:i + args.batch_size]
+                )
+            print(f"  Gravação: {time.perf_counter() - start:.2f}s")
+            del collection, client
+            
+            start = time.perf_counter()
+            collection = open_client().get_collection(name="benchmark")
+            collection.query(query_embeddings=[queries[0].tolist()], n_results=args.k)  # aquece
+            print(f"  Abertura + primeira busca: {time.perf_counter() - start:.2f}s")
+            
+            latencies, found = timed_queries(collection, queries, args.k)
+            latencies_where, found_where = timed_queries(collection, queries, args.k, where)
+            print(f"  Busca:             {describe(latencies)}")
+            print(f"  Busca com filtro:  {describe(latencies_where)}")
+            results[name] = (found, found_where)
+        
+        # NumPy é exato: serve de referência para o recall do HNSW
+        exact, exact_where = results['numpy']
+        print(f"\n📊 Recall@{args.k} do ChromaDB (referência: busca exata NumPy)")
+        print(f"  Sem filtro: {recall(results['chroma'][0], exact):.3f}")
+        print(f"  Com filtro: {recall(results['chroma'][1], exact_where):.3f}")
+
+
+if __name__ == "__main__":
+    main()
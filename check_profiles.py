@@ -5,3 +5,8 @@ em = EmbeddingManager()
 stats = em.get_stats()
 print('Perfis encontrados:', stats.get('profiles', []))
 print('Total de documentos:', stats.get('total_documents', 0))
+for profile, profile_stats in stats.get('profile_stats', {}).items():
+    print(
+        f"  {profile}: {profile_stats['posts']} posts ({profile_stats['documents']} documentos) | "
+        f"{profile_stats['first_timestamp'] or '-'} a {profile_stats['last_timestamp'] or '-'}"
+    )
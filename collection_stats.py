@@ -0,0 +1,296 @@
+"""
+Agregados de metadados das coleções (arquivo auxiliar ao banco vetorial).
+
+EmbeddingManager.get_stats precisava ler os metadados de todos os documentos
+para listar os perfis. CollectionStats mantém, em um SQLite ao lado do banco
+vetorial, os totais por perfil (documentos, posts, curtidas, comentários e
+intervalo de datas), atualizados em uma transação a cada gravação, atualização
+ou remoção de documentos. As estatísticas são lidas de poucas linhas,
+independentemente do tamanho da coleção.
+
+Tabelas:
+- documents: perfil, data, curtidas e comentários de cada documento (permite
+  descontar um documento removido ou substituído)
+- profiles: totais por perfil de cada coleção
+- collections: total de documentos de cada coleção; também indica que os
+  agregados foram construídos (coleções indexadas antes deste arquivo são
+  reconstruídas uma vez, ver EmbeddingManager.get_stats)
+
+O banco vetorial e este arquivo não gravam na mesma transação. Antes de cada
+gravação no banco vetorial, begin() registra uma gravação pendente, que
+upsert/delete descontam na transação dos agregados. Se o processo morrer
+entre as duas gravações, a pendência fica registrada e document_count()
+passa a indicar agregados a reconstruir, mesmo que o total de documentos não
+tenha mudado (ex: uma atualização só de metadados).
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class CollectionStats:
+    """Totais por perfil das coleções, mantidos junto com as gravações."""
+    
+    def __init__(self, path: str):
+        """
+        Abre (ou cria) o arquivo de agregados.
+        
+        Args:
+            path: Caminho do arquivo SQLite
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                collection TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                likes INTEGER NOT NULL,
+                comments INTEGER NOT NULL,
+                is_chunk INTEGER NOT NULL,
+                PRIMARY KEY (collection, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS documents_profile_timestamp
+                ON documents (collection, profile, timestamp);
+            CREATE TABLE IF NOT EXISTS profiles (
+                collection TEXT NOT NULL,
+                profile TEXT NOT NULL,
+                documents INTEGER NOT NULL,
+                posts INTEGER NOT NULL,
+                likes INTEGER NOT NULL,
+                comments INTEGER NOT NULL,
+                first_timestamp TEXT,
+                last_timestamp TEXT,
+                PRIMARY KEY (collection, profile)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS collections (
+                collection TEXT PRIMARY KEY,
+                documents INTEGER NOT NULL,
+                pending INTEGER NOT NULL DEFAULT 0
+            );
+            """
+        )
+        # Arquivos criados antes da coluna de gravações pendentes
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(collections)")]
+        if 'pending' not in columns:
+            self._conn.execute("ALTER TABLE collections ADD COLUMN pending INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+        
+    @staticmethod
+    def _row(doc_id: str, metadata: Dict[str, Any]) -> tuple:
+        """Colunas de documents a partir dos metadados gravados na coleção."""
+        is_chunk = bool(metadata.get('parent_id'))
+        return (
+            doc_id,
+            metadata.get('profile') or '',
+            metadata.get('timestamp') or '',
+            0 if is_chunk else int(metadata.get('likesCount') or 0),
+            0 if is_chunk else int(metadata.get('commentsCount') or 0),
+            int(is_chunk),
+        )
+        
+    def _apply(self, collection: str, removed_ids: Sequence[str], added: List[tuple]):
+        """
+        Remove e acrescenta documentos, ajustando os totais (chamado com o lock, em transação).
+        
+        Args:
+            collection: Nome da coleção
+            removed_ids: Ids a descontar (inclusive os que serão substituídos)
+            added: Linhas de documents a acrescentar (ver _row)
+        """
+        conn = self._conn
+        conn.execute(
+            "INSERT OR IGNORE INTO collections (collection, documents) VALUES (?, 0)",
+            (collection,)
+        )
+        deltas: Dict[str, List[int]] = {}
+        
+        removed = []
+        for i in range(0, len(removed_ids), 900):
+            chunk = list(removed_ids[i:i + 900])
+            placeholders = ",".join("?" * len(chunk))
+            removed.extend(conn.execute(
+                f"SELECT doc_id, profile, likes, comments, is_chunk FROM documents "
+                f"WHERE collection = ? AND doc_id IN ({placeholders})",
+                [collection, *chunk]
+            ))
+        for doc_id, profile, likes, comments, is_chunk in removed:
+            delta = deltas.setdefault(profile, [0, 0, 0, 0])
+            delta[0] -= 1
+            delta[1] -= 0 if is_chunk else 1
+            delta[2] -= likes
+            delta[3] -= comments
+        conn.executemany(
+            "DELETE FROM documents WHERE collection = ? AND doc_id = ?",
+            [(collection, row[0]) for row in removed]
+        )
+        
+        conn.executemany(
+            "INSERT INTO documents (collection, doc_id, profile, timestamp, likes, comments, is_chunk) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(collection, *row) for row in added]
+        )
+        for _, profile, _, likes, comments, is_chunk in added:
+            delta = deltas.setdefault(profile, [0, 0, 0, 0])
+            delta[0] += 1
+            delta[1] += 0 if is_chunk else 1
+            delta[2] += likes
+            delta[3] += comments
+        
+        for profile, (documents, posts, likes, comments) in deltas.items():
+            conn.execute(
+                "INSERT INTO profiles (collection, profile, documents, posts, likes, comments) "
+                "VALUES (?, ?, 0, 0, 0, 0) ON CONFLICT (collection, profile) DO NOTHING",
+                (collection, profile)
+            )
+            # Datas extremas pelo índice (collection, profile, timestamp)
+            conn.execute(
+                """
+                UPDATE profiles SET
+                    documents = documents + ?, posts = posts + ?,
+                    likes = likes + ?, comments = comments + ?,
+                    first_timestamp = (
+                        SELECT MIN(timestamp) FROM documents
+                        WHERE collection = ? AND profile = ? AND timestamp != ''
+                    ),
+                    last_timestamp = (
+                        SELECT MAX(timestamp) FROM documents
+                        WHERE collection = ? AND profile = ? AND timestamp != ''
+                    )
+                WHERE collection = ? AND profile = ?
+                """,
+                (documents, posts, likes, comments, collection, profile, collection, profile, collection, profile)
+            )
+        conn.execute(
+            "DELETE FROM profiles WHERE collection = ? AND documents <= 0",
+            (collection,)
+        )
+        conn.execute(
+            "UPDATE collections SET documents = documents + ?, pending = MAX(pending - 1, 0) "
+            "WHERE collection = ?",
+            (len(added) - len(removed), collection)
+        )
+        
+    def begin(self, collection: str):
+        """
+        Registra uma gravação pendente, antes de gravar no banco vetorial.
+        
+        A pendência é descontada pelo upsert/delete seguinte; se ele não
+        acontecer, document_count() passa a retornar None.
+        
+        Args:
+            collection: Nome da coleção
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE collections SET pending = pending + 1 WHERE collection = ?",
+                (collection,)
+            )
+            
+    def upsert(self, collection: str, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]):
+        """
+        Registra documentos gravados ou atualizados (substitui os anteriores de mesmo id).
+        
+        Args:
+            collection: Nome da coleção
+            ids: Ids dos documentos
+            metadatas: Metadados gravados, na mesma ordem dos ids
+        """
+        rows = list({doc_id: self._row(doc_id, metadata) for doc_id, metadata in zip(ids, metadatas)}.values())
+        with self._lock, self._conn:
+            self._apply(collection, [row[0] for row in rows], rows)
+            
+    def delete(self, collection: str, ids: Sequence[str]):
+        """
+        Desconta documentos removidos.
+        
+        Args:
+            collection: Nome da coleção
+            ids: Ids removidos (ids desconhecidos são ignorados)
+        """
+        with self._lock, self._conn:
+            self._apply(collection, list(ids), [])
+            
+    def clear(self, collection: str):
+        """Zera os agregados de uma coleção (e a marca como construída, vazia)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents WHERE collection = ?", (collection,))
+            self._conn.execute("DELETE FROM profiles WHERE collection = ?", (collection,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO collections (collection, documents, pending) VALUES (?, 0, 0)",
+                (collection,)
+            )
+            
+    def forget(self, collection: str):
+        """Descarta os agregados de uma coleção (serão reconstruídos)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents WHERE collection = ?", (collection,))
+            self._conn.execute("DELETE FROM profiles WHERE collection = ?", (collection,))
+            self._conn.execute("DELETE FROM collections WHERE collection = ?", (collection,))
+            
+    def document_count(self, collection: str) -> Optional[int]:
+        """
+        Total de documentos registrados.
+        
+        Returns:
+            Total, ou None se os agregados da coleção nunca foram construídos
+            ou se uma gravação foi interrompida (ver begin)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT documents, pending FROM collections WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row and not row[1] else None
+        
+    def summary(self, collection: str) -> Dict[str, Any]:
+        """
+        Totais da coleção e por perfil.
+        
+        Returns:
+            Dicionário com total_documents, total_posts, total_likes,
+            total_comments, date_range (primeira, última) e profile_stats
+            (perfil -> documents, posts, likes, comments, first_timestamp,
+            last_timestamp)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT profile, documents, posts, likes, comments, first_timestamp, last_timestamp "
+                "FROM profiles WHERE collection = ? ORDER BY profile",
+                (collection,)
+            ).fetchall()
+        
+        profile_stats = {
+            profile: {
+                'documents': documents,
+                'posts': posts,
+                'likes': likes,
+                'comments': comments,
+                'first_timestamp': first_timestamp,
+                'last_timestamp': last_timestamp,
+            }
+            for profile, documents, posts, likes, comments, first_timestamp, last_timestamp in rows
+        }
+        firsts = [row[5] for row in rows if row[5]]
+        lasts = [row[6] for row in rows if row[6]]
+        
+        return {
+            'total_documents': sum(row[1] for row in rows),
+            'total_posts': sum(row[2] for row in rows),
+            'total_likes': sum(row[3] for row in rows),
+            'total_comments': sum(row[4] for row in rows),
+            'date_range': (min(firsts), max(lasts)) if firsts else (None, None),
+            'profile_stats': profile_stats,
+        }
+        
+    def close(self):
+        """Fecha a conexão com o SQLite."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,156 @@
+"""
+Fixtures compartilhadas dos testes (pytest).
+
+Os testes que embedam posts ou conversam com um modelo não usam o Ollama: o
+servidor falso (fake_ollama.py) sobe uma vez por sessão em uma porta livre,
+com embeddings determinísticos e sem latência, e os clientes Ollama dos
+componentes (ollama_client.py) são apontados para ele.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+import ollama_client
+from embedding_manager import EmbeddingManager
+from fake_ollama import FakeOllama, make_server
+from ollama_client import OllamaClient
+from rag_system import RAGSystem
+
+
+@pytest.fixture(scope="session")
+def fake_ollama_server():
+    """
+    Servidor falso do Ollama em uma porta livre (um por sessão).
+    
+    Yields:
+        O servidor HTTP; o endereço fica em .host
+    """
+    server = make_server(FakeOllama(dim=64), port=0)
+    thread = threading.Thread(target=server.serve_forever, name="fake-ollama", daemon=True)
+    thread.start()
+    server.host = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fake_ollama(fake_ollama_server, monkeypatch):
+    """
+    Aponta o cliente Ollama compartilhado (ollama_client.default_client) para o servidor falso.
+    
+    Cada teste recebe um FakeOllama novo, então os contadores começam zerados.
+    
+    Returns:
+        O FakeOllama do servidor (contadores em .stats); o endereço fica em .host
+    """
+    fake = FakeOllama(dim=64)
+    fake.host = fake_ollama_server.host
+    fake_ollama_server.fake = fake
+    
+    monkeypatch.setenv('OLLAMA_HOST', fake.host)
+    # O cliente compartilhado do processo guarda o endereço na criação
+    monkeypatch.setattr(ollama_client, "_default_client", None)
+    return fake
+
+
+@pytest.fixture
+def fake_client(fake_ollama):
+    """OllamaClient ligado ao servidor falso (fechado ao fim do teste)."""
+    client = OllamaClient(host=fake_ollama.host)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def make_manager(fake_client, tmp_path):
+    """
+    Fábrica de EmbeddingManager em <tmp_path>/vector_db, com embeddings falsos.
+    
+    Os argumentos passados substituem os padrões (sem cache de embeddings).
+    """
+    def make(**kwargs):
+        kwargs.setdefault('persist_dir', str(tmp_path / "vector_db"))
+        kwargs.setdefault('use_embedding_cache', False)
+        kwargs.setdefault('ollama_client', fake_client)
+        return EmbeddingManager(**kwargs)
+    
+    return make
+
+
+@pytest.fixture
+def make_post():
+    """
+    Fábrica de posts processados (formato de InstagramDataLoader.process_post).
+    
+    Sem texto, o post fala do próprio id e perfil (um embedding distinto por post).
+    """
+    def make(post_id: str, text: str = None, profile: str = "uff", likes: int = 0, day: int = 10) -> dict:
+        if text is None:
+            text = f"post {post_id} de {profile}"
+        return {
+            'id': post_id,
+            'profile': profile,
+            'type': "Image",
+            'text': text,
+            'url': f"https://www.instagram.com/p/{post_id}/",
+            'shortCode': post_id,
+            'timestamp': datetime(2025, 3, day, tzinfo=timezone.utc),
+            'likesCount': likes,
+            'commentsCount': 0,
+            'hashtags': [],
+            'mentions': [],
+            'caption': text,
+        }
+    
+    return make
+
+
+@pytest.fixture
+def write_profile(tmp_path):
+    """
+    Grava o JSON de um perfil em <tmp_path>/data (o diretório de dados dos testes).
+    
+    Regravar um perfil sempre avança o mtime do arquivo, para que caches e
+    checkpoints enxerguem a alteração mesmo em sistemas de arquivos com
+    resolução de tempo baixa.
+    """
+    data_dir = tmp_path / "data"
+    data_dir.mkdir(exist_ok=True)
+    
+    def write(profile: str, posts: list) -> Path:
+        path = data_dir / f"{profile}.json"
+        previous = path.stat().st_mtime_ns if path.exists() else None
+        path.write_text(json.dumps(posts, ensure_ascii=False), encoding='utf-8')
+        if previous is not None and path.stat().st_mtime_ns <= previous:
+            mtime_ns = previous + 1_000_000
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+    
+    return write
+
+
+@pytest.fixture
+def make_rag(fake_client, tmp_path):
+    """
+    Fábrica de RAGSystem sobre <tmp_path>/data (ver write_profile), com embeddings falsos.
+    
+    Os argumentos passados substituem os padrões. Como em make_manager, o
+    cache de embeddings fica desligado: toda chamada de embedding é contada.
+    """
+    def make(**kwargs):
+        kwargs.setdefault('data_dir', str(tmp_path / "data"))
+        kwargs.setdefault('chroma_dir', str(tmp_path / "chroma"))
+        kwargs.setdefault('ollama_client', fake_client)
+        rag = RAGSystem(**kwargs)
+        rag.embedding_manager.embedding_cache = None
+        return rag
+    
+    return make
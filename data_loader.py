@@ -3,25 +3,354 @@ Módulo para carregar e processar posts do Instagram salvos em arquivos JSON.
 """
 
 import json
+import os
 import re
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from datetime import datetime, timezone
 from dateutil import parser as date_parser
 import emoji
 
+from post_cache import PostCache, PostCacheReader, NULL_INT, epoch_us_to_datetime
+
+
+# Padrão de URL usado na limpeza de texto
+_URL_PATTERN = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+
+# URLs e espaços em uma única passada: sequências mistas viram um espaço,
+# URLs isoladas (sem espaço ao redor) simplesmente desaparecem
+_URL_OR_SPACE_RE = re.compile(r'(?:\s+|' + _URL_PATTERN + r')+')
+
+
+def _char_class(chars) -> str:
+    """Monta o conteúdo de uma classe de caracteres regex a partir de um conjunto."""
+    codepoints = sorted(ord(c) for c in chars)
+    parts = []
+    start = prev = codepoints[0]
+    for cp in codepoints[1:] + [None]:
+        if cp is not None and cp == prev + 1:
+            prev = cp
+            continue
+        if start == prev:
+            parts.append(re.escape(chr(start)))
+        else:
+            parts.append(f"{re.escape(chr(start))}-{re.escape(chr(prev))}")
+        if cp is not None:
+            start = prev = cp
+    return "".join(parts)
+
+
+# Todos os codepoints que aparecem em algum emoji conhecido pela biblioteca,
+# mais os seletores de variação (que replace_emoji descarta mesmo isolados).
+# Fora de sequências com ZWJ, um emoji é sempre um trecho contíguo desses
+# caracteres com ao menos um não-ASCII (dígitos, '#' e '*' só em keycaps)
+_EMOJI_CHARS = frozenset(
+    {char for emoji_str in emoji.EMOJI_DATA for char in emoji_str} | {'\ufe0e', '\ufe0f'}
+)
+_EMOJI_FIRST_WIDE = min(ord(c) for c in _EMOJI_CHARS if ord(c) > 0xff)
+_EMOJI_RUN_RE = re.compile(
+    # Pré-filtro barato: a classe completa é grande e lenta de testar em
+    # cada posição, então só é avaliada onde um emoji pode começar
+    f"(?=[#*0-9\u00a9\u00ae{re.escape(chr(_EMOJI_FIRST_WIDE))}-\U0010ffff])"
+    f"[{_char_class(_EMOJI_CHARS)}]*"
+    f"[{_char_class(c for c in _EMOJI_CHARS if ord(c) > 127)}]"
+    f"[{_char_class(_EMOJI_CHARS)}]*"
+)
+_ZWJ = '\u200d'
+
+
+@lru_cache(maxsize=4096)
+def _strip_emoji_run(run: str) -> str:
+    """Remove emojis de um trecho candidato (resultado em cache, trechos se repetem muito)."""
+    return emoji.replace_emoji(run, replace='')
+
+
+def _replace_url_or_space(match: re.Match) -> str:
+    """Substitui uma sequência de URLs/espaços: espaço se havia espaço, senão nada."""
+    chunk = match.group()
+    if chunk.isspace() or any(c.isspace() for c in chunk):
+        return ' '
+    return ''
+
+
+def normalize_text(text: str) -> str:
+    """
+    Remove emojis e URLs e colapsa espaços em branco.
+    
+    Produz exatamente o mesmo resultado que aplicar emoji.replace_emoji seguido
+    das substituições de URL, quebras de linha e espaços, mas só chama a
+    biblioteca de emoji nos trechos que podem conter emoji (com cache) e faz
+    URLs e espaços em uma única passada de regex.
+    
+    Args:
+        text: Texto a ser normalizado
+        
+    Returns:
+        Texto normalizado
+    """
+    if not text:
+        return ""
+    
+    if _ZWJ in text:
+        # O tokenizador da biblioteca volta atrás em sequências com ZWJ, então
+        # o resultado depende do contexto: processa o texto inteiro
+        if _EMOJI_RUN_RE.search(text):
+            text = emoji.replace_emoji(text, replace='')
+    else:
+        text = _EMOJI_RUN_RE.sub(lambda m: _strip_emoji_run(m.group()), text)
+    text = _URL_OR_SPACE_RE.sub(_replace_url_or_space, text)
+    
+    return text.strip()
+
+
+@lru_cache(maxsize=65536)
+def parse_iso_timestamp(value: str) -> Optional[datetime]:
+    """
+    Converte um timestamp (ISO-8601 do Instagram, ex: 2025-09-30T23:12:40.000Z) em datetime.
+    
+    Usa datetime.fromisoformat como caminho rápido e o dateutil apenas para
+    formatos fora do padrão. Datas sem fuso são consideradas UTC e todas são
+    convertidas para UTC, então o resultado sempre pode ser comparado com
+    datetime.now(timezone.utc).
+    Os resultados ficam em cache, pois as consultas re-leem as mesmas strings
+    armazenadas nos metadados.
+    
+    Args:
+        value: String do timestamp
+        
+    Returns:
+        Datetime com fuso horário, ou None se a string não puder ser interpretada
+    """
+    if not value or not isinstance(value, str):
+        return None
+    
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = date_parser.parse(value)
+        except (ValueError, OverflowError):
+            return None
+    
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    
+    return parsed.astimezone(timezone.utc)
+
+
+def iter_json_array(file_path: Path, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Percorre um array JSON de nível superior item a item, sem carregar o arquivo inteiro.
+    
+    Args:
+        file_path: Caminho do arquivo JSON (deve conter um array na raiz)
+        chunk_size: Quantidade de caracteres lidos do disco por vez
+        
+    Yields:
+        Cada elemento do array, já decodificado
+    """
+    decoder = json.JSONDecoder()
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        pos = 0
+        eof = False
+        read_size = chunk_size
+        
+        def fill() -> bool:
+            """Lê mais dados para o buffer. Retorna False no fim do arquivo."""
+            nonlocal buffer, pos, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+        
+        def next_char() -> str:
+            """Pula espaços em branco e retorna o próximo caractere ('' no fim)."""
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not fill():
+                    return ""
+        
+        def check_end():
+            """Depois do ']' final só pode haver espaços em branco (como em json.load)."""
+            nonlocal pos
+            pos += 1
+            if next_char():
+                raise ValueError(f"JSON malformado em {file_path}: conteúdo após o fim do array")
+        
+        if next_char() != '[':
+            raise ValueError(f"Arquivo não contém um array JSON: {file_path}")
+        pos += 1
+        
+        if next_char() == ']':
+            check_end()
+            return
+        
+        while True:
+            if not next_char():
+                raise ValueError(f"JSON truncado em {file_path}")
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # Um valor que termina exatamente no fim do buffer pode estar incompleto
+                if end == len(buffer) and not eof:
+                    raise json.JSONDecodeError("Buffer incompleto", buffer, end)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Item maior que o buffer: lê mais (com leituras crescentes)
+                fill()
+                read_size = min(read_size * 2, 1 << 24)
+                continue
+            
+            read_size = chunk_size
+            pos = end
+            yield item
+            
+            separator = next_char()
+            if separator == ',':
+                pos += 1
+            elif separator == ']':
+                check_end()
+                return
+            else:
+                raise ValueError(f"JSON malformado em {file_path}: esperado ',' ou ']'")
+
+
+# Tipos aceitos para os campos usados no processamento (None = campo ausente)
+_POST_FIELD_TYPES = {
+    'id': (str, int),
+    'type': (str,),
+    'url': (str,),
+    'shortCode': (str,),
+    'caption': (str,),
+    'timestamp': (str,),
+    'likesCount': (int,),
+    'commentsCount': (int,),
+    'hashtags': (list,),
+    'mentions': (list,),
+    'latestComments': (list,),
+}
+
+
+def validate_raw_post(post: Any) -> Optional[str]:
+    """
+    Valida a estrutura de um post bruto antes do processamento.
+    
+    Args:
+        post: Item lido do array JSON do perfil
+        
+    Returns:
+        None se o post for válido, senão o motivo da rejeição
+    """
+    if not isinstance(post, dict):
+        return f"post não é um objeto JSON ({type(post).__name__})"
+    
+    if post.get('id') in (None, ''):
+        return "campo 'id' ausente"
+    
+    for field, types in _POST_FIELD_TYPES.items():
+        value = post.get(field)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, types):
+            return f"campo '{field}' com tipo inválido ({type(value).__name__})"
+    
+    for field in ('hashtags', 'mentions'):
+        if not all(isinstance(item, str) for item in post.get(field) or []):
+            return f"campo '{field}' contém itens que não são texto"
+    
+    for comment in post.get('latestComments') or []:
+        if not isinstance(comment, dict):
+            return "comentário não é um objeto JSON"
+        if comment.get('text') is not None and not isinstance(comment['text'], str):
+            return "comentário com texto inválido"
+    
+    return None
+
+
+def _process_posts_chunk(
+    data_dir: str,
+    profile_name: str,
+    raw_posts: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], float, int, List[Tuple[Any, str]]]:
+    """
+    Processa um lote de posts brutos (executado nos workers do pool de processos).
+    
+    Args:
+        data_dir: Diretório de dados do carregador
+        profile_name: Perfil ao qual os posts pertencem
+        raw_posts: Posts brutos lidos do JSON
+        
+    Returns:
+        Tupla (posts_processados, segundos_de_processamento, timestamps_inválidos,
+        rejeitados), onde rejeitados é uma lista de (post_bruto, motivo) que o
+        processo principal grava na quarentena
+    """
+    loader = InstagramDataLoader(data_dir)
+    start = time.perf_counter()
+    
+    processed = []
+    rejected = []
+    for post in raw_posts:
+        post_data, reason = loader.try_process_post(post, profile_name)
+        if reason is not None:
+            rejected.append((post, reason))
+        elif post_data['text'].strip():
+            processed.append(post_data)
+    
+    return processed, time.perf_counter() - start, loader.invalid_timestamps, rejected
+
 
 class InstagramDataLoader:
     """Classe para carregar e processar dados de posts do Instagram."""
+    
+    # Agregados extras aceitos por get_profile_stats
+    STATS_AGGREGATES = {'by_type', 'by_month'}
 
-    def __init__(self, data_dir: str = "data"):
+    def __init__(
+        self,
+        data_dir: str = "data",
+        cache_dir: Optional[str] = None,
+        quarantine_path: Optional[str] = None
+    ):
         """
         Inicializa o carregador de dados.
         
         Args:
             data_dir: Diretório contendo os arquivos JSON dos posts
+            cache_dir: Diretório do cache colunar de posts processados
+                (ver post_cache.py). None desativa o cache
+            quarantine_path: Arquivo JSONL onde posts rejeitados são gravados
+                com o motivo (padrão: <data_dir>/quarantine.jsonl)
         """
         self.data_dir = Path(data_dir)
+        self.cache = PostCache(cache_dir) if cache_dir else None
+        self.quarantine_path = Path(quarantine_path) if quarantine_path else self.data_dir / "quarantine.jsonl"
+        
+        # Posts cujo timestamp não pôde ser interpretado
+        self.invalid_timestamps = 0
+        
+        # Contadores da última carga: aceitos, sem texto e em quarentena (por motivo)
+        self.ingest_counters = Counter()
+        self.quarantine_reasons = Counter()
+        
+        # Perfis cuja leitura falhou na última carga (dados possivelmente incompletos)
+        self.failed_profiles: set = set()
+        
+        # Tempos por perfil da última carga paralela (ver load_all_posts)
+        self.profile_timings: Dict[str, Dict[str, float]] = {}
         
     def clean_text(self, text: str) -> str:
         """
@@ -33,25 +362,9 @@ class InstagramDataLoader:
         Returns:
             Texto limpo e normalizado
         """
-        if not text:
-            return ""
-        
-        # Remove emojis
-        text = emoji.replace_emoji(text, replace='')
-        
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        
-        # Remove menções (mas mantemos para o metadado)
-        # text = re.sub(r'@\w+', '', text)
-        
-        # Remove múltiplas quebras de linha
-        text = re.sub(r'\n+', ' ', text)
-        
-        # Remove múltiplos espaços
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+        # Emojis, URLs e espaços extras são tratados em passada única
+        # (menções são mantidas no texto; também vão para os metadados)
+        return normalize_text(text)
     
     def extract_post_text(self, post: Dict[str, Any]) -> str:
         """
@@ -88,122 +401,599 @@ class InstagramDataLoader:
         
         return " ".join(text_parts)
     
-    def parse_timestamp(self, timestamp_str: str) -> datetime:
+    def parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
         """
         Converte string de timestamp para objeto datetime.
         
+        Timestamps inválidos não são substituídos pela data atual: retornam None
+        e são contabilizados em self.invalid_timestamps.
+        
         Args:
             timestamp_str: String de timestamp ISO
             
         Returns:
-            Objeto datetime
+            Objeto datetime, ou None se o timestamp for inválido
+        """
+        parsed = parse_iso_timestamp(timestamp_str)
+        if parsed is None:
+            self.invalid_timestamps += 1
+        return parsed
+    
+    def process_post(self, post: Dict[str, Any], profile_name: str) -> Dict[str, Any]:
+        """
+        Converte um post bruto do JSON no formato processado usado na indexação.
+        
+        Args:
+            post: Dicionário bruto do post
+            profile_name: Nome do perfil ao qual o post pertence
+            
+        Returns:
+            Dicionário do post processado
         """
+        return {
+            'id': post.get('id', ''),
+            'profile': profile_name,
+            'type': post.get('type') or 'Unknown',
+            'text': self.extract_post_text(post),
+            'url': post.get('url') or '',
+            'shortCode': post.get('shortCode') or '',
+            'timestamp': self.parse_timestamp(post.get('timestamp', '')),
+            'likesCount': post.get('likesCount', 0),
+            'commentsCount': post.get('commentsCount', 0),
+            'hashtags': post.get('hashtags') or [],
+            'mentions': post.get('mentions') or [],
+            'caption': post.get('caption') or '',
+        }
+    
+    def try_process_post(
+        self,
+        post: Any,
+        profile_name: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Valida e processa um post bruto sem deixar exceções escaparem.
+        
+        Args:
+            post: Item lido do array JSON do perfil
+            profile_name: Nome do perfil ao qual o post pertence
+            
+        Returns:
+            Tupla (post_processado, None) ou (None, motivo_da_rejeição)
+        """
+        reason = validate_raw_post(post)
+        if reason is not None:
+            return None, reason
+        
         try:
-            return date_parser.parse(timestamp_str)
-        except:
-            return datetime.now()
+            return self.process_post(post, profile_name), None
+        except Exception as e:
+            return None, f"erro ao processar: {type(e).__name__}: {e}"
     
-    def load_profile_posts(self, profile_name: str) -> List[Dict[str, Any]]:
+    def quarantine_post(self, post: Any, profile_name: str, reason: str):
         """
-        Carrega posts de um perfil específico.
+        Registra um post rejeitado no arquivo de quarentena e nos contadores.
         
         Args:
-            profile_name: Nome do arquivo JSON do perfil (sem extensão)
+            post: Post bruto rejeitado
+            profile_name: Perfil de origem
+            reason: Motivo da rejeição
+        """
+        self.ingest_counters['quarantined'] += 1
+        self.quarantine_reasons[reason] += 1
+        
+        record = {
+            'profile': profile_name,
+            'reason': reason,
+            'quarantined_at': datetime.now(timezone.utc).isoformat(),
+            'post': post,
+        }
+        
+        try:
+            self.quarantine_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.quarantine_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"⚠️  Não foi possível gravar na quarentena ({self.quarantine_path}): {e}")
+    
+    def _reset_ingest_counters(self):
+        """Zera os contadores de ingestão no início de uma carga completa."""
+        self.failed_profiles = set()
+        self.ingest_counters = Counter()
+        self.quarantine_reasons = Counter()
+        self.invalid_timestamps = 0
+    
+    def print_ingest_summary(self):
+        """Imprime o resumo de posts aceitos, ignorados e em quarentena da última carga."""
+        counters = self.ingest_counters
+        print(
+            f"📋 Ingestão: {counters['accepted']} aceitos | "
+            f"{counters['empty']} sem texto | {counters['quarantined']} em quarentena"
+        )
+        if counters['quarantined']:
+            for reason, count in self.quarantine_reasons.most_common():
+                print(f"  - {count}x {reason}")
+            if self.quarantine_reasons:
+                print(f"  Registros gravados em: {self.quarantine_path}")
+            else:
+                print(f"  (registrados em carga anterior: {self.quarantine_path})")
+    
+    def process_comments(self, post: Dict[str, Any], profile_name: str) -> List[Dict[str, Any]]:
+        """
+        Extrai todos os comentários de um post bruto (incluindo respostas).
+        
+        Diferente de extract_post_text, que só embute os 5 primeiros no texto
+        do post, aqui cada comentário vira um documento próprio ligado ao post.
+        
+        Args:
+            post: Dicionário bruto do post
+            profile_name: Nome do perfil ao qual o post pertence
             
         Returns:
-            Lista de posts processados
+            Lista de comentários processados (sem os de texto vazio)
         """
+        comments = []
+        seen = set()
+        pending = deque((comment, '') for comment in post.get('latestComments') or [])
+        
+        while pending:
+            comment, reply_to = pending.popleft()
+            comment_id = str(comment.get('id', ''))
+            text = self.clean_text(comment.get('text') or '')
+            
+            # Respostas às vezes também aparecem na lista principal
+            if text and comment_id not in seen:
+                seen.add(comment_id)
+                comments.append({
+                    'id': comment_id,
+                    'post_id': post.get('id', ''),
+                    'profile': profile_name,
+                    'text': text,
+                    'owner': comment.get('ownerUsername', ''),
+                    'timestamp': parse_iso_timestamp(comment.get('timestamp', '')),
+                    'likesCount': comment.get('likesCount', 0),
+                    'reply_to': reply_to,
+                    'post_url': post.get('url', ''),
+                })
+            
+            pending.extend((reply, comment_id) for reply in comment.get('replies') or [])
+        
+        return comments
+    
+    def _profile_path(self, profile_name: str) -> Path:
+        """Retorna o caminho do JSON de um perfil, validando sua existência."""
         file_path = self.data_dir / f"{profile_name}.json"
         
         if not file_path.exists():
             raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            posts = json.load(f)
-        
-        processed_posts = []
-        
-        for post in posts:
-            # Extrai informações relevantes
-            post_data = {
-                'id': post.get('id', ''),
-                'profile': profile_name,
-                'type': post.get('type', 'Unknown'),
-                'text': self.extract_post_text(post),
-                'url': post.get('url', ''),
-                'shortCode': post.get('shortCode', ''),
-                'timestamp': self.parse_timestamp(post.get('timestamp', '')),
-                'likesCount': post.get('likesCount', 0),
-                'commentsCount': post.get('commentsCount', 0),
-                'hashtags': post.get('hashtags', []),
-                'mentions': post.get('mentions', []),
-                'caption': post.get('caption', ''),
-            }
+        return file_path
+    
+    def source_snapshot(self) -> Dict[str, Dict[str, int]]:
+        """
+        Retrato dos arquivos de origem (usado pelos checkpoints de indexação).
+        
+        Returns:
+            Dicionário perfil -> {'mtime_ns', 'size'}
+        """
+        snapshot = {}
+        for json_file in sorted(self.data_dir.glob("*.json")):
+            stat = json_file.stat()
+            snapshot[json_file.stem] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        return snapshot
+    
+    def iter_profile_posts(self, profile_name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os posts de um perfil em modo streaming.
+        
+        O array JSON é lido um post por vez, então o uso de memória não
+        depende do tamanho do arquivo. Posts inválidos vão para a quarentena
+        (ver quarantine_post) sem interromper a leitura do perfil.
+        
+        Args:
+            profile_name: Nome do arquivo JSON do perfil (sem extensão)
             
-            # Só adiciona posts com conteúdo textual
+        Yields:
+            Posts processados, um a um
+        """
+        file_path = self._profile_path(profile_name)
+        
+        writer = None
+        if self.cache is not None:
+            reader = self.cache.open(profile_name, file_path)
+            if reader is not None:
+                # Cache válido: nada de JSON, emoji ou regex
+                with reader:
+                    self.ingest_counters['accepted'] += len(reader)
+                    self.ingest_counters['empty'] += reader.empty
+                    self.ingest_counters['quarantined'] += reader.quarantined
+                    yield from reader.iter_posts()
+                return
+            writer = self.cache.writer(profile_name, file_path)
+        
+        for post in iter_json_array(file_path):
+            post_data, reason = self.try_process_post(post, profile_name)
+            
+            # Post inválido não interrompe o perfil: vai para a quarentena
+            if reason is not None:
+                self.quarantine_post(post, profile_name, reason)
+                if writer is not None:
+                    writer.quarantined += 1
+                continue
+            
+            # Só retorna posts com conteúdo textual
             if post_data['text'].strip():
-                processed_posts.append(post_data)
+                self.ingest_counters['accepted'] += 1
+                if writer is not None:
+                    writer.append(post_data)
+                yield post_data
+            else:
+                self.ingest_counters['empty'] += 1
+                if writer is not None:
+                    writer.empty += 1
         
-        return processed_posts
+        # Só grava o cache se o arquivo foi lido por completo
+        if writer is not None:
+            writer.finish()
     
-    def load_all_posts(self) -> List[Dict[str, Any]]:
+    def load_profile_posts(self, profile_name: str) -> List[Dict[str, Any]]:
         """
-        Carrega posts de todos os perfis disponíveis.
+        Carrega posts de um perfil específico.
         
+        Args:
+            profile_name: Nome do arquivo JSON do perfil (sem extensão)
+            
         Returns:
-            Lista de todos os posts processados
+            Lista de posts processados
         """
-        all_posts = []
+        return list(self.iter_profile_posts(profile_name))
+    
+    def iter_profile_comments(self, profile_name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os comentários dos posts de um perfil em modo streaming.
+        
+        Args:
+            profile_name: Nome do arquivo JSON do perfil (sem extensão)
+            
+        Yields:
+            Comentários processados (ver process_comments), um a um
+        """
+        for post in iter_json_array(self._profile_path(profile_name)):
+            # Posts inválidos já são registrados na quarentena pela carga de posts
+            if validate_raw_post(post) is None:
+                yield from self.process_comments(post, profile_name)
+    
+    def iter_all_comments(self) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os comentários de todos os perfis em modo streaming.
+        
+        Perfis cuja leitura falhar são registrados em self.failed_profiles.
+        
+        Yields:
+            Comentários processados de todos os perfis, um a um
+        """
+        self.failed_profiles = set()
+        total = 0
+        for json_file in sorted(self.data_dir.glob("*.json")):
+            profile_name = json_file.stem
+            count = 0
+            try:
+                for comment in self.iter_profile_comments(profile_name):
+                    count += 1
+                    yield comment
+                print(f"✓ Carregados {count} comentários do perfil: {profile_name}")
+            except Exception as e:
+                self.failed_profiles.add(profile_name)
+                print(f"✗ Erro ao carregar comentários de {profile_name} (após {count}): {e}")
+            total += count
         
-        # Lista todos os arquivos JSON no diretório
-        json_files = list(self.data_dir.glob("*.json"))
+        print(f"\nTotal de comentários carregados: {total}")
+    
+    def iter_all_posts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os posts de todos os perfis em modo streaming.
+        
+        Yields:
+            Posts processados de todos os perfis, um a um
+        """
+        json_files = sorted(self.data_dir.glob("*.json"))
         
         print(f"Encontrados {len(json_files)} arquivos de perfis")
         
+        self._reset_ingest_counters()
+        total = 0
         for json_file in json_files:
             profile_name = json_file.stem
+            count = 0
             try:
-                posts = self.load_profile_posts(profile_name)
-                all_posts.extend(posts)
-                print(f"✓ Carregados {len(posts)} posts do perfil: {profile_name}")
+                for post in self.iter_profile_posts(profile_name):
+                    count += 1
+                    yield post
+                print(f"✓ Carregados {count} posts do perfil: {profile_name}")
             except Exception as e:
-                print(f"✗ Erro ao carregar {profile_name}: {e}")
+                self.failed_profiles.add(profile_name)
+                print(f"✗ Erro ao carregar {profile_name} (após {count} posts): {e}")
+            total += count
+        
+        print(f"\nTotal de posts carregados: {total}")
+        self.print_ingest_summary()
+        if self.invalid_timestamps:
+            print(f"⚠️  Posts com timestamp inválido: {self.invalid_timestamps}")
+    
+    def load_all_posts(
+        self,
+        stream: bool = False,
+        workers: Optional[int] = None,
+        chunk_size: int = 200
+    ):
+        """
+        Carrega posts de todos os perfis disponíveis.
         
-        print(f"\nTotal de posts carregados: {len(all_posts)}")
+        Args:
+            stream: Se True, retorna um generator (ver iter_all_posts) em vez de lista
+            workers: Se informado, processa os posts em um pool com esse número de
+                processos (0 usa todos os núcleos). Ignorado quando stream=True
+            chunk_size: Número de posts por tarefa enviada ao pool
+            
+        Returns:
+            Lista de todos os posts processados, ou generator se stream=True
+        """
+        if stream:
+            return self.iter_all_posts()
+        
+        if workers is not None:
+            return self._load_all_posts_parallel(workers or os.cpu_count() or 1, chunk_size)
+        
+        return list(self.iter_all_posts())
+    
+    def _load_all_posts_parallel(self, workers: int, chunk_size: int) -> List[Dict[str, Any]]:
+        """
+        Carrega todos os perfis distribuindo a limpeza de texto entre processos.
+        
+        O processo principal lê os JSONs em streaming e envia lotes de posts brutos
+        aos workers. Os resultados são coletados na ordem de envio, então a lista
+        final tem a mesma ordem da carga sequencial.
+        
+        Args:
+            workers: Número de processos
+            chunk_size: Número de posts por lote
+            
+        Returns:
+            Lista de todos os posts processados
+        """
+        json_files = sorted(self.data_dir.glob("*.json"))
+        
+        print(f"Encontrados {len(json_files)} arquivos de perfis ({workers} workers)")
+        
+        all_posts = []
+        self._reset_ingest_counters()
+        timings = {
+            json_file.stem: {'posts': 0, 'read_seconds': 0.0, 'process_seconds': 0.0}
+            for json_file in json_files
+        }
+        pending = deque()
+        max_pending = workers * 2  # Limita posts brutos aguardando processamento
+        writers = {}
+        start = time.perf_counter()
+        
+        def collect_oldest():
+            profile, future, submitted = pending.popleft()
+            try:
+                posts, elapsed, invalid_timestamps, rejected = future.result()
+            except Exception as e:
+                self.failed_profiles.add(profile)
+                print(f"✗ Erro ao processar lote de {profile}: {e}")
+                return
+            for raw_post, reason in rejected:
+                self.quarantine_post(raw_post, profile, reason)
+            empty = submitted - len(posts) - len(rejected)
+            self.ingest_counters['accepted'] += len(posts)
+            self.ingest_counters['empty'] += empty
+            all_posts.extend(posts)
+            if profile in writers:
+                for post in posts:
+                    writers[profile].append(post)
+                writers[profile].quarantined += len(rejected)
+                writers[profile].empty += empty
+            self.invalid_timestamps += invalid_timestamps
+            timings[profile]['posts'] += len(posts)
+            timings[profile]['process_seconds'] += elapsed
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for json_file in json_files:
+                profile_name = json_file.stem
+                read_start = time.perf_counter()
+                
+                if self.cache is not None:
+                    reader = self.cache.open(profile_name, json_file)
+                    if reader is not None:
+                        # Mantém a ordem: lotes anteriores entram antes do cache
+                        while pending:
+                            collect_oldest()
+                        with reader:
+                            cached = list(reader.iter_posts())
+                            self.ingest_counters['empty'] += reader.empty
+                            self.ingest_counters['quarantined'] += reader.quarantined
+                        self.ingest_counters['accepted'] += len(cached)
+                        all_posts.extend(cached)
+                        timings[profile_name]['posts'] = len(cached)
+                        timings[profile_name]['read_seconds'] = time.perf_counter() - read_start
+                        continue
+                    writers[profile_name] = self.cache.writer(profile_name, json_file)
+                
+                try:
+                    chunk = []
+                    for raw_post in iter_json_array(json_file):
+                        chunk.append(raw_post)
+                        if len(chunk) >= chunk_size:
+                            timings[profile_name]['read_seconds'] += time.perf_counter() - read_start
+                            pending.append((profile_name, executor.submit(
+                                _process_posts_chunk, str(self.data_dir), profile_name, chunk
+                            ), len(chunk)))
+                            chunk = []
+                            while len(pending) > max_pending:
+                                collect_oldest()
+                            read_start = time.perf_counter()
+                    if chunk:
+                        pending.append((profile_name, executor.submit(
+                            _process_posts_chunk, str(self.data_dir), profile_name, chunk
+                        ), len(chunk)))
+                except Exception as e:
+                    self.failed_profiles.add(profile_name)
+                    print(f"✗ Erro ao carregar {profile_name}: {e}")
+                timings[profile_name]['read_seconds'] += time.perf_counter() - read_start
+            
+            while pending:
+                collect_oldest()
+        
+        for profile_name, writer in writers.items():
+            if profile_name not in self.failed_profiles:
+                writer.finish()
+        
+        self.profile_timings = timings
+        
+        for profile_name, timing in timings.items():
+            print(
+                f"✓ {profile_name}: {timing['posts']} posts | "
+                f"leitura {timing['read_seconds']:.2f}s | "
+                f"processamento {timing['process_seconds']:.2f}s (soma dos workers)"
+            )
+        
+        print(f"\nTotal de posts carregados: {len(all_posts)} em {time.perf_counter() - start:.2f}s")
+        self.print_ingest_summary()
+        if self.invalid_timestamps:
+            print(f"⚠️  Posts com timestamp inválido: {self.invalid_timestamps}")
         return all_posts
     
-    def get_profile_stats(self) -> Dict[str, Any]:
+    @staticmethod
+    def has_text_content(post: Dict[str, Any]) -> bool:
+        """
+        Indica se extract_post_text geraria texto não vazio para um post bruto.
+        
+        Equivale a checar extract_post_text(post).strip(), mas sem limpar texto:
+        cada parte presente adiciona um prefixo ("Legenda:", "Hashtags:"...).
+        
+        Args:
+            post: Dicionário bruto do post
+            
+        Returns:
+            True se o post seria mantido na carga
+        """
+        if post.get('caption') or post.get('hashtags', []) or post.get('mentions', []):
+            return True
+        
+        latest_comments = post.get('latestComments', [])
+        return bool(latest_comments) and any(c.get('text') for c in latest_comments[:5])
+    
+    def get_profile_stats(self, aggregates: Iterable[str] = ()) -> Dict[str, Any]:
         """
         Retorna estatísticas sobre os perfis carregados.
         
+        Faz uma única passada em streaming sobre os JSONs (ou sobre as colunas
+        numéricas do cache, quando válido), sem limpar textos nem materializar
+        os posts processados.
+        
+        Args:
+            aggregates: Agregados extras a calcular:
+                - 'by_type': contagem de posts por tipo (Image, Video, Sidecar...)
+                - 'by_month': contagem de posts por mês ('AAAA-MM')
+            
         Returns:
-            Dicionário com estatísticas
+            Dicionário com estatísticas por perfil
         """
-        all_posts = self.load_all_posts()
+        aggregates = set(aggregates)
+        unknown = aggregates - self.STATS_AGGREGATES
+        if unknown:
+            raise ValueError(f"Agregados desconhecidos: {sorted(unknown)}")
         
         stats = {}
-        for post in all_posts:
-            profile = post['profile']
-            if profile not in stats:
-                stats[profile] = {
-                    'total_posts': 0,
-                    'total_likes': 0,
-                    'total_comments': 0,
-                    'date_range': {'oldest': None, 'newest': None}
-                }
-            
-            stats[profile]['total_posts'] += 1
-            stats[profile]['total_likes'] += post['likesCount']
-            stats[profile]['total_comments'] += post['commentsCount']
-            
-            # Atualiza intervalo de datas
-            post_date = post['timestamp']
-            if stats[profile]['date_range']['oldest'] is None or post_date < stats[profile]['date_range']['oldest']:
-                stats[profile]['date_range']['oldest'] = post_date
-            if stats[profile]['date_range']['newest'] is None or post_date > stats[profile]['date_range']['newest']:
-                stats[profile]['date_range']['newest'] = post_date
+        
+        for json_file in sorted(self.data_dir.glob("*.json")):
+            profile = json_file.stem
+            entry = {
+                'total_posts': 0,
+                'total_likes': 0,
+                'total_comments': 0,
+                'date_range': {'oldest': None, 'newest': None}
+            }
+            for name in aggregates:
+                entry[name] = {}
+            
+            try:
+                reader = self.cache.open(profile, json_file) if self.cache is not None else None
+                if reader is not None:
+                    with reader:
+                        rows = self._iter_stats_rows_from_cache(reader, 'by_type' in aggregates)
+                        self._accumulate_stats(entry, rows, aggregates)
+                else:
+                    rows = (
+                        (
+                            post.get('likesCount', 0),
+                            post.get('commentsCount', 0),
+                            # Sem self.parse_timestamp: a contagem de inválidos é da ingestão
+                            parse_iso_timestamp(post.get('timestamp', '')),
+                            post.get('type') or 'Unknown'
+                        )
+                        for post in iter_json_array(json_file)
+                        if validate_raw_post(post) is None and self.has_text_content(post)
+                    )
+                    self._accumulate_stats(entry, rows, aggregates)
+            except Exception as e:
+                print(f"✗ Erro ao calcular estatísticas de {profile}: {e}")
+                continue
+            
+            if entry['total_posts']:
+                if 'by_month' in aggregates:
+                    entry['by_month'] = dict(sorted(entry['by_month'].items()))
+                stats[profile] = entry
         
         return stats
+    
+    @staticmethod
+    def _iter_stats_rows_from_cache(reader: PostCacheReader, with_type: bool):
+        """Linhas (curtidas, comentários, data, tipo) lidas das colunas do cache."""
+        likes = reader.int_column('likesCount')
+        comments = reader.int_column('commentsCount')
+        timestamps = reader.int_column('timestamp')
+        types = reader.str_column('type') if with_type else None
+        try:
+            for i in range(len(reader)):
+                yield (
+                    None if likes[i] == NULL_INT else likes[i],
+                    None if comments[i] == NULL_INT else comments[i],
+                    epoch_us_to_datetime(timestamps[i]),
+                    next(types) if types is not None else None
+                )
+        finally:
+            likes.release()
+            comments.release()
+            timestamps.release()
+            if types is not None:
+                types.close()
+    
+    @staticmethod
+    def _accumulate_stats(entry: Dict[str, Any], rows, aggregates: set):
+        """Soma linhas (curtidas, comentários, data, tipo) nas estatísticas de um perfil."""
+        date_range = entry['date_range']
+        
+        for likes, comments, post_date, post_type in rows:
+            entry['total_posts'] += 1
+            entry['total_likes'] += likes or 0
+            entry['total_comments'] += comments or 0
+            
+            if 'by_type' in aggregates:
+                entry['by_type'][post_type] = entry['by_type'].get(post_type, 0) + 1
+            
+            # Atualiza intervalo de datas (posts sem data válida não entram)
+            if post_date is None:
+                continue
+            if date_range['oldest'] is None or post_date < date_range['oldest']:
+                date_range['oldest'] = post_date
+            if date_range['newest'] is None or post_date > date_range['newest']:
+                date_range['newest'] = post_date
+            
+            if 'by_month' in aggregates:
+                month = post_date.strftime('%Y-%m')
+                entry['by_month'][month] = entry['by_month'].get(month, 0) + 1
 
 
 def main():
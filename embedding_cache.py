@@ -0,0 +1,220 @@
+"""
+Caches de embeddings.
+
+- EmbeddingCache: cache persistente, endereçado pelo conteúdo do texto. Cada
+  vetor é gravado em uma tabela SQLite com chave (modelo, sha256(texto)), como
+  blob de float32. Limpar ou recriar a coleção do ChromaDB não apaga o cache,
+  então re-indexar textos já vistos não exige chamadas ao Ollama.
+- QueryEmbeddingLRU: cache em memória (LRU com validade) dos embeddings de
+  consultas, para que perguntas repetidas não voltem ao Ollama.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class EmbeddingCache:
+    """Tabela SQLite (modelo, hash do texto) -> vetor float32."""
+    
+    # Limite de parâmetros por consulta no SQLite (mantido abaixo do padrão antigo de 999)
+    _LOOKUP_BATCH = 900
+    
+    def __init__(self, path: str):
+        """
+        Abre (ou cria) o cache.
+        
+        Args:
+            path: Caminho do arquivo SQLite
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Uma conexão compartilhada entre as threads de indexação, protegida por lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+        
+        self.hits = 0
+        self.misses = 0
+        
+    @staticmethod
+    def text_hash(text: str) -> bytes:
+        """SHA-256 (binário) do texto."""
+        return hashlib.sha256(text.encode('utf-8')).digest()
+        
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Busca os embeddings de vários textos.
+        
+        Args:
+            model: Modelo de embedding
+            texts: Textos
+            
+        Returns:
+            Lista na ordem dos textos, com None para os ausentes do cache
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+        
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            for i in range(0, len(unique), self._LOOKUP_BATCH):
+                chunk = unique[i:i + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                )
+                for text_hash, blob in rows:
+                    found[text_hash] = array('f', blob).tolist()
+            
+            results = [found.get(text_hash) for text_hash in hashes]
+            hits = sum(1 for vector in results if vector is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+        
+        return results
+        
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """
+        Grava embeddings de vários textos.
+        
+        Args:
+            model: Modelo de embedding
+            texts: Textos
+            vectors: Embeddings, na mesma ordem dos textos
+        """
+        rows = [
+            (model, self.text_hash(text), len(vector), array('f', vector).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            
+    def close(self):
+        """Fecha a conexão com o SQLite."""
+        with self._lock:
+            self._conn.close()
+
+
+class QueryEmbeddingLRU:
+    """LRU em memória, limitado por tamanho e validade, de consulta normalizada -> embedding."""
+    
+    def __init__(self, max_size: int = 256, ttl_seconds: Optional[float] = 3600.0):
+        """
+        Inicializa o cache.
+        
+        Args:
+            max_size: Número máximo de consultas guardadas
+            ttl_seconds: Validade de cada entrada em segundos (None = sem validade)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Normaliza uma consulta: Unicode NFC, minúsculas e espaços colapsados.
+        
+        Serve só de chave do cache: consultas que só diferem nesses detalhes
+        compartilham o embedding, mas o modelo recebe o texto original (caixa
+        e acentos podem mudar o embedding).
+        """
+        return " ".join(unicodedata.normalize('NFC', query).casefold().split())
+        
+    def get(self, key: str) -> Optional[List[float]]:
+        """
+        Retorna o embedding de uma consulta normalizada, se presente e válido.
+        
+        Args:
+            key: Consulta normalizada (ver normalize)
+            
+        Returns:
+            Embedding ou None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                embedding, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return embedding
+                del self._entries[key]
+            
+            self.misses += 1
+            return None
+            
+    def put(self, key: str, embedding: List[float]):
+        """
+        Guarda o embedding de uma consulta normalizada.
+        
+        Args:
+            key: Consulta normalizada (ver normalize)
+            embedding: Embedding da consulta
+        """
+        if self.max_size <= 0:
+            return
+        
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            self._entries[key] = (embedding, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                
+    def clear(self):
+        """Remove todas as entradas (os contadores são mantidos)."""
+        with self._lock:
+            self._entries.clear()
+            
+    def info(self) -> Dict[str, Any]:
+        """
+        Retorna contadores do cache.
+        
+        Returns:
+            Dicionário com hits, misses, hit_rate, size e max_size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
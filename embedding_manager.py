@@ -1,24 +1,67 @@
 """
 Módulo para gerenciar embeddings de posts usando Ollama e ChromaDB.
+
+Além da API síncrona, EmbeddingManager tem versões assíncronas (asyncio) das
+operações que esperam o Ollama: agenerate_embedding(s), aembed_query(ies),
+asearch, aadd_posts e aadd_comments. Os embeddings vêm do cliente HTTP
+assíncrono (OllamaClient.aembed); as operações bloqueantes do banco vetorial
+(ChromaDB e NumpyVectorStore não têm API assíncrona local) rodam em threads
+com asyncio.to_thread. Assim, buscas de vários usuários e uma indexação em
+segundo plano compartilham um event loop.
 """
 
-import ollama
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 from chromadb import Client, Settings
 from chromadb.config import Settings as ChromaSettings
 import chromadb
 from pathlib import Path
 import json
 
+from collection_stats import CollectionStats
+from embedding_cache import EmbeddingCache, QueryEmbeddingLRU
+from ollama_client import OllamaClient, default_client
+from sharded_collection import ShardedCollection
+from vector_store import NumpyVectorStore
+
 
 class EmbeddingManager:
     """Classe para gerenciar embeddings e armazenamento vetorial."""
-
+    
+    # Fator de resultados extras pedidos ao ChromaDB quando trechos são recolhidos
+    CHUNK_OVERSAMPLING = 3
+    
+    # Limites de cada requisição ao endpoint de embeddings em lote (/api/embed):
+    # número de textos e total de caracteres (~4 caracteres por token)
+    EMBED_BATCH_SIZE = 64
+    EMBED_BATCH_CHARS = 32000
+    
+    # Backends do banco vetorial (vector_backend)
+    VECTOR_BACKENDS = ("chroma", "numpy")
+    
     def __init__(
         self, 
         collection_name: str = "instagram_posts",
         embedding_model: str = "mxbai-embed-large",
-        persist_dir: str = "./chroma_db"
+        persist_dir: str = "./chroma_db",
+        comments_collection_name: str = "instagram_comments",
+        embed_workers: int = 4,
+        max_in_flight: Optional[int] = None,
+        use_embedding_cache: bool = True,
+        query_cache_size: int = 256,
+        query_cache_ttl: Optional[float] = 3600.0,
+        vector_backend: str = "chroma",
+        vector_quantization: str = "float32",
+        vector_keep_full_precision: bool = False,
+        matryoshka_dim: Optional[int] = None,
+        shard_by_profile: bool = False,
+        ollama_client: Optional[OllamaClient] = None
     ):
         """
         Inicializa o gerenciador de embeddings.
@@ -27,18 +70,88 @@ class EmbeddingManager:
             collection_name: Nome da coleção no ChromaDB
             embedding_model: Modelo Ollama para embeddings
             persist_dir: Diretório para persistir o banco vetorial
+            comments_collection_name: Nome da coleção de comentários
+                (aberta apenas quando usada)
+            embed_workers: Threads gerando embeddings em paralelo durante a indexação
+            max_in_flight: Máximo de lotes embedados aguardando gravação
+                (padrão: 2 x embed_workers); limita o uso de memória
+            use_embedding_cache: Se True, reutiliza embeddings já calculados
+                (cache em <persist_dir>/embedding_cache.sqlite3, ver embedding_cache.py)
+            query_cache_size: Número de consultas com embedding guardado em memória
+                (0 desativa o cache de consultas)
+            query_cache_ttl: Validade, em segundos, do embedding de uma consulta em memória
+            vector_backend: "chroma" (ChromaDB, HNSW) ou "numpy" (busca exata em
+                matriz float32, em <persist_dir>/numpy_store, ver vector_store.py)
+            vector_quantization: Formato das coleções criadas no backend numpy:
+                "float32", "float16" ou "int8" (coleções existentes mantêm o seu)
+            vector_keep_full_precision: Nas coleções quantizadas criadas, guarda
+                também os vetores float32 no disco para reordenar os candidatos
+                (ranking exato, mas mais disco que o float32)
+            matryoshka_dim: No backend numpy, guarda também os vetores truncados
+                nesta dimensão (ex: 256) nas coleções criadas, para search(fast=True)
+            shard_by_profile: Se True, posts e comentários ficam em uma coleção por
+                perfil; buscas filtradas por perfil só consultam o shard do perfil e
+                as demais consultam todos em paralelo (ver sharded_collection.py).
+                Índices criados sem shards precisam ser re-indexados
+            ollama_client: Cliente Ollama (pool, timeouts, keep_alive e métricas,
+                ver ollama_client.py); padrão: cliente compartilhado do processo
         """
+        if embed_workers < 1:
+            raise ValueError("embed_workers deve ser pelo menos 1")
+        if vector_backend not in self.VECTOR_BACKENDS:
+            raise ValueError(f"vector_backend deve ser um de {self.VECTOR_BACKENDS}")
+        if vector_quantization != "float32" and vector_backend != "numpy":
+            raise ValueError("vector_quantization só é suportado com vector_backend='numpy'")
+        if vector_keep_full_precision and vector_quantization == "float32":
+            raise ValueError("vector_keep_full_precision exige vector_quantization 'float16' ou 'int8'")
+        if matryoshka_dim and vector_backend != "numpy":
+            raise ValueError("matryoshka_dim só é suportado com vector_backend='numpy'")
+        
         self.embedding_model = embedding_model
+        self.embed_workers = embed_workers
+        self.max_in_flight = max_in_flight or embed_workers * 2
         self.collection_name = collection_name
+        self.comments_collection_name = comments_collection_name
+        self._comments_collection = None
         self.persist_dir = Path(persist_dir)
+        self.vector_backend = vector_backend
+        self.shard_by_profile = shard_by_profile
+        self.ollama_client = ollama_client or default_client()
         
         # Cria diretório se não existir
         self.persist_dir.mkdir(exist_ok=True)
         
-        # Inicializa ChromaDB
-        self.client = chromadb.PersistentClient(path=str(self.persist_dir))
+        # Cache de embeddings: sobrevive a clear_collection e à troca de coleção
+        self.embedding_cache = (
+            EmbeddingCache(self.persist_dir / "embedding_cache.sqlite3")
+            if use_embedding_cache else None
+        )
+        self.query_cache = QueryEmbeddingLRU(query_cache_size, query_cache_ttl)
+        
+        # Totais por perfil de cada coleção, mantidos a cada gravação (ver get_stats)
+        self.collection_stats = CollectionStats(self.persist_dir / "collection_stats.sqlite3")
+        
+        # Inicializa o banco vetorial (NumpyVectorStore tem a mesma API de cliente do ChromaDB)
+        if vector_backend == "numpy":
+            self.client = NumpyVectorStore(
+                self.persist_dir / "numpy_store",
+                quantization=vector_quantization,
+                keep_full_precision=vector_keep_full_precision,
+                prefix_dim=matryoshka_dim
+            )
+        else:
+            self.client = chromadb.PersistentClient(path=str(self.persist_dir))
         
         # Cria ou recupera coleção
+        if shard_by_profile:
+            self.collection = ShardedCollection(
+                self.client, collection_name, metadata={"hnsw:space": "cosine"}
+            )
+            print(
+                f"✓ Coleção '{collection_name}' carregada com {self.collection.count()} documentos "
+                f"em {len(self.collection.profiles)} shards (um por perfil)"
+            )
+            return
         try:
             self.collection = self.client.get_collection(name=collection_name)
             print(f"✓ Coleção '{collection_name}' carregada com {self.collection.count()} documentos")
@@ -48,7 +161,21 @@ class EmbeddingManager:
                 metadata={"hnsw:space": "cosine"}
             )
             print(f"✓ Nova coleção '{collection_name}' criada")
-    
+            
+    @property
+    def comments_collection(self):
+        """Coleção de comentários (criada no primeiro acesso)."""
+        if self._comments_collection is None and self.shard_by_profile:
+            self._comments_collection = ShardedCollection(
+                self.client, self.comments_collection_name, metadata={"hnsw:space": "cosine"}
+            )
+        elif self._comments_collection is None:
+            self._comments_collection = self.client.get_or_create_collection(
+                name=self.comments_collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+        return self._comments_collection
+        
     def generate_embedding(self, text: str) -> List[float]:
         """
         Gera embedding para um texto usando Ollama.
@@ -59,78 +186,729 @@ class EmbeddingManager:
         Returns:
             Lista de floats representando o embedding
         """
+        return self.generate_embeddings([text])[0]
+        
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Gera o embedding de uma consulta de busca, com cache LRU em memória.
+        
+        A chave do cache é a consulta normalizada (ver QueryEmbeddingLRU.normalize),
+        então repetições com diferenças de caixa ou espaços não geram nova
+        chamada ao Ollama. Na falta, o modelo recebe o texto original.
+        
+        Args:
+            query: Texto da consulta
+            
+        Returns:
+            Embedding da consulta
+        """
+        return self.embed_queries([query])[0]
+        
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Gera os embeddings de várias consultas de uma vez (ver embed_query).
+        
+        As consultas ausentes do cache LRU vão ao Ollama em uma única
+        requisição em lote.
+        
+        Args:
+            queries: Textos das consultas
+            
+        Returns:
+            Embeddings na ordem das consultas
+        """
+        keys, embeddings, missing = self._cached_queries(queries)
+        if missing:
+            computed = self.generate_embeddings(list(missing.values()))
+            embeddings = self._store_queries(keys, embeddings, missing, computed)
+        return embeddings
+        
+    async def aembed_query(self, query: str) -> List[float]:
+        """Versão assíncrona de embed_query."""
+        return (await self.aembed_queries([query]))[0]
+        
+    async def aembed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Versão assíncrona de embed_queries (ver agenerate_embeddings)."""
+        keys, embeddings, missing = self._cached_queries(queries)
+        if missing:
+            computed = await self.agenerate_embeddings(list(missing.values()))
+            embeddings = self._store_queries(keys, embeddings, missing, computed)
+        return embeddings
+        
+    def _cached_queries(
+        self,
+        queries: List[str]
+    ) -> Tuple[List[str], List[Optional[List[float]]], Dict[str, str]]:
+        """
+        Consulta o cache LRU de consultas.
+        
+        Returns:
+            Tupla (chaves normalizadas, embeddings do cache ou None, chave
+            ausente -> texto original da primeira consulta com essa chave)
+        """
+        keys = [self.query_cache.normalize(query) for query in queries]
+        embeddings = [self.query_cache.get(key) for key in keys]
+        missing = {}
+        for query, key, embedding in zip(queries, keys, embeddings):
+            if embedding is None:
+                missing.setdefault(key, query)
+        return keys, embeddings, missing
+        
+    def _store_queries(
+        self,
+        keys: List[str],
+        embeddings: List[Optional[List[float]]],
+        missing: Dict[str, str],
+        computed: List[List[float]]
+    ) -> List[List[float]]:
+        """Guarda no cache LRU os embeddings calculados e completa os que faltavam."""
+        by_key = dict(zip(missing, computed))
+        for key, embedding in by_key.items():
+            self.query_cache.put(key, embedding)
+        return [
+            embedding if embedding is not None else by_key[key]
+            for key, embedding in zip(keys, embeddings)
+        ]
+        
+    def _split_embedding_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """
+        Divide textos em lotes que respeitam EMBED_BATCH_SIZE e EMBED_BATCH_CHARS.
+        
+        Um texto maior que o limite de caracteres vai sozinho em seu lote.
+        """
+        batch = []
+        batch_chars = 0
+        for text in texts:
+            if batch and (
+                len(batch) >= self.EMBED_BATCH_SIZE
+                or batch_chars + len(text) > self.EMBED_BATCH_CHARS
+            ):
+                yield batch
+                batch = []
+                batch_chars = 0
+            batch.append(text)
+            batch_chars += len(text)
+        if batch:
+            yield batch
+            
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Gera embeddings para vários textos com requisições em lote ao Ollama.
+        
+        Textos já presentes no cache de embeddings não são enviados ao Ollama.
+        Os demais vão em requisições em lote para /api/embed; lotes acima dos
+        limites de quantidade ou tamanho são divididos automaticamente.
+        
+        Args:
+            texts: Textos para gerar embeddings
+            
+        Returns:
+            Lista de embeddings, na mesma ordem dos textos
+        """
+        embeddings, missing = self._cached_embeddings(texts)
+        if not missing:
+            return embeddings
+        
+        computed = []
+        try:
+            for batch in self._split_embedding_batches(missing):
+                response = self.ollama_client.embed(
+                    model=self.embedding_model,
+                    input=batch
+                )
+                computed.extend(self._batch_embeddings(response, batch))
+        except Exception as e:
+            print(f"Erro ao gerar embeddings: {e}")
+            raise
+        
+        return self._merge_embeddings(texts, embeddings, missing, computed)
+        
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """Versão assíncrona de generate_embedding."""
+        return (await self.agenerate_embeddings([text]))[0]
+        
+    async def agenerate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Versão assíncrona de generate_embeddings.
+        
+        Os lotes ausentes do cache vão ao Ollama pelo cliente assíncrono,
+        concorrentemente (até embed_workers requisições ao mesmo tempo).
+        
+        Args:
+            texts: Textos para gerar embeddings
+            
+        Returns:
+            Lista de embeddings, na mesma ordem dos textos
+        """
+        embeddings, missing = self._cached_embeddings(texts)
+        if not missing:
+            return embeddings
+        
+        semaphore = asyncio.Semaphore(self.embed_workers)
+        
+        async def embed_batch(batch):
+            async with semaphore:
+                response = await self.ollama_client.aembed(
+                    model=self.embedding_model,
+                    input=batch
+                )
+            return self._batch_embeddings(response, batch)
+        
         try:
-            response = ollama.embeddings(
-                model=self.embedding_model,
-                prompt=text
+            batches = await asyncio.gather(
+                *(embed_batch(batch) for batch in self._split_embedding_batches(missing))
             )
-            return response['embedding']
         except Exception as e:
-            print(f"Erro ao gerar embedding: {e}")
+            print(f"Erro ao gerar embeddings: {e}")
             raise
-    
-    def add_posts(self, posts: List[Dict[str, Any]], batch_size: int = 100):
+        
+        computed = [embedding for batch in batches for embedding in batch]
+        return self._merge_embeddings(texts, embeddings, missing, computed)
+        
+    def _cached_embeddings(self, texts: List[str]) -> Tuple[List[Optional[List[float]]], List[str]]:
+        """
+        Consulta o cache de embeddings.
+        
+        Returns:
+            Tupla (embeddings do cache ou None, textos ausentes sem repetição)
+        """
+        if self.embedding_cache is not None:
+            embeddings = self.embedding_cache.get_many(self.embedding_model, texts)
+        else:
+            embeddings = [None] * len(texts)
+        
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        return embeddings, missing
+        
+    @staticmethod
+    def _batch_embeddings(response, batch: List[str]) -> List[List[float]]:
+        """Embeddings de uma resposta de /api/embed (um por texto do lote)."""
+        if len(response['embeddings']) != len(batch):
+            raise ValueError(
+                f"Ollama retornou {len(response['embeddings'])} embeddings para {len(batch)} textos"
+            )
+        return response['embeddings']
+        
+    def _merge_embeddings(
+        self,
+        texts: List[str],
+        embeddings: List[Optional[List[float]]],
+        missing: Dict[str, str],
+        computed: List[List[float]]
+    ) -> List[List[float]]:
+        """Grava os embeddings calculados no cache e completa os que faltavam, na ordem dos textos."""
+        if self.embedding_cache is not None:
+            self.embedding_cache.put_many(self.embedding_model, missing, computed)
+            # Mesma precisão (float32) dos vetores lidos do cache
+            computed = [array('f', embedding).tolist() for embedding in computed]
+        
+        by_text = dict(zip(missing, computed))
+        return [
+            embedding if embedding is not None else by_text[text]
+            for text, embedding in zip(texts, embeddings)
+        ]
+        
+    @staticmethod
+    def make_post_id(post: Dict[str, Any]) -> str:
+        """Retorna o id do documento de um post na coleção."""
+        return f"{post['profile']}_{post['id']}"
+        
+    @staticmethod
+    def _hash(value: str) -> str:
+        """SHA-256 hexadecimal de uma string."""
+        return hashlib.sha256(value.encode('utf-8')).hexdigest()
+        
+    def prepare_document(self, post: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Monta id, texto e metadados de um post como são gravados na coleção.
+        
+        Os metadados incluem dois hashes usados na indexação incremental:
+        'content_hash' (texto embedado) e 'metadata_hash' (demais metadados).
+        
+        Args:
+            post: Post processado
+            
+        Returns:
+            Tupla (id, texto, metadados)
+        """
+        doc_text = post['text']
+        
+        metadata = {
+            'profile': post['profile'],
+            'url': post['url'],
+            'timestamp': post['timestamp'].isoformat() if post['timestamp'] else '',
+            'likesCount': post['likesCount'],
+            'commentsCount': post['commentsCount'],
+            'type': post['type'],
+            'caption': post.get('caption', '')[:500],  # Limita tamanho
+            'hashtags': json.dumps(post.get('hashtags', [])),
+            'mentions': json.dumps(post.get('mentions', [])),
+        }
+        
+        # Documento de trecho (ver text_chunker.PostChunker): aponta para o post
+        if post.get('parent_id'):
+            metadata['parent_id'] = self.make_post_id({'profile': post['profile'], 'id': post['parent_id']})
+            metadata['chunk_index'] = post['chunk_index']
+        
+        metadata['metadata_hash'] = self._hash(json.dumps(metadata, sort_keys=True))
+        metadata['content_hash'] = self._hash(doc_text)
+        
+        return self.make_post_id(post), doc_text, metadata
+        
+    @staticmethod
+    def make_comment_id(comment: Dict[str, Any]) -> str:
+        """Retorna o id do documento de um comentário na coleção de comentários."""
+        return f"{comment['profile']}_{comment['post_id']}_comment_{comment['id']}"
+        
+    def prepare_comment(self, comment: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Monta id, texto e metadados de um comentário.
+        
+        O metadado 'post_id' é o id do post na coleção de posts, então o
+        comentário pode ser ligado ao post sem varrer a coleção.
+        
+        Args:
+            comment: Comentário processado (InstagramDataLoader.process_comments)
+            
+        Returns:
+            Tupla (id, texto, metadados)
+        """
+        doc_text = comment['text']
+        
+        metadata = {
+            'profile': comment['profile'],
+            'post_id': self.make_post_id({'profile': comment['profile'], 'id': comment['post_id']}),
+            'post_url': comment['post_url'],
+            'owner': comment['owner'],
+            'timestamp': comment['timestamp'].isoformat() if comment['timestamp'] else '',
+            'likesCount': comment['likesCount'] or 0,
+            'reply_to': comment['reply_to'],
+        }
+        metadata['metadata_hash'] = self._hash(json.dumps(metadata, sort_keys=True))
+        metadata['content_hash'] = self._hash(doc_text)
+        
+        return self.make_comment_id(comment), doc_text, metadata
+        
+    def add_posts(
+        self,
+        posts: Iterable[Dict[str, Any]],
+        batch_size: int = 100,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        upsert: bool = False
+    ):
         """
         Adiciona posts ao banco vetorial.
         
+        Aceita tanto listas quanto generators (ex: InstagramDataLoader.iter_all_posts);
+        os posts são consumidos lote a lote, sem materializar a entrada inteira.
+        
         Args:
-            posts: Lista de posts processados
+            posts: Posts processados (lista ou iterável)
             batch_size: Tamanho do lote para processamento
+            on_commit: Chamada com os ids de cada lote logo após gravá-lo
+                (ex: IndexCheckpoint.record)
+            upsert: Se True, aceita ids já existentes na coleção: posts com o
+                mesmo 'content_hash' não são re-embedados (só os metadados são
+                atualizados, se mudaram) e os demais são sobrescritos
         """
-        total = len(posts)
-        print(f"\nIniciando indexação de {total} posts...")
+        self._add_documents(
+            self.collection, posts, self.prepare_document, batch_size, "posts", on_commit, upsert
+        )
         
-        for i in range(0, total, batch_size):
-            batch = posts[i:i + batch_size]
-            
-            documents = []
-            metadatas = []
-            ids = []
-            embeddings = []
+    def add_comments(
+        self,
+        comments: Iterable[Dict[str, Any]],
+        batch_size: int = 100,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        upsert: bool = False
+    ):
+        """
+        Adiciona comentários à coleção de comentários.
+        
+        Args:
+            comments: Comentários processados (lista ou iterável)
+            batch_size: Tamanho do lote para processamento
+            on_commit: Chamada com os ids de cada lote logo após gravá-lo
+            upsert: Se True, aceita ids já existentes (ver add_posts)
+        """
+        self._add_documents(
+            self.comments_collection, comments, self.prepare_comment, batch_size, "comentários",
+            on_commit, upsert
+        )
+        
+    async def aadd_posts(
+        self,
+        posts: Iterable[Dict[str, Any]],
+        batch_size: int = 100,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        upsert: bool = False
+    ):
+        """
+        Versão assíncrona de add_posts (ver _aadd_documents).
+        
+        Args:
+            posts: Posts processados (lista ou iterável)
+            batch_size: Tamanho do lote para processamento
+            on_commit: Chamada com os ids de cada lote logo após gravá-lo
+            upsert: Se True, aceita ids já existentes (ver add_posts)
+        """
+        await self._aadd_documents(
+            self.collection, posts, self.prepare_document, batch_size, "posts", on_commit, upsert
+        )
+        
+    async def aadd_comments(
+        self,
+        comments: Iterable[Dict[str, Any]],
+        batch_size: int = 100,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        upsert: bool = False
+    ):
+        """
+        Versão assíncrona de add_comments (ver _aadd_documents).
+        
+        Args:
+            comments: Comentários processados (lista ou iterável)
+            batch_size: Tamanho do lote para processamento
+            on_commit: Chamada com os ids de cada lote logo após gravá-lo
+            upsert: Se True, aceita ids já existentes (ver add_posts)
+        """
+        await self._aadd_documents(
+            self.comments_collection, comments, self.prepare_comment, batch_size, "comentários",
+            on_commit, upsert
+        )
+        
+    def _embed_batch(self, documents: List[str]) -> Tuple[List[List[float]], float]:
+        """Gera os embeddings de um lote (executado nas threads de indexação)."""
+        start = time.perf_counter()
+        embeddings = self.generate_embeddings(documents)
+        return embeddings, time.perf_counter() - start
+        
+    async def _aembed_batch(self, documents: List[str]) -> Tuple[List[List[float]], float]:
+        """Versão assíncrona de _embed_batch."""
+        start = time.perf_counter()
+        embeddings = await self.agenerate_embeddings(documents)
+        return embeddings, time.perf_counter() - start
+        
+    def _split_existing(
+        self,
+        collection,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ) -> Tuple[Tuple[List[str], List[str], List[Dict[str, Any]]], Tuple[List[str], List[Dict[str, Any]]], int]:
+        """
+        Separa um lote conforme o que já está gravado na coleção.
+        
+        Args:
+            collection: Coleção de destino
+            ids: Ids do lote
+            documents: Textos do lote
+            metadatas: Metadados do lote
             
-            for post in batch:
-                # Prepara documento
-                doc_text = post['text']
+        Returns:
+            Tupla (a_embedar, só_metadados, inalterados): a_embedar é
+            (ids, textos, metadados) dos documentos novos ou com texto alterado;
+            só_metadados é (ids, metadados) dos que mudaram apenas nos metadados;
+            inalterados é o número de documentos idênticos aos gravados
+        """
+        stored = collection.get(ids=ids, include=['metadatas'])
+        stored_metadatas = {
+            doc_id: (metadata or {}) for doc_id, metadata in zip(stored['ids'], stored['metadatas'])
+        }
+        
+        embed_ids, embed_documents, embed_metadatas = [], [], []
+        update_ids, update_metadatas = [], []
+        unchanged = 0
+        
+        for doc_id, doc_text, metadata in zip(ids, documents, metadatas):
+            existing = stored_metadatas.get(doc_id)
+            if existing is None or existing.get('content_hash') != metadata['content_hash']:
+                embed_ids.append(doc_id)
+                embed_documents.append(doc_text)
+                embed_metadatas.append(metadata)
+            elif existing.get('metadata_hash') != metadata['metadata_hash']:
+                update_ids.append(doc_id)
+                update_metadatas.append(metadata)
+            else:
+                unchanged += 1
+        
+        return (embed_ids, embed_documents, embed_metadatas), (update_ids, update_metadatas), unchanged
+        
+    def _add_documents(
+        self,
+        collection,
+        items: Iterable[Dict[str, Any]],
+        prepare,
+        batch_size: int,
+        label: str,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        upsert: bool = False
+    ):
+        """
+        Embeda e grava documentos em uma coleção, em pipeline.
+        
+        A thread principal prepara os lotes e os envia a um pool de
+        embed_workers threads; até max_in_flight lotes ficam em andamento. Os
+        lotes prontos são gravados na coleção pela própria thread principal
+        (escritor único), na ordem de envio, enquanto os seguintes ainda são
+        embedados.
+        
+        Com upsert, cada lote é antes comparado com a coleção (_split_existing):
+        só documentos novos ou com texto alterado vão para o embedding.
+        
+        Args:
+            collection: Coleção de destino
+            items: Posts ou comentários processados
+            prepare: Função item -> (id, texto, metadados)
+            batch_size: Tamanho do lote para processamento
+            label: Nome dos itens nas mensagens de progresso
+            on_commit: Chamada com os ids de cada lote logo após gravá-lo
+            upsert: Se True, aceita ids já existentes na coleção
+        """
+        run = self._start_indexing(items, label)
+        iterator = iter(items)
+        pending = deque()
+        
+        def write_oldest():
+            ids, to_write, updates, future = pending.popleft()
+            embeddings, elapsed = future.result() if future is not None else ([], 0.0)
+            self._write_batch(
+                run, collection, label, ids, to_write, updates, embeddings, elapsed,
+                upsert, on_commit, len(pending)
+            )
+        
+        executor = ThreadPoolExecutor(max_workers=self.embed_workers)
+        try:
+            while (batch := self._next_batch(run, collection, iterator, prepare, batch_size, upsert)) is not None:
+                ids, to_write, updates = batch
+                future = executor.submit(self._embed_batch, to_write[1]) if to_write[0] else None
+                pending.append((ids, to_write, updates, future))
                 
-                # Metadados
-                metadata = {
-                    'profile': post['profile'],
-                    'url': post['url'],
-                    'timestamp': post['timestamp'].isoformat(),
-                    'likesCount': post['likesCount'],
-                    'commentsCount': post['commentsCount'],
-                    'type': post['type'],
-                    'caption': post.get('caption', '')[:500],  # Limita tamanho
-                    'hashtags': json.dumps(post.get('hashtags', [])),
-                    'mentions': json.dumps(post.get('mentions', [])),
-                }
+                # Contrapressão: não lê mais itens enquanto houver lotes demais em andamento
+                while len(pending) >= self.max_in_flight:
+                    write_oldest()
+            
+            while pending:
+                write_oldest()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        self._finish_indexing(run, collection, label, upsert)
+        
+    async def _aadd_documents(
+        self,
+        collection,
+        items: Iterable[Dict[str, Any]],
+        prepare,
+        batch_size: int,
+        label: str,
+        on_commit: Optional[Callable[[List[str]], None]] = None,
+        upsert: bool = False
+    ):
+        """
+        Versão assíncrona de _add_documents, no event loop atual.
+        
+        Os lotes são embedados por tarefas do event loop (até embed_workers
+        lotes no Ollama ao mesmo tempo e até max_in_flight em andamento), sem
+        threads de embedding. A leitura e preparação dos itens, a comparação
+        com a coleção e a gravação usam o banco vetorial, que é bloqueante:
+        rodam em asyncio.to_thread, um lote de cada vez e na ordem de envio
+        (escritor único), enquanto o loop atende outras tarefas (ex: buscas).
+        
+        Args:
+            collection: Coleção de destino
+            items: Posts ou comentários processados
+            prepare: Função item -> (id, texto, metadados)
+            batch_size: Tamanho do lote para processamento
+            label: Nome dos itens nas mensagens de progresso
+            on_commit: Chamada com os ids de cada lote logo após gravá-lo
+            upsert: Se True, aceita ids já existentes na coleção
+        """
+        run = self._start_indexing(items, label)
+        iterator = iter(items)
+        pending = deque()
+        semaphore = asyncio.Semaphore(self.embed_workers)
+        
+        async def embed(documents):
+            async with semaphore:
+                return await self._aembed_batch(documents)
                 
-                # Gera embedding
-                embedding = self.generate_embedding(doc_text)
+        async def write_oldest():
+            ids, to_write, updates, task = pending.popleft()
+            embeddings, elapsed = await task if task is not None else ([], 0.0)
+            await asyncio.to_thread(
+                self._write_batch, run, collection, label, ids, to_write, updates, embeddings, elapsed,
+                upsert, on_commit, len(pending)
+            )
+        
+        try:
+            while (batch := await asyncio.to_thread(
+                self._next_batch, run, collection, iterator, prepare, batch_size, upsert
+            )) is not None:
+                ids, to_write, updates = batch
+                task = asyncio.create_task(embed(to_write[1])) if to_write[0] else None
+                pending.append((ids, to_write, updates, task))
                 
-                documents.append(doc_text)
-                metadatas.append(metadata)
-                ids.append(f"{post['profile']}_{post['id']}")
-                embeddings.append(embedding)
+                # Contrapressão: não lê mais itens enquanto houver lotes demais em andamento
+                while len(pending) >= self.max_in_flight:
+                    await write_oldest()
             
-            # Adiciona lote ao ChromaDB
-            self.collection.add(
+            while pending:
+                await write_oldest()
+        finally:
+            tasks = [task for *_, task in pending if task is not None]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        await asyncio.to_thread(self._finish_indexing, run, collection, label, upsert)
+        
+    def _start_indexing(self, items: Iterable[Dict[str, Any]], label: str) -> Dict[str, Any]:
+        """
+        Anuncia uma indexação e cria seus contadores.
+        
+        Returns:
+            Dicionário com total (None para iteráveis sem tamanho), start,
+            cache_before, progress, unchanged, metadata_only, embed_seconds
+            e write_seconds
+        """
+        total = len(items) if hasattr(items, '__len__') else None
+        if total is not None:
+            print(f"\nIniciando indexação de {total} {label} ({self.embed_workers} workers)...")
+        else:
+            print(f"\nIniciando indexação de {label} (streaming, {self.embed_workers} workers)...")
+        
+        cache = self.embedding_cache
+        return {
+            'total': total,
+            'start': time.perf_counter(),
+            'cache_before': (cache.hits, cache.misses) if cache is not None else None,
+            'progress': 0,
+            'unchanged': 0,
+            'metadata_only': 0,
+            'embed_seconds': 0.0,
+            'write_seconds': 0.0,
+        }
+        
+    def _next_batch(
+        self,
+        run: Dict[str, Any],
+        collection,
+        iterator: Iterator[Dict[str, Any]],
+        prepare,
+        batch_size: int,
+        upsert: bool
+    ) -> Optional[Tuple[List[str], Tuple[List[str], List[str], List[Dict[str, Any]]], Tuple[List[str], List[Dict[str, Any]]]]]:
+        """
+        Lê e prepara o próximo lote de itens.
+        
+        Returns:
+            Tupla (ids, a_gravar, só_metadados) como em _split_existing (sem
+            upsert, todo o lote vai para o embedding), ou None ao fim dos itens
+        """
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return None
+        
+        ids = []
+        documents = []
+        metadatas = []
+        
+        for item in batch:
+            doc_id, doc_text, metadata = prepare(item)
+            documents.append(doc_text)
+            metadatas.append(metadata)
+            ids.append(doc_id)
+        
+        if not upsert:
+            return ids, (ids, documents, metadatas), ([], [])
+        
+        to_write, updates, unchanged = self._split_existing(collection, ids, documents, metadatas)
+        run['unchanged'] += unchanged
+        run['metadata_only'] += len(updates[0])
+        return ids, to_write, updates
+        
+    def _write_batch(
+        self,
+        run: Dict[str, Any],
+        collection,
+        label: str,
+        ids: List[str],
+        to_write: Tuple[List[str], List[str], List[Dict[str, Any]]],
+        updates: Tuple[List[str], List[Dict[str, Any]]],
+        embeddings: List[List[float]],
+        elapsed: float,
+        upsert: bool,
+        on_commit: Optional[Callable[[List[str]], None]],
+        in_flight: int
+    ):
+        """Grava um lote embedado na coleção e nos agregados e mostra o progresso."""
+        write_ids, documents, metadatas = to_write
+        update_ids, update_metadatas = updates
+        run['embed_seconds'] += elapsed
+        
+        # Grava lote no ChromaDB (com pendência registrada nos agregados até o upsert abaixo)
+        write_start = time.perf_counter()
+        stats_key = self._stats_key(collection.name)
+        self.collection_stats.begin(stats_key)
+        if write_ids:
+            (collection.upsert if upsert else collection.add)(
                 documents=documents,
                 metadatas=metadatas,
-                ids=ids,
+                ids=write_ids,
                 embeddings=embeddings
             )
-            
-            progress = min(i + batch_size, total)
-            print(f"Progresso: {progress}/{total} posts indexados ({(progress/total)*100:.1f}%)")
+        if update_ids:
+            collection.update(ids=update_ids, metadatas=update_metadatas)
+        self.collection_stats.upsert(stats_key, write_ids + update_ids, metadatas + update_metadatas)
+        run['write_seconds'] += time.perf_counter() - write_start
+        
+        if on_commit is not None:
+            on_commit(ids)
+        
+        run['progress'] += len(ids)
+        rate = run['progress'] / (time.perf_counter() - run['start'])
+        done = f"{run['progress']}/{run['total']}" if run['total'] else f"{run['progress']}"
+        print(
+            f"Progresso: {done} {label} | {rate:.1f} {label}/s | "
+            f"embed {elapsed:.2f}s/lote | gravação {run['write_seconds']:.2f}s | em andamento: {in_flight}"
+        )
+        
+    def _finish_indexing(self, run: Dict[str, Any], collection, label: str, upsert: bool):
+        """Mostra o resumo de uma indexação."""
+        progress = run['progress']
+        unchanged = run['unchanged']
+        metadata_only = run['metadata_only']
+        elapsed = time.perf_counter() - run['start']
+        print(
+            f"✓ Indexação concluída! {progress} {label} em {elapsed:.1f}s "
+            f"({progress / elapsed if elapsed else 0:.1f}/s) | "
+            f"tempo de embedding (soma dos workers): {run['embed_seconds']:.1f}s | "
+            f"gravação: {run['write_seconds']:.1f}s"
+        )
+        if upsert:
+            print(
+                f"  Já indexados: {unchanged} inalterados | {metadata_only} só com metadados atualizados | "
+                f"{progress - unchanged - metadata_only} embedados"
+            )
+        cache = self.embedding_cache
+        if cache is not None:
+            cache_before = run['cache_before']
+            print(
+                f"  Cache de embeddings: {cache.hits - cache_before[0]} reaproveitados | "
+                f"{cache.misses - cache_before[1]} calculados"
+            )
+        print(f"  Total de documentos na coleção: {collection.count()}")
         
-        print(f"✓ Indexação concluída! Total de documentos: {self.collection.count()}")
-    
     def search(
         self, 
         query: str, 
         n_results: int = 5,
-        profile_filter: str = None
+        profile_filter: str = None,
+        collapse_chunks: bool = True,
+        fast: bool = False
     ) -> Dict[str, Any]:
         """
         Busca posts relevantes baseado em uma query.
@@ -139,75 +917,456 @@ class EmbeddingManager:
             query: Texto da busca
             n_results: Número de resultados a retornar
             profile_filter: Filtrar por perfil específico (opcional)
+            collapse_chunks: Se True, acertos em documentos de trecho são
+                substituídos pelo post de origem (sem repetir posts)
+            fast: Se True, busca grossa nos vetores truncados (matryoshka_dim) e
+                reordena os candidatos com os vetores completos; para consultas
+                da interface. Sem vetores truncados, faz a busca completa
+                
+        Returns:
+            Dicionário com resultados da busca
+        """
+        # Gera embedding da query (ou reaproveita do cache de consultas)
+        query_embedding = self.embed_query(query)
+        return self._search_embedding(query_embedding, n_results, profile_filter, collapse_chunks, fast)
+        
+    async def asearch(
+        self,
+        query: str,
+        n_results: int = 5,
+        profile_filter: str = None,
+        collapse_chunks: bool = True,
+        fast: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Versão assíncrona de search.
+        
+        O embedding da consulta vem do cliente assíncrono do Ollama; a consulta
+        ao banco vetorial roda em uma thread (asyncio.to_thread). Várias buscas
+        podem ser aguardadas juntas (ex: asyncio.gather).
+        
+        Args:
+            query: Texto da busca
+            n_results: Número de resultados a retornar
+            profile_filter: Filtrar por perfil específico (opcional)
+            collapse_chunks: Se True, acertos em trechos viram o post de origem
+            fast: Se True, busca grossa nos vetores truncados (ver search)
             
         Returns:
             Dicionário com resultados da busca
         """
-        # Gera embedding da query
-        query_embedding = self.generate_embedding(query)
+        query_embedding = await self.aembed_query(query)
+        return await asyncio.to_thread(
+            self._search_embedding, query_embedding, n_results, profile_filter, collapse_chunks, fast
+        )
         
+    def _search_embedding(
+        self,
+        query_embedding: List[float],
+        n_results: int,
+        profile_filter: Optional[str],
+        collapse_chunks: bool,
+        fast: bool
+    ) -> Dict[str, Any]:
+        """Busca de search a partir do embedding da consulta."""
         # Prepara filtros
         where = {}
         if profile_filter:
             where['profile'] = profile_filter
         
-        # Busca no ChromaDB
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            where=where if where else None
+        # Busca no ChromaDB (com folga para acomodar trechos do mesmo post)
+        results = self._query_collection(
+            self.collection,
+            [query_embedding],
+            n_results * self.CHUNK_OVERSAMPLING if collapse_chunks else n_results,
+            where if where else None,
+            fast
         )
         
+        if collapse_chunks:
+            results = self._collapse_chunk_hits(results, n_results)
+        
         return results
-    
+        
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filters: Union[None, str, List[Optional[str]]] = None,
+        collapse_chunks: bool = True,
+        fast: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Executa várias buscas de posts de uma vez.
+        
+        Todas as consultas são embedadas em uma única requisição em lote e
+        enviadas juntas ao banco vetorial: uma chamada a collection.query por
+        filtro distinto (uma só quando todas usam o mesmo filtro).
+        
+        Args:
+            queries: Textos das buscas
+            n_results: Número de resultados por busca
+            filters: Perfil para filtrar: um para todas as buscas, uma lista
+                alinhada com queries (None = sem filtro) ou None
+            collapse_chunks: Se True, acertos em trechos viram o post de origem
+            fast: Se True, busca grossa nos vetores truncados (ver search)
+            
+        Returns:
+            Dicionário no formato de collection.query, com uma lista por busca
+            na ordem de queries
+        """
+        if filters is None or isinstance(filters, str):
+            filters = [filters] * len(queries)
+        if len(filters) != len(queries):
+            raise ValueError("filters deve ter um perfil (ou None) por consulta")
+        
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        if not queries:
+            return results
+        
+        query_embeddings = self.embed_queries(queries)
+        
+        # Agrupa as consultas por filtro: uma chamada ao banco vetorial por grupo
+        groups: Dict[Optional[str], List[int]] = {}
+        for i, profile in enumerate(filters):
+            groups.setdefault(profile, []).append(i)
+        
+        per_query: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+        for profile, positions in groups.items():
+            group_results = self._query_collection(
+                self.collection,
+                [query_embeddings[i] for i in positions],
+                n_results * self.CHUNK_OVERSAMPLING if collapse_chunks else n_results,
+                {'profile': profile} if profile else None,
+                fast
+            )
+            for j, i in enumerate(positions):
+                single = {
+                    key: [group_results[key][j]] if group_results.get(key) else None
+                    for key in ('ids', 'documents', 'metadatas', 'distances')
+                }
+                per_query[i] = self._collapse_chunk_hits(single, n_results) if collapse_chunks else single
+        
+        for single in per_query:
+            for key in results:
+                results[key].append(single[key][0] if single.get(key) else None)
+        return results
+        
+    def _query_collection(
+        self,
+        collection,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        fast: bool = False
+    ) -> Dict[str, Any]:
+        """Executa collection.query, com busca por prefixos se fast e o backend suportar."""
+        extra = {'prefix_search': True} if fast and self.vector_backend == "numpy" else {}
+        return collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            **extra
+        )
+        
+    def _collapse_chunk_hits(self, results: Dict[str, Any], n_results: int) -> Dict[str, Any]:
+        """
+        Recolhe acertos em trechos para o post de origem, mantendo a melhor distância.
+        
+        Args:
+            results: Resultado de collection.query (uma única query)
+            n_results: Número de posts a manter
+            
+        Returns:
+            Resultado no mesmo formato de collection.query
+        """
+        ids = results['ids'][0]
+        metadatas = results['metadatas'][0]
+        documents = results['documents'][0]
+        distances = results['distances'][0] if results.get('distances') else [None] * len(ids)
+        
+        kept = []
+        seen = set()
+        for doc_id, metadata, document, distance in zip(ids, metadatas, documents, distances):
+            post_id = metadata.get('parent_id') or doc_id
+            if post_id in seen:
+                continue
+            seen.add(post_id)
+            kept.append([post_id, metadata, document, distance, post_id != doc_id])
+            if len(kept) == n_results:
+                break
+        
+        # Troca o trecho pelo documento completo do post
+        parent_ids = [item[0] for item in kept if item[4]]
+        if parent_ids:
+            parents = self.collection.get(ids=parent_ids, include=['metadatas', 'documents'])
+            by_id = {
+                doc_id: (metadata, document)
+                for doc_id, metadata, document in zip(parents['ids'], parents['metadatas'], parents['documents'])
+            }
+            for item in kept:
+                if item[4] and item[0] in by_id:
+                    item[1], item[2] = by_id[item[0]]
+        
+        collapsed = dict(results)
+        collapsed['ids'] = [[item[0] for item in kept]]
+        collapsed['metadatas'] = [[item[1] for item in kept]]
+        collapsed['documents'] = [[item[2] for item in kept]]
+        if results.get('distances'):
+            collapsed['distances'] = [[item[3] for item in kept]]
+        for key in ('embeddings', 'uris', 'data'):
+            if collapsed.get(key):
+                collapsed[key] = None
+        
+        return collapsed
+        
+    def search_comments(
+        self,
+        query: str,
+        n_results: int = 10,
+        profile_filter: str = None,
+        post_id: str = None,
+        fast: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Busca comentários relevantes na coleção de comentários.
+        
+        Args:
+            query: Texto da busca
+            n_results: Número de comentários a retornar
+            profile_filter: Filtrar por perfil do post (opcional)
+            post_id: Restringir aos comentários de um post (id na coleção de posts)
+            fast: Se True, busca grossa nos vetores truncados (ver search)
+            
+        Returns:
+            Dicionário no formato de collection.query (vazio se não houver comentários indexados)
+        """
+        if self.comments_collection.count() == 0:
+            return {'ids': [[]], 'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
+        
+        conditions = []
+        if profile_filter:
+            conditions.append({'profile': profile_filter})
+        if post_id:
+            conditions.append({'post_id': post_id})
+        
+        if len(conditions) > 1:
+            where = {'$and': conditions}
+        else:
+            where = conditions[0] if conditions else None
+        
+        return self._query_collection(
+            self.comments_collection, [self.embed_query(query)], n_results, where, fast
+        )
+        
+    def get_indexed_hashes(self, page_size: int = 5000, collection=None) -> Dict[str, Dict[str, str]]:
+        """
+        Retorna os hashes de todos os documentos já indexados.
+        
+        Documentos indexados antes da existência dos hashes recebem o
+        'content_hash' calculado a partir do texto armazenado.
+        
+        Args:
+            page_size: Número de documentos lidos por chamada ao ChromaDB
+            collection: Coleção a ler (padrão: coleção de posts)
+            
+        Returns:
+            Dicionário id -> {'profile', 'content_hash', 'metadata_hash'}
+        """
+        collection = collection if collection is not None else self.collection
+        indexed = {}
+        legacy_ids = []
+        offset = 0
+        
+        while True:
+            page = collection.get(
+                limit=page_size,
+                offset=offset,
+                include=['metadatas']
+            )
+            if not page['ids']:
+                break
+            
+            for doc_id, metadata in zip(page['ids'], page['metadatas']):
+                indexed[doc_id] = {
+                    'profile': metadata.get('profile'),
+                    'content_hash': metadata.get('content_hash'),
+                    'metadata_hash': metadata.get('metadata_hash'),
+                }
+                if not metadata.get('content_hash'):
+                    legacy_ids.append(doc_id)
+            
+            offset += len(page['ids'])
+        
+        # Documentos antigos: calcula o hash do texto armazenado
+        for i in range(0, len(legacy_ids), page_size):
+            page = collection.get(
+                ids=legacy_ids[i:i + page_size],
+                include=['documents']
+            )
+            for doc_id, document in zip(page['ids'], page['documents']):
+                indexed[doc_id]['content_hash'] = self._hash(document or '')
+        
+        return indexed
+        
+    def get_all_ids(self, collection=None, page_size: int = 5000) -> set:
+        """
+        Retorna os ids de todos os documentos de uma coleção.
+        
+        Args:
+            collection: Coleção a ler (padrão: coleção de posts)
+            page_size: Número de ids lidos por chamada ao ChromaDB
+            
+        Returns:
+            Conjunto de ids
+        """
+        collection = collection if collection is not None else self.collection
+        ids = set()
+        offset = 0
+        while True:
+            page = collection.get(limit=page_size, offset=offset, include=[])
+            if not page['ids']:
+                break
+            ids.update(page['ids'])
+            offset += len(page['ids'])
+        return ids
+        
+    def update_metadatas(
+        self,
+        ids: List[str],
+        metadatas: List[Dict[str, Any]],
+        batch_size: int = 500,
+        collection=None
+    ):
+        """
+        Atualiza apenas os metadados de documentos existentes (sem re-embedar).
+        
+        Args:
+            ids: Ids dos documentos
+            metadatas: Novos metadados, na mesma ordem dos ids
+            batch_size: Tamanho do lote de atualização
+            collection: Coleção alvo (padrão: coleção de posts)
+        """
+        collection = collection if collection is not None else self.collection
+        stats_key = self._stats_key(collection.name)
+        for i in range(0, len(ids), batch_size):
+            self.collection_stats.begin(stats_key)
+            collection.update(
+                ids=ids[i:i + batch_size],
+                metadatas=metadatas[i:i + batch_size]
+            )
+            self.collection_stats.upsert(stats_key, ids[i:i + batch_size], metadatas[i:i + batch_size])
+            
+    def delete_posts(self, ids: List[str], batch_size: int = 500, collection=None):
+        """
+        Remove documentos da coleção.
+        
+        Args:
+            ids: Ids dos documentos a remover
+            batch_size: Tamanho do lote de remoção
+            collection: Coleção alvo (padrão: coleção de posts)
+        """
+        collection = collection if collection is not None else self.collection
+        stats_key = self._stats_key(collection.name)
+        for i in range(0, len(ids), batch_size):
+            self.collection_stats.begin(stats_key)
+            collection.delete(ids=ids[i:i + batch_size])
+            self.collection_stats.delete(stats_key, ids[i:i + batch_size])
+            
     def clear_collection(self):
         """Remove todos os documentos da coleção."""
+        if self.shard_by_profile:
+            self.collection.clear()
+            self.collection_stats.clear(self._stats_key(self.collection_name))
+            print(f"✓ Coleção '{self.collection_name}' limpa")
+            return
         try:
             self.client.delete_collection(name=self.collection_name)
             self.collection = self.client.create_collection(
                 name=self.collection_name,
                 metadata={"hnsw:space": "cosine"}
             )
+            self.collection_stats.clear(self._stats_key(self.collection_name))
             print(f"✓ Coleção '{self.collection_name}' limpa")
         except Exception as e:
             print(f"Erro ao limpar coleção: {e}")
-    
+            
+    def clear_comments(self):
+        """Remove todos os documentos da coleção de comentários."""
+        if self.shard_by_profile:
+            self.comments_collection.clear()
+        else:
+            try:
+                self.client.delete_collection(name=self.comments_collection_name)
+            except Exception:
+                pass  # Coleção ainda não existia
+            self._comments_collection = None
+        self.collection_stats.clear(self._stats_key(self.comments_collection_name))
+        print(f"✓ Coleção '{self.comments_collection_name}' limpa")
+        
+    def _stats_key(self, collection_name: str) -> str:
+        """Chave dos agregados de uma coleção (backends e shards têm coleções distintas)."""
+        layout = "shards/" if self.shard_by_profile else ""
+        return f"{self.vector_backend}/{layout}{collection_name}"
+        
+    def rebuild_stats(self, collection=None, page_size: int = 5000):
+        """
+        Reconstrói os agregados de uma coleção lendo todos os seus metadados.
+        
+        Só é necessário para coleções indexadas antes do arquivo de agregados,
+        alteradas por fora do EmbeddingManager ou com uma gravação interrompida;
+        get_stats chama sozinho nesses casos (ver CollectionStats.document_count).
+        
+        Args:
+            collection: Coleção alvo (padrão: coleção de posts)
+            page_size: Documentos lidos por página
+        """
+        collection = collection if collection is not None else self.collection
+        key = self._stats_key(collection.name)
+        print(f"🔄 Reconstruindo estatísticas de '{collection.name}'...")
+        
+        self.collection_stats.clear(key)
+        offset = 0
+        while True:
+            page = collection.get(include=['metadatas'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            self.collection_stats.upsert(key, page['ids'], page['metadatas'])
+            offset += len(page['ids'])
+        print(f"✓ Estatísticas reconstruídas ({offset} documentos)")
+        
     def get_stats(self) -> Dict[str, Any]:
         """
         Retorna estatísticas sobre a coleção.
         
+        Lidas dos agregados mantidos a cada gravação (collection_stats.py),
+        sem percorrer os metadados da coleção.
+        
         Returns:
             Dicionário com estatísticas
         """
+        key = self._stats_key(self.collection_name)
         count = self.collection.count()
-        
-        # Pega TODOS os documentos para garantir que obtém todos os perfis
-        if count > 0:
-            # Busca todos os documentos (só metadados, não documentos completos)
-            all_data = self.collection.get(
-                limit=count,  # Pega todos
-                include=['metadatas']  # Só metadados para ser mais rápido
-            )
-            
-            profiles = set()
-            for metadata in all_data['metadatas']:
-                profiles.add(metadata['profile'])
-            
-            # Ordena os perfis alfabeticamente
-            profiles_list = sorted(list(profiles))
-            
-            return {
-                'total_documents': count,
-                'profiles': profiles_list,
-                'collection_name': self.collection_name,
-                'embedding_model': self.embedding_model
-            }
+        if self.collection_stats.document_count(key) != count:
+            if count == 0:
+                self.collection_stats.clear(key)
+            else:
+                self.rebuild_stats()
+        summary = self.collection_stats.summary(key)
         
         return {
-            'total_documents': 0,
-            'profiles': [],
+            'total_documents': summary['total_documents'],
+            'total_posts': summary['total_posts'],
+            'total_likes': summary['total_likes'],
+            'total_comments': summary['total_comments'],
+            'date_range': summary['date_range'],
+            'profiles': sorted(summary['profile_stats']),
+            'profile_stats': summary['profile_stats'],
             'collection_name': self.collection_name,
-            'embedding_model': self.embedding_model
+            'embedding_model': self.embedding_model,
+            'vector_backend': self.vector_backend,
+            'query_cache': self.query_cache.info(),
+            'ollama': self.ollama_client.metrics()
         }
 
 
@@ -222,7 +1381,7 @@ def check_ollama_model(model_name: str) -> bool:
         True se o modelo está disponível
     """
     try:
-        models = ollama.list()
+        models = default_client().list()
         available_models = [model['name'] for model in models.get('models', [])]
         
         # Verifica se o modelo ou uma variante está disponível
@@ -247,7 +1406,7 @@ def install_embedding_model(model_name: str = "mxbai-embed-large"):
     print("Isso pode levar alguns minutos...")
     
     try:
-        ollama.pull(model_name)
+        default_client().pull(model_name)
         print(f"✓ Modelo {model_name} instalado com sucesso!")
     except Exception as e:
         print(f"✗ Erro ao instalar modelo: {e}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Avaliação dos formatos quantizados do backend NumPy (vector_store.py).
+
+Compara float16 e int8 (com e sem reordenação em precisão total) e a busca
+rápida por prefixos (Matryoshka, --prefix-dims) com a busca exata em float32:
+recall@k, bytes por vetor pesquisado em memória, tamanho em disco e latência
+das buscas.
+
+As consultas são vetores separados do corpus (não indexados). Por padrão o
+corpus é sintético; com --from-store usa os embeddings reais de uma coleção
+do backend numpy (ex: chroma_db/numpy_store, coleção instagram_posts).
+
+Uso:
+    uv run python evaluate_quantization.py
+    uv run python evaluate_quantization.py --docs 200000 --k 10
+    uv run python evaluate_quantization.py --from-store chroma_db/numpy_store --collection instagram_posts
+    uv run python evaluate_quantization.py --from-store chroma_db/numpy_store --prefix-dims 128 256 512
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmark_vector_store import make_corpus, recall
+from vector_store import NumpyCollection, NumpyVectorStore
+
+
+def load_store_vectors(store_path: str, collection_name: str) -> np.ndarray:
+    """Lê os vetores de uma coleção existente do backend numpy."""
+    collection = NumpyVectorStore(store_path).get_collection(collection_name)
+    vectors = collection.get(include=['embeddings'])['embeddings']
+    print(f"✓ {len(vectors)} vetores lidos de '{collection_name}' ({collection.quantization})")
+    return vectors
+
+
+def disk_bytes(path: Path) -> int:
+    """Tamanho dos arquivos de vetores de uma coleção."""
+    return sum(
+        file.stat().st_size for file in path.iterdir()
+        if file.suffix in ('.f32', '.f16', '.i8')
+    )
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Recall@k dos formatos quantizados do backend numpy")
+    parser.add_argument("--docs", type=int, default=50000, help="Documentos do corpus sintético")
+    parser.add_argument("--dim", type=int, default=1024, help="Dimensão dos vetores sintéticos")
+    parser.add_argument("--queries", type=int, default=200, help="Número de consultas")
+    parser.add_argument("--k", type=int, default=10, help="Resultados por busca")
+    parser.add_argument(
+        "--rescore-factors",
+        type=int,
+        nargs="+",
+        default=[2, 4, 8],
+        help="Candidatos reordenados por resultado nos testes com precisão total"
+    )
+    parser.add_argument(
+        "--prefix-dims",
+        type=int,
+        nargs="*",
+        default=[],
+        help="Dimensões de prefixo (Matryoshka) avaliadas com busca grossa + reordenação 4x"
+    )
+    parser.add_argument("--from-store", help="Diretório de um NumpyVectorStore com vetores reais")
+    parser.add_argument("--collection", default="instagram_posts", help="Coleção lida com --from-store")
+    args = parser.parse_args()
+    
+    if args.from_store:
+        vectors = load_store_vectors(args.from_store, args.collection)
+    else:
+        _, vectors, _, _ = make_corpus(args.docs + args.queries, args.dim, n_profiles=1)
+    
+    rng = np.random.default_rng(7)
+    query_rows = rng.choice(len(vectors), size=min(args.queries, len(vectors) // 10), replace=False)
+    queries = vectors[query_rows]
+    corpus = np.delete(vectors, query_rows, axis=0)
+    ids = [f"doc_{i}" for i in range(len(corpus))]
+    print(f"📋 {len(corpus)} documentos | dim {corpus.shape[1]} | {len(queries)} consultas | k={args.k}")
+    
+    configs = [('float32', False, 1, None)]
+    for quantization in ('float16', 'int8'):
+        configs.append((quantization, False, 1, None))
+        configs.extend((quantization, True, factor, None) for factor in args.rescore_factors)
+    configs.extend(('float32', False, 4, prefix_dim) for prefix_dim in args.prefix_dims)
+    
+    print(f"\n{'formato':<13} {'reordena':>9} {'recall@k':>9} {'bytes/vetor':>12} {'disco (MB)':>11} {'p50 (ms)':>9}")
+    
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (quantization, keep_full_precision, factor, prefix_dim) in enumerate(configs):
+            store = NumpyVectorStore(
+                f"{tmp}/{i}",
+                quantization=quantization,
+                keep_full_precision=keep_full_precision,
+                rescore_factor=factor,
+                prefix_dim=prefix_dim
+            )
+            collection: NumpyCollection = store.create_collection("avaliacao")
+            for start in range(0, len(corpus), 5000):
+                collection.add(ids=ids[start:start + 5000], embeddings=corpus[start:start + 5000])
+            
+            latencies = []
+            found = []
+            for query in queries:
+                start = time.perf_counter()
+                results = collection.query(
+                    query_embeddings=[query], n_results=args.k, prefix_search=prefix_dim is not None
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                found.append(results['ids'][0])
+            
+            if baseline is None:
+                baseline = found
+            
+            # Memória percorrida na busca: vetores quantizados (+ escalas no int8) ou prefixos
+            if prefix_dim is not None:
+                searched = 4 * prefix_dim
+                label = f"prefixo {prefix_dim}"
+            else:
+                searched = collection._arrays['vectors'].itemsize * collection.dim
+                if quantization == 'int8':
+                    searched += 4
+                label = quantization
+            
+            rescore = f"{factor}x" if keep_full_precision or prefix_dim is not None else "-"
+            print(
+                f"{label:<13} {rescore:>9} {recall(found, baseline):>9.3f} {searched:>12} "
+                f"{disk_bytes(collection.path) / 1e6:>11.1f} {statistics.median(latencies):>9.2f}"
+            )
+    
+    print("\n💡 bytes/vetor: o que a busca grossa lê por documento; os vetores completos")
+    print("   usados na reordenação só são lidos nas linhas dos candidatos.")
+
+
+if __name__ == "__main__":
+    main()
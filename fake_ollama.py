@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita a API HTTP do Ollama, para benchmarks e testes sem modelos.
+
+Responde como o Ollama às rotas usadas pelo projeto (/api/embed,
+/api/embeddings, /api/chat, /api/generate, /api/tags, /api/pull, /api/show,
+/api/version):
+
+- Embeddings determinísticos por hashing das palavras: o mesmo texto sempre
+  gera o mesmo vetor e textos com palavras em comum ficam próximos, então
+  busca semântica e recall continuam fazendo sentido
+- Chat/generate com respostas de modelo: o plano JSON do agente
+  (semantic_search com a pergunta do usuário), a análise de sentimento do
+  QueryTools, JSON genérico com format='json' e texto determinístico nos
+  demais casos; streaming em NDJSON como o Ollama
+- Latências configuráveis por requisição, por texto embedado e por token
+  gerado, com distribuição fixa, uniforme, normal ou lognormal
+- Carregamento de modelos (--load-ms): um modelo ocioso por mais que o
+  keep_alive da requisição (padrão do Ollama: 5 minutos) é "recarregado",
+  com a espera e o load_duration correspondentes
+
+O cliente Python do Ollama lê o endereço do servidor da variável OLLAMA_HOST,
+então indexação, RAG e agente passam a usar o servidor falso sem mudanças
+(ver config.example). GET /fake/stats retorna os contadores de requisições.
+
+Uso:
+    uv run python fake_ollama.py --port 11435
+    OLLAMA_HOST=http://127.0.0.1:11435 uv run python index_posts.py --force
+    uv run python fake_ollama.py --embed-latency-ms 20 --embed-item-latency-ms 2 --tokens-per-second 40 --distribution lognormal
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+DURATION_PATTERN = re.compile(r"(-?\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+DEFAULT_KEEP_ALIVE = 300.0
+
+
+def parse_keep_alive(value: Any) -> float:
+    """keep_alive do Ollama (segundos ou duração como "30m"/"1h30m") em segundos; negativo = para sempre."""
+    if value is None or value == "":
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        parts = DURATION_PATTERN.findall(str(value))
+        seconds = sum(float(number) * DURATION_UNITS[unit] for number, unit in parts) if parts else float(value)
+    return math.inf if seconds < 0 else seconds
+
+
+class LatencyModel:
+    """Sorteia latências em torno de uma média, com a distribuição escolhida."""
+    
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+    
+    def __init__(self, distribution: str = "fixed", jitter: float = 0.25, seed: Optional[int] = None):
+        """
+        Args:
+            distribution: "fixed", "uniform", "normal" ou "lognormal"
+            jitter: Dispersão relativa à média (ex: 0.25 = ±25% no uniforme,
+                desvio padrão de 25% da média no normal e no lognormal)
+            seed: Semente do sorteio (None: aleatória)
+        """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"distribution deve ser uma de {self.DISTRIBUTIONS}")
+        self.distribution = distribution
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        
+    def sample(self, mean_ms: float) -> float:
+        """Latência sorteada, em segundos (0 se a média for 0)."""
+        if mean_ms <= 0:
+            return 0.0
+        with self._lock:
+            if self.distribution == "uniform":
+                value = mean_ms * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+            elif self.distribution == "normal":
+                value = self._random.gauss(mean_ms, mean_ms * self.jitter)
+            elif self.distribution == "lognormal":
+                # Média mean_ms e desvio relativo jitter (cauda longa, como latências reais)
+                sigma = math.sqrt(math.log(1 + self.jitter ** 2))
+                value = self._random.lognormvariate(math.log(mean_ms) - sigma ** 2 / 2, sigma)
+            else:
+                value = mean_ms
+        return max(0.0, value) / 1000
+        
+    def sleep(self, mean_ms: float) -> float:
+        """Espera uma latência sorteada e retorna quanto esperou (segundos)."""
+        delay = self.sample(mean_ms)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+def hash_embedding(text: str, dim: int, model: str = "") -> List[float]:
+    """
+    Embedding determinístico por hashing das palavras (feature hashing).
+    
+    Cada palavra soma ±1 em uma posição escolhida pelo hash (modelo, palavra);
+    o vetor é normalizado. Textos sem palavras usam o hash do texto inteiro.
+    
+    Args:
+        text: Texto a embedar
+        dim: Dimensão do vetor
+        model: Nome do modelo (modelos diferentes geram vetores diferentes)
+        
+    Returns:
+        Vetor de norma 1
+    """
+    vector = [0.0] * dim
+    tokens = WORD_PATTERN.findall(text.lower()) or [text]
+    for token in tokens:
+        digest = hashlib.blake2b(f"{model}\0{token}".encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'little')
+        vector[value % dim] += 1.0 if value >> 63 else -1.0
+    
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class FakeOllama:
+    """Respostas e latências do servidor falso (independente do HTTP)."""
+    
+    def __init__(
+        self,
+        dim: int = 1024,
+        latency: Optional[LatencyModel] = None,
+        embed_latency_ms: float = 0.0,
+        embed_item_latency_ms: float = 0.0,
+        chat_latency_ms: float = 0.0,
+        tokens_per_second: float = 0.0,
+        response_words: int = 80,
+        load_ms: float = 0.0,
+        models: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            dim: Dimensão dos embeddings (mxbai-embed-large: 1024)
+            latency: Distribuição das latências (padrão: fixa)
+            embed_latency_ms: Latência média de cada requisição de embedding
+            embed_item_latency_ms: Latência média adicional por texto embedado
+            chat_latency_ms: Latência média até o primeiro token do chat/generate
+            tokens_per_second: Velocidade de geração (0: resposta instantânea)
+            response_words: Palavras das respostas em texto livre
+            load_ms: Latência média de carregamento de um modelo descarregado
+            models: Modelos listados em /api/tags (qualquer nome é aceito)
+        """
+        self.dim = dim
+        self.latency = latency or LatencyModel()
+        self.embed_latency_ms = embed_latency_ms
+        self.embed_item_latency_ms = embed_item_latency_ms
+        self.chat_latency_ms = chat_latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.response_words = response_words
+        self.load_ms = load_ms
+        self.models = models or ["mxbai-embed-large", "qwen3:30b"]
+        
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': {}, 'embedded_texts': 0, 'generated_tokens': 0, 'model_loads': 0}
+        # Modelo -> instante (time.monotonic) em que é descarregado
+        self._loaded_until: Dict[str, float] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        
+    def count(self, route: str, embedded: int = 0, generated: int = 0):
+        """Atualiza os contadores de /fake/stats."""
+        with self._stats_lock:
+            self.stats['requests'][route] = self.stats['requests'].get(route, 0) + 1
+            self.stats['embedded_texts'] += embedded
+            self.stats['generated_tokens'] += generated
+            
+    def load(self, model: str, keep_alive: Any = None) -> float:
+        """
+        Carrega o modelo se ele não estiver carregado e renova o keep_alive.
+        
+        Returns:
+            Tempo gasto carregando, em segundos (0 se já estava carregado)
+        """
+        with self._stats_lock:
+            model_lock = self._load_locks.setdefault(model, threading.Lock())
+        
+        # Requisições simultâneas esperam um único carregamento, como no Ollama
+        with model_lock:
+            loaded = self._loaded_until.get(model, 0.0) > time.monotonic()
+            delay = 0.0
+            if not loaded and self.load_ms > 0:
+                delay = self.latency.sleep(self.load_ms)
+            with self._stats_lock:
+                self.stats['model_loads'] += int(not loaded)
+                self._loaded_until[model] = time.monotonic() + parse_keep_alive(keep_alive)
+        return delay
+        
+    def embed(
+        self,
+        model: str,
+        texts: List[str],
+        dimensions: Optional[int] = None,
+        keep_alive: Any = None
+    ) -> Dict[str, Any]:
+        """Resposta de /api/embed."""
+        start = time.perf_counter()
+        load_seconds = self.load(model, keep_alive)
+        self.latency.sleep(self.embed_latency_ms + self.embed_item_latency_ms * len(texts))
+        dim = dimensions or self.dim
+        embeddings = [hash_embedding(text, dim, model) for text in texts]
+        self.count('/api/embed', embedded=len(texts))
+        return {
+            'model': model,
+            'embeddings': embeddings,
+            'total_duration': int((time.perf_counter() - start) * 1e9),
+            'load_duration': int(load_seconds * 1e9),
+            'prompt_eval_count': sum(len(WORD_PATTERN.findall(text)) for text in texts),
+        }
+        
+    @staticmethod
+    def _prompt(messages: List[Dict[str, Any]]) -> str:
+        """Texto da última mensagem do usuário."""
+        for message in reversed(messages):
+            if message.get('role') == 'user':
+                return message.get('content') or ''
+        return messages[-1].get('content', '') if messages else ''
+        
+    def reply(self, model: str, prompt: str, json_output: bool) -> str:
+        """
+        Resposta determinística a um prompt.
+        
+        Reconhece os prompts do projeto: o plano do agente (RAGAgent.plan_actions)
+        e a análise de sentimento (QueryTools); com json_output, os demais
+        recebem um JSON genérico e, sem, texto livre.
+        """
+        if '"actions"' in prompt:
+            match = re.search(r'Pergunta do usuário: "(.*?)"\n', prompt, re.DOTALL)
+            question = match.group(1) if match else prompt[-200:]
+            return json.dumps({
+                'reasoning': "Plano simulado (fake_ollama): busca semântica pela pergunta",
+                'actions': [{'tool': 'semantic_search', 'params': {'query': question, 'n_results': 5}}],
+            }, ensure_ascii=False)
+        
+        if 'positive_count' in prompt:
+            n_posts = len(re.findall(r'^Post \d+ ', prompt, re.MULTILINE))
+            return json.dumps({
+                'sentiment_summary': "Análise simulada (fake_ollama): tom predominantemente neutro.",
+                'positive_count': 0,
+                'negative_count': 0,
+                'neutral_count': n_posts,
+                'key_points': ["Resposta gerada pelo servidor falso"],
+                'positive_aspects': [],
+                'negative_aspects': [],
+            }, ensure_ascii=False)
+        
+        # Texto pseudoaleatório, mas fixo para o mesmo (modelo, prompt)
+        rng = random.Random(hashlib.sha256(f"{model}\0{prompt}".encode('utf-8')).digest())
+        vocabulary = WORD_PATTERN.findall(prompt) or ["resposta"]
+        words = [rng.choice(vocabulary) for _ in range(self.response_words)]
+        text = "Resposta simulada (fake_ollama): " + " ".join(words) + "."
+        if json_output:
+            return json.dumps({'response': text}, ensure_ascii=False)
+        return text
+        
+    def generate(self, route: str, model: str, prompt: str, json_output: bool) -> Iterator[str]:
+        """
+        Gera a resposta em pedaços, respeitando as latências configuradas.
+        
+        Yields:
+            Pedaços do texto (uma palavra por vez quando há tokens_per_second)
+        """
+        self.latency.sleep(self.chat_latency_ms)
+        text = self.reply(model, prompt, json_output)
+        pieces = re.findall(r"\S+\s*", text) or [text]
+        self.count(route, generated=len(pieces))
+        
+        if self.tokens_per_second <= 0:
+            yield text
+            return
+        for piece in pieces:
+            self.latency.sleep(1000 / self.tokens_per_second)
+            yield piece
+
+
+def _timestamp() -> str:
+    """Data atual no formato de created_at do Ollama."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Rotas HTTP do Ollama sobre um FakeOllama (self.server.fake)."""
+    
+    protocol_version = "HTTP/1.1"  # keep-alive, como o Ollama
+    server_version = "fake-ollama"
+    
+    def log_message(self, format, *args):
+        """Só registra requisições com --verbose."""
+        if self.server.verbose:
+            super().log_message(format, *args)
+            
+    def _body(self) -> Dict[str, Any]:
+        """Corpo JSON da requisição."""
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+        
+    def _send_json(self, payload: Any, status: int = 200):
+        """Resposta JSON com Content-Length (mantém a conexão aberta)."""
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        
+    def _send_stream(self, chunks: Iterator[Dict[str, Any]]):
+        """Resposta NDJSON com Transfer-Encoding: chunked (streaming do Ollama)."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in chunks:
+            data = (json.dumps(chunk, ensure_ascii=False) + "\n").encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+        
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        
+    def do_GET(self):
+        fake: FakeOllama = self.server.fake
+        if self.path == '/':
+            data = b"Ollama is running"
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif self.path == '/api/version':
+            self._send_json({'version': '0.0.0-fake'})
+        elif self.path == '/api/tags':
+            self._send_json({'models': [
+                {
+                    'name': model, 'model': model, 'modified_at': _timestamp(), 'size': 0,
+                    'digest': hashlib.sha256(model.encode()).hexdigest(),
+                    'details': {'format': 'fake', 'family': 'fake', 'parameter_size': '0', 'quantization_level': 'F32'},
+                }
+                for model in fake.models
+            ]})
+        elif self.path == '/api/ps':
+            self._send_json({'models': []})
+        elif self.path == '/fake/stats':
+            with fake._stats_lock:
+                self._send_json(json.loads(json.dumps(fake.stats)))
+        else:
+            self._send_json({'error': f"rota não encontrada: {self.path}"}, status=404)
+            
+    def do_POST(self):
+        fake: FakeOllama = self.server.fake
+        try:
+            body = self._body()
+        except json.JSONDecodeError as e:
+            self._send_json({'error': f"JSON inválido: {e}"}, status=400)
+            return
+        model = body.get('model', '')
+        
+        if self.path == '/api/embed':
+            texts = body.get('input', [])
+            texts = [texts] if isinstance(texts, str) else texts
+            self._send_json(fake.embed(model, texts, body.get('dimensions'), body.get('keep_alive')))
+        elif self.path == '/api/embeddings':
+            result = fake.embed(model, [body.get('prompt', '')], keep_alive=body.get('keep_alive'))
+            self._send_json({'embedding': result['embeddings'][0]})
+        elif self.path in ('/api/chat', '/api/generate'):
+            self._generate(fake, body, model)
+        elif self.path == '/api/pull':
+            if body.get('stream', True):
+                self._send_stream(iter([{'status': 'success'}]))
+            else:
+                self._send_json({'status': 'success'})
+        elif self.path == '/api/show':
+            self._send_json({
+                'modelfile': '', 'parameters': '', 'template': '',
+                'details': {'format': 'fake', 'family': 'fake'},
+                'model_info': {'general.architecture': 'fake', 'fake.embedding_length': fake.dim},
+            })
+        else:
+            self._send_json({'error': f"rota não encontrada: {self.path}"}, status=404)
+            
+    def _generate(self, fake: FakeOllama, body: Dict[str, Any], model: str):
+        """/api/chat e /api/generate, com ou sem streaming."""
+        chat = self.path == '/api/chat'
+        prompt = fake._prompt(body.get('messages', [])) if chat else body.get('prompt', '')
+        json_output = bool(body.get('format'))
+        start = time.perf_counter()
+        load_seconds = fake.load(model, body.get('keep_alive'))
+        
+        # Sem mensagens (ou prompt): só carrega o modelo, como o Ollama
+        empty = not body.get('messages') if chat else not prompt
+        pieces = iter(()) if empty else fake.generate(self.path, model, prompt, json_output)
+        
+        def chunk(content: str, done: bool) -> Dict[str, Any]:
+            payload = {'model': model, 'created_at': _timestamp(), 'done': done}
+            if chat:
+                payload['message'] = {'role': 'assistant', 'content': content}
+            else:
+                payload['response'] = content
+            return payload
+            
+        def final(content: str, eval_count: int) -> Dict[str, Any]:
+            payload = chunk(content, True)
+            payload.update({
+                'done_reason': 'load' if empty else 'stop',
+                'total_duration': int((time.perf_counter() - start) * 1e9),
+                'load_duration': int(load_seconds * 1e9),
+                'prompt_eval_count': len(WORD_PATTERN.findall(prompt)),
+                'eval_count': eval_count,
+            })
+            return payload
+        
+        if body.get('stream', True):
+            def stream():
+                count = 0
+                for piece in pieces:
+                    count += 1
+                    yield chunk(piece, False)
+                yield final('', count)
+            self._send_stream(stream())
+        else:
+            collected = list(pieces)
+            self._send_json(final(''.join(collected), len(collected)))
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """Servidor HTTP com um FakeOllama (atributos fake e verbose)."""
+    
+    daemon_threads = True
+    # Fila de conexões pendentes: com o padrão (5), rajadas de clientes
+    # concorrentes (ex: asyncio.gather) perdem conexões e esperam ~1 s pela
+    # retransmissão do TCP
+    request_queue_size = 128
+    
+    def handle_error(self, request, client_address):
+        """Ignora clientes que desistem da resposta (ex: timeout do cliente)."""
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+def make_server(fake: FakeOllama, host: str = "127.0.0.1", port: int = 11435, verbose: bool = False) -> FakeOllamaServer:
+    """
+    Cria o servidor HTTP (não inicia; use serve_forever, ex: em uma thread).
+    
+    Args:
+        fake: Respostas e latências
+        host: Endereço de escuta
+        port: Porta (0: escolhe uma livre, ver server.server_address)
+        verbose: Se True, registra cada requisição no terminal
+    """
+    server = FakeOllamaServer((host, port), FakeOllamaHandler)
+    server.fake = fake
+    server.verbose = verbose
+    return server
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Servidor falso com a API do Ollama (benchmarks e testes)")
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    parser.add_argument("--port", type=int, default=11435, help="Porta (o Ollama real usa 11434)")
+    parser.add_argument("--dim", type=int, default=1024, help="Dimensão dos embeddings")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Latência média por requisição de embedding")
+    parser.add_argument("--embed-item-latency-ms", type=float, default=0.0, help="Latência média adicional por texto embedado")
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0, help="Latência média até o primeiro token")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Velocidade de geração (0: instantânea)")
+    parser.add_argument(
+        "--distribution",
+        choices=LatencyModel.DISTRIBUTIONS,
+        default="fixed",
+        help="Distribuição das latências"
+    )
+    parser.add_argument("--jitter", type=float, default=0.25, help="Dispersão relativa das latências")
+    parser.add_argument("--seed", type=int, default=None, help="Semente do sorteio das latências")
+    parser.add_argument("--response-words", type=int, default=80, help="Palavras das respostas em texto livre")
+    parser.add_argument("--load-ms", type=float, default=0.0, help="Latência média de carregamento de um modelo ocioso")
+    parser.add_argument("--verbose", action="store_true", help="Registra cada requisição")
+    args = parser.parse_args()
+    
+    fake = FakeOllama(
+        dim=args.dim,
+        latency=LatencyModel(args.distribution, args.jitter, args.seed),
+        embed_latency_ms=args.embed_latency_ms,
+        embed_item_latency_ms=args.embed_item_latency_ms,
+        chat_latency_ms=args.chat_latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        response_words=args.response_words,
+        load_ms=args.load_ms
+    )
+    server = make_server(fake, args.host, args.port, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"🤖 Ollama falso em http://{host}:{port} (embeddings dim {args.dim}, latências {args.distribution})")
+    print(f"💡 Use com: OLLAMA_HOST=http://{host}:{port} uv run python index_posts.py")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n📊 Requisições: {fake.stats['requests']}")
+        print(
+            f"   Textos embedados: {fake.stats['embedded_texts']} | tokens gerados: {fake.stats['generated_tokens']} | "
+            f"carregamentos de modelo: {fake.stats['model_loads']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Checkpoint de indexação: permite retomar uma indexação interrompida.
+
+Cada coleção tem dois arquivos em <persist_dir>/checkpoints/:
+- <coleção>.json: manifesto com status ('running' ou 'complete'), o retrato
+  dos arquivos de origem (mtime/tamanho por perfil), a configuração usada e,
+  se houver, os perfis que não puderam ser lidos ('failed_profiles').
+  Gravado de forma atômica (arquivo temporário + os.replace).
+- <coleção>.ids: ids já gravados na coleção durante a execução atual, um por
+  linha, acrescentados (com fsync) após cada lote. Uma linha incompleta no
+  final (processo morto no meio da escrita) é ignorada.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+
+
+class IndexCheckpoint:
+    """Manifesto e registro de ids gravados de uma coleção."""
+    
+    FORMAT_VERSION = 1
+    
+    def __init__(self, checkpoint_dir: str, name: str):
+        """
+        Inicializa o checkpoint.
+        
+        Args:
+            checkpoint_dir: Diretório dos checkpoints
+            name: Nome da coleção
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.name = name
+        self.path = self.checkpoint_dir / f"{name}.json"
+        self.ids_path = self.checkpoint_dir / f"{name}.ids"
+        self._manifest: Optional[Dict[str, Any]] = None
+        
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Lê o manifesto.
+        
+        Returns:
+            Manifesto, ou None se não existir ou for ilegível
+        """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if manifest.get('version') != self.FORMAT_VERSION:
+            return None
+        
+        self._manifest = manifest
+        return manifest
+        
+    def matches(self, manifest: Dict[str, Any], snapshot: Dict[str, Any], config: Dict[str, Any]) -> bool:
+        """Indica se o manifesto foi gerado a partir das mesmas fontes e configuração."""
+        return manifest.get('snapshot') == snapshot and manifest.get('config') == config
+        
+    def _write(self, manifest: Dict[str, Any]):
+        """Grava o manifesto de forma atômica."""
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        manifest['updated_at'] = datetime.now(timezone.utc).isoformat()
+        
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._manifest = manifest
+        
+    def start(self, snapshot: Dict[str, Any], config: Dict[str, Any]):
+        """
+        Inicia uma nova execução (descarta ids registrados anteriormente).
+        
+        Args:
+            snapshot: Retrato dos arquivos de origem
+            config: Configuração que afeta os documentos (modelo, chunker...)
+        """
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.ids_path.write_text('', encoding='utf-8')
+        self._write({
+            'version': self.FORMAT_VERSION,
+            'collection': self.name,
+            'status': 'running',
+            'snapshot': snapshot,
+            'config': config,
+            'committed': 0,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+        })
+        
+    def record(self, ids: List[str]):
+        """
+        Registra ids gravados na coleção (chamado após cada lote).
+        
+        Args:
+            ids: Ids do lote recém-gravado
+        """
+        with open(self.ids_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(f"{doc_id}\n" for doc_id in ids))
+            f.flush()
+            os.fsync(f.fileno())
+        
+        manifest = self._manifest or self.load()
+        if manifest is not None:
+            manifest['committed'] = manifest.get('committed', 0) + len(ids)
+            self._write(manifest)
+            
+    def committed_ids(self) -> Set[str]:
+        """
+        Retorna os ids registrados na execução atual.
+        
+        Returns:
+            Conjunto de ids (linhas completas do arquivo .ids)
+        """
+        try:
+            content = self.ids_path.read_text(encoding='utf-8')
+        except OSError:
+            return set()
+        
+        lines = content.split('\n')
+        # Última linha sem '\n' final: escrita interrompida
+        return {line for line in lines[:-1] if line}
+        
+    def complete(self, snapshot: Dict[str, Any], config: Dict[str, Any], total: int):
+        """
+        Marca a coleção como sincronizada com o retrato informado.
+        
+        Args:
+            snapshot: Retrato dos arquivos de origem
+            config: Configuração usada
+            total: Total de documentos na coleção
+        """
+        manifest = self._manifest or self.load() or {
+            'version': self.FORMAT_VERSION,
+            'collection': self.name,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+        }
+        manifest.update({
+            'status': 'complete',
+            'snapshot': snapshot,
+            'config': config,
+            'committed': total,
+        })
+        manifest.pop('failed_profiles', None)
+        self._write(manifest)
+        
+        try:
+            self.ids_path.unlink()
+        except FileNotFoundError:
+            pass
+            
+    def mark_incomplete(self, snapshot: Dict[str, Any], config: Dict[str, Any], failed_profiles: Set[str]):
+        """
+        Termina a execução sem marcar a coleção como sincronizada.
+        
+        Usado quando algum perfil não pôde ser lido: o status continua
+        'running', então a próxima indexação tenta de novo em vez de dar o
+        índice como completo.
+        
+        Args:
+            snapshot: Retrato dos arquivos de origem
+            config: Configuração usada
+            failed_profiles: Perfis cuja leitura falhou
+        """
+        manifest = self._manifest or self.load() or {
+            'version': self.FORMAT_VERSION,
+            'collection': self.name,
+            'committed': 0,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+        }
+        manifest.update({
+            'status': 'running',
+            'snapshot': snapshot,
+            'config': config,
+            'failed_profiles': sorted(failed_profiles),
+        })
+        self._write(manifest)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Script de indexação dos posts (e comentários) no ChromaDB.
+
+Indexações interrompidas são retomadas automaticamente a partir do checkpoint
+em <chroma_dir>/checkpoints/. Com --verify, apenas compara os arquivos de
+origem com a coleção e lista as lacunas, sem alterar nada.
+
+Uso:
+    uv run python index_posts.py                  # indexa (ou retoma) posts
+    uv run python index_posts.py --incremental    # sincroniza pelos hashes
+    uv run python index_posts.py --upsert         # grava por cima, sem remover nada
+    uv run python index_posts.py --force          # limpa e re-indexa tudo
+    uv run python index_posts.py --verify         # relatório de lacunas
+    uv run python index_posts.py --comments       # também indexa comentários
+"""
+
+import argparse
+import sys
+
+from rag_system import RAGSystem
+from text_chunker import PostChunker
+
+
+def print_verify_report(report: dict, max_ids: int = 10) -> bool:
+    """
+    Imprime o relatório de verificação.
+    
+    Returns:
+        True se a coleção está em dia com os arquivos
+    """
+    print(f"\n🔎 Coleção '{report['collection']}' (checkpoint: {report['checkpoint']})")
+    print(f"  Documentos nas fontes: {report['source_documents']}")
+    print(f"  Documentos na coleção: {report['indexed_documents']}")
+    
+    problems = [
+        ('missing', "Faltando na coleção"),
+        ('stale_content', "Texto desatualizado"),
+        ('stale_metadata', "Metadados desatualizados"),
+        ('extra', "Sobrando na coleção (não existem mais nas fontes)"),
+    ]
+    
+    ok = True
+    for key, title in problems:
+        ids = report[key]
+        if not ids:
+            continue
+        ok = False
+        print(f"  ✗ {title}: {len(ids)}")
+        for doc_id in ids[:max_ids]:
+            print(f"    - {doc_id}")
+        if len(ids) > max_ids:
+            print(f"    ... e mais {len(ids) - max_ids}")
+    
+    if ok:
+        print("  ✅ Coleção em dia com os arquivos")
+    else:
+        print("  💡 Corrija com: python index_posts.py --incremental")
+    return ok
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Indexação dos posts do Instagram no ChromaDB")
+    parser.add_argument(
+        "--embedding-model",
+        default="mxbai-embed-large",
+        help="Modelo Ollama para embeddings"
+    )
+    parser.add_argument(
+        "--data-dir",
+        default="data",
+        help="Diretório com os JSONs dos perfis"
+    )
+    parser.add_argument(
+        "--chroma-dir",
+        default="./chroma_db",
+        help="Diretório do ChromaDB"
+    )
+    parser.add_argument(
+        "--vector-backend",
+        choices=["chroma", "numpy"],
+        default="chroma",
+        help="Banco vetorial: ChromaDB ou busca exata em NumPy"
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=["float32", "float16", "int8"],
+        default="float32",
+        help="Formato dos vetores no backend numpy (vale para coleções criadas; use com --force)"
+    )
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        help="Com --quantization: guarda também os vetores float32 para reordenar os candidatos (mais disco)"
+    )
+    parser.add_argument(
+        "--matryoshka-dim",
+        type=int,
+        default=None,
+        help="Backend numpy: guarda também vetores truncados nesta dimensão (ex: 256) para a busca rápida"
+    )
+    parser.add_argument(
+        "--shard-by-profile",
+        action="store_true",
+        help="Uma coleção por perfil: buscas filtradas só consultam o perfil (índice separado do comum)"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--force",
+        action="store_true",
+        help="Limpa a coleção e re-indexa tudo"
+    )
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Embeda só o que mudou e remove o que sumiu dos arquivos"
+    )
+    mode.add_argument(
+        "--upsert",
+        action="store_true",
+        help="Grava os documentos sobre a coleção existente, embedando só o que mudou, sem remover nada"
+    )
+    mode.add_argument(
+        "--verify",
+        action="store_true",
+        help="Só compara arquivos e coleção e lista as lacunas"
+    )
+    parser.add_argument(
+        "--comments",
+        action="store_true",
+        help="Também processa a coleção de comentários"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Divide posts longos em trechos com este número de caracteres"
+    )
+    parser.add_argument(
+        "--chunk-overlap",
+        type=int,
+        default=None,
+        help="Sobreposição entre trechos, em caracteres (padrão: o menor entre 200 e 1/4 de --chunk-size)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Threads gerando embeddings em paralelo"
+    )
+    
+    args = parser.parse_args()
+    if args.quantization != "float32" and args.vector_backend != "numpy":
+        parser.error("--quantization exige --vector-backend numpy")
+    if args.rescore and args.quantization == "float32":
+        parser.error("--rescore exige --quantization float16 ou int8")
+    if args.matryoshka_dim and args.vector_backend != "numpy":
+        parser.error("--matryoshka-dim exige --vector-backend numpy")
+    if args.chunk_overlap is not None and not args.chunk_size:
+        parser.error("--chunk-overlap exige --chunk-size")
+    chunker = None
+    if args.chunk_size is not None:
+        overlap = args.chunk_overlap if args.chunk_overlap is not None else min(200, args.chunk_size // 4)
+        if args.chunk_size <= 1:
+            parser.error("--chunk-size deve ser maior que 1")
+        if not 0 <= overlap < args.chunk_size // 2:
+            parser.error("--chunk-overlap deve estar entre 0 e metade de --chunk-size")
+        chunker = PostChunker(max_chars=args.chunk_size, overlap=overlap)
+    
+    rag = RAGSystem(
+        embedding_model=args.embedding_model,
+        data_dir=args.data_dir,
+        chroma_dir=args.chroma_dir,
+        chunker=chunker,
+        embed_workers=args.workers,
+        vector_backend=args.vector_backend,
+        vector_quantization=args.quantization,
+        vector_keep_full_precision=args.rescore,
+        matryoshka_dim=args.matryoshka_dim,
+        shard_by_profile=args.shard_by_profile
+    )
+    
+    if args.verify:
+        ok = print_verify_report(rag.verify_index())
+        if args.comments:
+            ok = print_verify_report(rag.verify_index(comments=True)) and ok
+        sys.exit(0 if ok else 1)
+    
+    rag.index_all_posts(force_reindex=args.force, incremental=args.incremental, upsert=args.upsert)
+    if args.comments:
+        rag.index_comments(force_reindex=args.force, incremental=args.incremental, upsert=args.upsert)
+
+
+if __name__ == "__main__":
+    main()
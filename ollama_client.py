@@ -0,0 +1,381 @@
+"""
+Cliente Ollama compartilhado entre os componentes.
+
+As funções de módulo do pacote ollama (ollama.embed, ollama.chat) usam um
+cliente padrão sem timeout e sem keep_alive: cada componente fica sem controle
+de tempo de resposta e o servidor descarrega os modelos entre consultas
+esparsas (a próxima chamada espera o modelo recarregar). OllamaClient reúne:
+
+- um pool de conexões HTTP (keep-alive) compartilhado por todas as chamadas
+- timeouts por tipo de chamada (embedding e chat) e por chamada (timeout=...)
+- keep_alive enviado em toda requisição (tempo que o modelo fica carregado)
+  e preload dos modelos na inicialização
+- métricas por operação e modelo: latências (média, p50, p95), erros e
+  recargas de modelo (load_duration acima de reload_threshold)
+
+EmbeddingManager, QueryTools, RAGSystem e RAGAgent recebem o cliente por
+parâmetro (ollama_client); sem ele, usam default_client(), uma instância
+única por processo.
+
+aembed e achat são as versões assíncronas (asyncio) de embed e chat, sobre
+ollama.AsyncClient: aguardam a resposta sem ocupar uma thread. Conexões
+assíncronas pertencem a um event loop, então cada loop tem seu próprio pool
+(mesmos limites e timeouts); as métricas são as mesmas das chamadas síncronas.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional, Union
+
+import httpx
+import ollama
+
+
+class OllamaClient:
+    """Cliente Ollama com pool de conexões, timeouts, keep_alive e métricas."""
+    
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        embed_timeout: Optional[float] = 120.0,
+        chat_timeout: Optional[float] = 600.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 16,
+        keep_alive: Optional[Union[str, float]] = "30m",
+        reload_threshold: float = 0.5,
+        latency_window: int = 1000
+    ):
+        """
+        Inicializa o cliente (as conexões são abertas sob demanda).
+        
+        Args:
+            host: Endereço do Ollama (padrão: variável OLLAMA_HOST ou localhost:11434)
+            embed_timeout: Timeout, em segundos, das requisições de embedding
+                (None: sem limite)
+            chat_timeout: Timeout, em segundos, das requisições de chat
+                (sem streaming: a resposta inteira; com streaming: cada leitura)
+            connect_timeout: Timeout, em segundos, para abrir uma conexão
+            max_connections: Conexões simultâneas (e mantidas abertas) no pool
+            keep_alive: Tempo que o servidor mantém o modelo carregado após cada
+                chamada (ex: "30m", 3600, -1 para sempre; None: padrão do servidor)
+            reload_threshold: load_duration, em segundos, a partir do qual uma
+                resposta conta como recarga do modelo nas métricas
+            latency_window: Latências guardadas por operação para p50/p95
+        """
+        self.host = host
+        self.embed_timeout = embed_timeout
+        self.chat_timeout = chat_timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        # "-1" / "3600" vindos da linha de comando: o Ollama só aceita número ou duração com unidade
+        if isinstance(keep_alive, str) and keep_alive.lstrip('-').isdigit():
+            keep_alive = int(keep_alive)
+        self.keep_alive = keep_alive
+        self.reload_threshold = reload_threshold
+        self.latency_window = latency_window
+        
+        # Um transporte (pool de conexões) compartilhado pelos clientes de cada timeout
+        self._transport = httpx.HTTPTransport(limits=self._limits())
+        self._clients: Dict[Optional[float], ollama.Client] = {}
+        # Event loop -> (transporte assíncrono, clientes por timeout)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        
+    def _limits(self) -> httpx.Limits:
+        """Limites do pool de conexões."""
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        
+    def _client(self, timeout: Optional[float]) -> ollama.Client:
+        """Cliente ollama com o timeout dado, sobre o pool compartilhado."""
+        with self._lock:
+            if timeout not in self._clients:
+                self._clients[timeout] = ollama.Client(
+                    host=self.host,
+                    timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+                    transport=self._transport
+                )
+            return self._clients[timeout]
+            
+    def _async_client(self, timeout: Optional[float]) -> ollama.AsyncClient:
+        """Cliente ollama assíncrono com o timeout dado, sobre o pool do event loop atual."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_clients:
+                self._async_clients[loop] = (httpx.AsyncHTTPTransport(limits=self._limits()), {})
+            transport, clients = self._async_clients[loop]
+            if timeout not in clients:
+                clients[timeout] = ollama.AsyncClient(
+                    host=self.host,
+                    timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+                    transport=transport
+                )
+            return clients[timeout]
+            
+    def _record(self, operation: str, model: str, seconds: float, response: Any = None, error: bool = False):
+        """Registra uma chamada nas métricas."""
+        load_seconds = (response.get('load_duration') or 0) / 1e9 if response is not None else 0.0
+        with self._lock:
+            entry = self._metrics.setdefault(f"{operation} {model}", {
+                'requests': 0,
+                'errors': 0,
+                'total_seconds': 0.0,
+                'latencies': deque(maxlen=self.latency_window),
+                'reloads': 0,
+                'reload_seconds': 0.0,
+            })
+            entry['requests'] += 1
+            entry['errors'] += int(error)
+            entry['total_seconds'] += seconds
+            entry['latencies'].append(seconds)
+            if load_seconds >= self.reload_threshold:
+                entry['reloads'] += 1
+                entry['reload_seconds'] += load_seconds
+                
+    def _call(self, operation: str, model: str, timeout: Optional[float], **kwargs):
+        """Executa embed/chat medindo a latência (sem streaming)."""
+        start = time.perf_counter()
+        try:
+            response = getattr(self._client(timeout), operation)(model=model, **kwargs)
+        except Exception:
+            self._record(operation, model, time.perf_counter() - start, error=True)
+            raise
+        self._record(operation, model, time.perf_counter() - start, response)
+        return response
+        
+    async def _acall(self, operation: str, model: str, timeout: Optional[float], **kwargs):
+        """Versão assíncrona de _call."""
+        start = time.perf_counter()
+        try:
+            response = await getattr(self._async_client(timeout), operation)(model=model, **kwargs)
+        except Exception:
+            self._record(operation, model, time.perf_counter() - start, error=True)
+            raise
+        self._record(operation, model, time.perf_counter() - start, response)
+        return response
+        
+    def _measured_stream(self, model: str, chunks: Iterator[Any], start: float) -> Iterator[Any]:
+        """Repassa os pedaços de um chat em streaming e registra a chamada ao final."""
+        last = None
+        try:
+            for chunk in chunks:
+                last = chunk
+                yield chunk
+        except Exception:
+            self._record('chat', model, time.perf_counter() - start, error=True)
+            raise
+        self._record('chat', model, time.perf_counter() - start, last)
+        
+    async def _ameasured_stream(self, model: str, chunks: AsyncIterator[Any], start: float) -> AsyncIterator[Any]:
+        """Versão assíncrona de _measured_stream."""
+        last = None
+        try:
+            async for chunk in chunks:
+                last = chunk
+                yield chunk
+        except Exception:
+            self._record('chat', model, time.perf_counter() - start, error=True)
+            raise
+        self._record('chat', model, time.perf_counter() - start, last)
+        
+    def embed(self, model: str, input, timeout: Optional[float] = None, **kwargs):
+        """
+        Embeddings de um texto ou lista de textos (/api/embed).
+        
+        Args:
+            model: Modelo de embedding
+            input: Texto ou lista de textos
+            timeout: Timeout desta chamada (padrão: embed_timeout)
+            **kwargs: Demais argumentos de ollama.Client.embed
+            
+        Returns:
+            Resposta do Ollama (campo 'embeddings')
+        """
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        return self._call('embed', model, timeout or self.embed_timeout, input=input, **kwargs)
+        
+    def chat(self, model: str, messages, stream: bool = False, timeout: Optional[float] = None, **kwargs):
+        """
+        Chat com um modelo (/api/chat).
+        
+        Args:
+            model: Modelo de geração
+            messages: Mensagens da conversa
+            stream: Se True, retorna um iterador de pedaços da resposta
+            timeout: Timeout desta chamada (padrão: chat_timeout)
+            **kwargs: Demais argumentos de ollama.Client.chat (format, options...)
+            
+        Returns:
+            Resposta do Ollama (campo 'message') ou iterador de pedaços
+        """
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        if not stream:
+            return self._call('chat', model, timeout or self.chat_timeout, messages=messages, **kwargs)
+        
+        start = time.perf_counter()
+        try:
+            chunks = self._client(timeout or self.chat_timeout).chat(
+                model=model, messages=messages, stream=True, **kwargs
+            )
+        except Exception:
+            self._record('chat', model, time.perf_counter() - start, error=True)
+            raise
+        return self._measured_stream(model, chunks, start)
+        
+    async def aembed(self, model: str, input, timeout: Optional[float] = None, **kwargs):
+        """
+        Versão assíncrona de embed (ollama.AsyncClient).
+        
+        Args:
+            model: Modelo de embedding
+            input: Texto ou lista de textos
+            timeout: Timeout desta chamada (padrão: embed_timeout)
+            **kwargs: Demais argumentos de ollama.AsyncClient.embed
+            
+        Returns:
+            Resposta do Ollama (campo 'embeddings')
+        """
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        return await self._acall('embed', model, timeout or self.embed_timeout, input=input, **kwargs)
+        
+    async def achat(self, model: str, messages, stream: bool = False, timeout: Optional[float] = None, **kwargs):
+        """
+        Versão assíncrona de chat (ollama.AsyncClient).
+        
+        Args:
+            model: Modelo de geração
+            messages: Mensagens da conversa
+            stream: Se True, retorna um iterador assíncrono de pedaços da resposta
+            timeout: Timeout desta chamada (padrão: chat_timeout)
+            **kwargs: Demais argumentos de ollama.AsyncClient.chat (format, options...)
+            
+        Returns:
+            Resposta do Ollama (campo 'message') ou iterador assíncrono de pedaços
+        """
+        kwargs.setdefault('keep_alive', self.keep_alive)
+        if not stream:
+            return await self._acall('chat', model, timeout or self.chat_timeout, messages=messages, **kwargs)
+        
+        start = time.perf_counter()
+        try:
+            chunks = await self._async_client(timeout or self.chat_timeout).chat(
+                model=model, messages=messages, stream=True, **kwargs
+            )
+        except Exception:
+            self._record('chat', model, time.perf_counter() - start, error=True)
+            raise
+        return self._ameasured_stream(model, chunks, start)
+        
+    def list(self):
+        """Modelos instalados (/api/tags)."""
+        return self._client(self.chat_timeout).list()
+        
+    def pull(self, model: str):
+        """Baixa um modelo (/api/pull, sem timeout)."""
+        return self._client(None).pull(model)
+        
+    def preload(
+        self,
+        chat_models: Iterable[str] = (),
+        embedding_models: Iterable[str] = (),
+        background: bool = True
+    ) -> Optional[threading.Thread]:
+        """
+        Carrega modelos no servidor antes da primeira consulta.
+        
+        Modelos de chat são carregados com uma conversa vazia; os de embedding,
+        com o embedding de um texto curto. Ambos recebem o keep_alive do cliente.
+        Falhas só são avisadas (a consulta seguinte carrega o modelo).
+        
+        Args:
+            chat_models: Modelos de geração
+            embedding_models: Modelos de embedding
+            background: Se True, carrega em uma thread e retorna sem esperar
+            
+        Returns:
+            A thread do carregamento (com background=True) ou None
+        """
+        chat_models = list(dict.fromkeys(chat_models))
+        embedding_models = list(dict.fromkeys(embedding_models))
+        
+        def load():
+            for model in embedding_models:
+                try:
+                    self.embed(model, "preload")
+                    print(f"✓ Modelo {model} carregado no Ollama")
+                except Exception as e:
+                    print(f"⚠️  Não foi possível carregar {model}: {e}")
+            for model in chat_models:
+                try:
+                    self.chat(model, [])
+                    print(f"✓ Modelo {model} carregado no Ollama")
+                except Exception as e:
+                    print(f"⚠️  Não foi possível carregar {model}: {e}")
+        
+        if not background:
+            load()
+            return None
+        thread = threading.Thread(target=load, name="ollama-preload", daemon=True)
+        thread.start()
+        return thread
+        
+    @staticmethod
+    def _percentile(ordered, q: float) -> float:
+        """Percentil q de latências ordenadas, em ms."""
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+        
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Métricas das chamadas, por "operação modelo" (ex: "embed mxbai-embed-large").
+        
+        Returns:
+            Dicionário com requests, errors, mean_ms, p50_ms, p95_ms (das
+            últimas latency_window chamadas), reloads e reload_seconds
+        """
+        with self._lock:
+            snapshot = {key: dict(entry, latencies=sorted(entry['latencies'])) for key, entry in self._metrics.items()}
+        
+        result = {}
+        for key, entry in snapshot.items():
+            latencies = entry['latencies']
+            result[key] = {
+                'requests': entry['requests'],
+                'errors': entry['errors'],
+                'mean_ms': entry['total_seconds'] / entry['requests'] * 1000 if entry['requests'] else 0.0,
+                'p50_ms': self._percentile(latencies, 0.5),
+                'p95_ms': self._percentile(latencies, 0.95),
+                'reloads': entry['reloads'],
+                'reload_seconds': entry['reload_seconds'],
+            }
+        return result
+        
+    def close(self):
+        """Fecha as conexões do pool."""
+        with self._lock:
+            self._clients.clear()
+            self._transport.close()
+            
+    async def aclose(self):
+        """Fecha as conexões assíncronas do event loop atual."""
+        with self._lock:
+            entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[0].aclose()
+
+
+_default_client: Optional[OllamaClient] = None
+_default_lock = threading.Lock()
+
+
+def default_client() -> OllamaClient:
+    """Cliente compartilhado do processo (usado quando nenhum é passado aos componentes)."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+        return _default_client
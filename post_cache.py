@@ -0,0 +1,370 @@
+"""
+Cache em disco, em formato colunar binário, dos posts já processados pelo InstagramDataLoader.
+
+Cada perfil vira um arquivo <perfil>.postcache com:
+- cabeçalho (magic + versão + JSON com a assinatura do arquivo de origem e o layout)
+- colunas numéricas como arrays int64 contíguos
+- colunas de texto como array int64 de offsets + bloco UTF-8
+
+O arquivo é lido via mmap: as colunas numéricas podem ser acessadas sem copiar
+dados e os textos só são decodificados quando o post é materializado.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+
+# Incrementar sempre que o layout ou o processamento dos posts mudar
+FORMAT_VERSION = 1
+
+MAGIC = b"PCOL"
+_PREFIX = struct.Struct("<4sII")  # magic, versão, tamanho do cabeçalho JSON
+
+# Valor usado para None nas colunas inteiras
+NULL_INT = -(2 ** 63)
+
+INT_COLUMNS = ('timestamp', 'likesCount', 'commentsCount')
+STR_COLUMNS = ('id', 'type', 'text', 'url', 'shortCode', 'caption')
+LIST_COLUMNS = ('hashtags', 'mentions')  # gravadas como JSON em colunas de texto
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _source_signature(source_path: Path) -> Dict[str, int]:
+    """Assinatura do arquivo de origem usada para validar o cache."""
+    stat = source_path.stat()
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _to_epoch_us(value: Optional[datetime]) -> int:
+    """Converte datetime (com fuso) em microssegundos desde a época."""
+    if value is None:
+        return NULL_INT
+    delta = value - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def epoch_us_to_datetime(value: int) -> Optional[datetime]:
+    """Converte microssegundos desde a época em datetime UTC."""
+    if value == NULL_INT:
+        return None
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _to_int(value: Any) -> int:
+    """Valida um valor para coluna int64 (None vira NULL_INT)."""
+    if value is None:
+        return NULL_INT
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise TypeError(f"valor não inteiro: {value!r}")
+    return value
+
+
+class PostCacheWriter:
+    """Acumula posts processados de um perfil e grava o arquivo colunar ao final."""
+    
+    def __init__(self, path: Path, profile: str, source: Dict[str, int]):
+        """
+        Inicializa o escritor.
+        
+        Args:
+            path: Caminho final do arquivo de cache
+            profile: Nome do perfil
+            source: Assinatura do arquivo de origem (ver _source_signature)
+        """
+        self.path = path
+        self.profile = profile
+        self.source = source
+        self.count = 0
+        # Posts do arquivo de origem que não entraram no cache
+        self.empty = 0
+        self.quarantined = 0
+        # Desativado se algum post não couber no formato (ex: contagem não inteira)
+        self.disabled = False
+        
+        self._ints = {name: array('q') for name in INT_COLUMNS}
+        self._offsets = {name: array('q', [0]) for name in STR_COLUMNS + LIST_COLUMNS}
+        self._blobs = {name: bytearray() for name in STR_COLUMNS + LIST_COLUMNS}
+        
+    def append(self, post: Dict[str, Any]):
+        """
+        Adiciona um post processado.
+        
+        Args:
+            post: Post no formato de InstagramDataLoader.process_post
+        """
+        if self.disabled:
+            return
+        
+        try:
+            ints = {
+                'timestamp': _to_epoch_us(post['timestamp']),
+                'likesCount': _to_int(post['likesCount']),
+                'commentsCount': _to_int(post['commentsCount']),
+            }
+            strings = {name: str(post[name] or '') for name in STR_COLUMNS}
+            strings.update({
+                name: json.dumps(post[name] or [], ensure_ascii=False)
+                for name in LIST_COLUMNS
+            })
+        except (TypeError, KeyError, OverflowError):
+            self.disabled = True
+            return
+        
+        for name, value in ints.items():
+            self._ints[name].append(value)
+        for name, value in strings.items():
+            self._blobs[name] += value.encode('utf-8')
+            self._offsets[name].append(len(self._blobs[name]))
+        
+        self.count += 1
+        
+    def finish(self) -> bool:
+        """
+        Grava o arquivo (de forma atômica).
+        
+        Returns:
+            True se o cache foi gravado
+        """
+        if self.disabled:
+            return False
+        
+        # Monta layout: todas as colunas alinhadas em 8 bytes após o cabeçalho
+        segments = []
+        for name in INT_COLUMNS:
+            segments.append((name, 'values', self._ints[name].tobytes()))
+        for name in STR_COLUMNS + LIST_COLUMNS:
+            segments.append((name, 'offsets', self._offsets[name].tobytes()))
+            segments.append((name, 'data', bytes(self._blobs[name])))
+        
+        layout = {}
+        position = 0
+        for name, part, data in segments:
+            layout.setdefault(name, {})[part] = [position, len(data)]
+            position += len(data) + (-len(data) % 8)
+        
+        header = json.dumps({
+            'profile': self.profile,
+            'source': self.source,
+            'count': self.count,
+            'empty': self.empty,
+            'quarantined': self.quarantined,
+            'byteorder': sys.byteorder,
+            'columns': layout,
+        }).encode('utf-8')
+        header += b' ' * (-(_PREFIX.size + len(header)) % 8)
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        
+        with open(tmp_path, 'wb') as f:
+            f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+            f.write(header)
+            for _, _, data in segments:
+                f.write(data)
+                f.write(b'\0' * (-len(data) % 8))
+        
+        os.replace(tmp_path, self.path)
+        return True
+
+
+class PostCacheReader:
+    """Acesso somente leitura, via mmap, a um arquivo de cache colunar."""
+    
+    def __init__(self, path: Path):
+        """
+        Abre e valida o arquivo.
+        
+        Args:
+            path: Caminho do arquivo de cache
+        
+        Raises:
+            ValueError: Se o arquivo não for um cache válido desta versão
+        """
+        self.path = path
+        
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            magic, version, header_size = _PREFIX.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Cache incompatível: {path}")
+            
+            self.header = json.loads(self._mmap[_PREFIX.size:_PREFIX.size + header_size])
+            if self.header['byteorder'] != sys.byteorder:
+                raise ValueError(f"Cache gravado em outra arquitetura: {path}")
+        except Exception:
+            self._mmap.close()
+            raise
+        
+        self._base = _PREFIX.size + header_size
+        self._view = memoryview(self._mmap)
+        
+    @property
+    def profile(self) -> str:
+        return self.header['profile']
+        
+    @property
+    def source(self) -> Dict[str, int]:
+        return self.header['source']
+        
+    @property
+    def empty(self) -> int:
+        """Posts sem texto descartados quando o cache foi gravado."""
+        return self.header.get('empty', 0)
+        
+    @property
+    def quarantined(self) -> int:
+        """Posts enviados à quarentena quando o cache foi gravado."""
+        return self.header.get('quarantined', 0)
+        
+    def __len__(self) -> int:
+        return self.header['count']
+        
+    def _segment(self, name: str, part: str) -> memoryview:
+        offset, size = self.header['columns'][name][part]
+        start = self._base + offset
+        return self._view[start:start + size]
+        
+    def int_column(self, name: str) -> memoryview:
+        """
+        Retorna uma coluna inteira (int64) sem copiar dados.
+        
+        Args:
+            name: Nome da coluna (ver INT_COLUMNS)
+        
+        Returns:
+            memoryview de int64; None é representado por NULL_INT
+        """
+        return self._segment(name, 'values').cast('q')
+        
+    def str_column(self, name: str) -> Iterator[str]:
+        """
+        Percorre os valores de uma coluna de texto.
+        
+        Args:
+            name: Nome da coluna (ver STR_COLUMNS e LIST_COLUMNS)
+        
+        Yields:
+            Valores decodificados, na ordem dos posts
+        """
+        offsets = self._segment(name, 'offsets').cast('q')
+        data = self._segment(name, 'data')
+        try:
+            for i in range(len(offsets) - 1):
+                yield str(data[offsets[i]:offsets[i + 1]], 'utf-8')
+        finally:
+            offsets.release()
+            data.release()
+            
+    def iter_posts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Reconstrói os posts processados, um a um.
+        
+        Yields:
+            Posts no mesmo formato de InstagramDataLoader.process_post
+        """
+        ints = {name: self.int_column(name) for name in INT_COLUMNS}
+        strings = {name: self.str_column(name) for name in STR_COLUMNS + LIST_COLUMNS}
+        
+        try:
+            for i in range(len(self)):
+                likes = ints['likesCount'][i]
+                comments = ints['commentsCount'][i]
+                yield {
+                    'id': next(strings['id']),
+                    'profile': self.profile,
+                    'type': next(strings['type']),
+                    'text': next(strings['text']),
+                    'url': next(strings['url']),
+                    'shortCode': next(strings['shortCode']),
+                    'timestamp': epoch_us_to_datetime(ints['timestamp'][i]),
+                    'likesCount': None if likes == NULL_INT else likes,
+                    'commentsCount': None if comments == NULL_INT else comments,
+                    'hashtags': json.loads(next(strings['hashtags'])),
+                    'mentions': json.loads(next(strings['mentions'])),
+                    'caption': next(strings['caption']),
+                }
+        finally:
+            for column in ints.values():
+                column.release()
+            for column in strings.values():
+                column.close()
+                
+    def close(self):
+        """Libera o mmap."""
+        self._view.release()
+        self._mmap.close()
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PostCache:
+    """Diretório de caches colunares, um arquivo por perfil."""
+    
+    def __init__(self, cache_dir: str):
+        """
+        Inicializa o cache.
+        
+        Args:
+            cache_dir: Diretório onde os arquivos .postcache são gravados
+        """
+        self.cache_dir = Path(cache_dir)
+        
+    def path_for(self, profile: str) -> Path:
+        """Caminho do arquivo de cache de um perfil."""
+        return self.cache_dir / f"{profile}.postcache"
+        
+    def open(self, profile: str, source_path: Path) -> Optional[PostCacheReader]:
+        """
+        Abre o cache de um perfil, se existir e ainda corresponder ao arquivo de origem.
+        
+        Args:
+            profile: Nome do perfil
+            source_path: Arquivo JSON de origem
+        
+        Returns:
+            Leitor do cache, ou None se ausente/desatualizado
+        """
+        path = self.path_for(profile)
+        if not path.exists():
+            return None
+        
+        try:
+            reader = PostCacheReader(path)
+        except (ValueError, OSError, KeyError):
+            return None
+        
+        if reader.source != _source_signature(source_path):
+            reader.close()
+            return None
+        
+        return reader
+        
+    def writer(self, profile: str, source_path: Path) -> PostCacheWriter:
+        """
+        Cria um escritor para o cache de um perfil.
+        
+        A assinatura do arquivo de origem é lida antes do processamento, então
+        uma alteração durante a leitura invalida o cache na próxima carga.
+        
+        Args:
+            profile: Nome do perfil
+            source_path: Arquivo JSON de origem
+        
+        Returns:
+            Escritor do cache
+        """
+        return PostCacheWriter(self.path_for(profile), profile, _source_signature(source_path))
@@ -4,10 +4,10 @@ Estas ferramentas fornecem queries estruturadas que complementam o RAG semântic
 """
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
-from dateutil import parser as date_parser
+from datetime import datetime, timedelta, timezone
 import json
-import ollama
+
+from data_loader import parse_iso_timestamp
 
 
 class QueryTools:
@@ -21,8 +21,52 @@ class QueryTools:
             embedding_manager: Instância do EmbeddingManager com a coleção
             llm_model: Modelo LLM para análise de sentimento
         """
+        self.embedding_manager = embedding_manager
         self.collection = embedding_manager.collection
         self.llm_model = llm_model
+        # Mesmo cliente Ollama (pool de conexões, keep_alive) do EmbeddingManager
+        self.ollama_client = embedding_manager.ollama_client
+    
+    def _get_posts(self, limit: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Executa collection.get ignorando documentos de trecho (text_chunker).
+        
+        Trechos repetem os metadados do post de origem, então contá-los
+        duplicaria rankings e estatísticas. Como o filtro 'where' não consegue
+        excluí-los (posts completos não têm 'parent_id'), a coleção é lida em
+        páginas até juntar limit posts completos: trechos não ocupam o limite.
+        
+        Args:
+            limit: Máximo de posts completos a retornar (None: todos)
+            **kwargs: Demais argumentos repassados para collection.get
+            
+        Returns:
+            Resultado no formato de collection.get, só com posts completos
+        """
+        offset = kwargs.pop('offset', None) or 0
+        filtered = None
+        
+        while True:
+            page = self.collection.get(limit=limit, offset=offset, **kwargs)
+            offset += len(page['ids'])
+            
+            keep = [
+                i for i, metadata in enumerate(page['metadatas'])
+                if not metadata.get('parent_id')
+            ]
+            if filtered is None:
+                filtered = dict(page)
+                for key in ('ids', 'documents', 'metadatas'):
+                    if page.get(key) is not None:
+                        filtered[key] = []
+            
+            remaining = limit - len(filtered['ids']) if limit is not None else len(keep)
+            for key in ('ids', 'documents', 'metadatas'):
+                if page.get(key) is not None:
+                    filtered[key].extend(page[key][i] for i in keep[:remaining])
+            
+            if limit is None or len(page['ids']) < limit or len(filtered['ids']) >= limit:
+                return filtered
     
     def get_top_posts_by_likes(
         self, 
@@ -47,7 +91,7 @@ class QueryTools:
             where['profile'] = profile
         
         # ChromaDB não suporta ordenação nativa, então pegamos todos e ordenamos
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000  # Pega muitos para ordenar
         )
@@ -59,13 +103,10 @@ class QueryTools:
             
             # Aplica filtro de data se especificado
             if min_date:
-                try:
-                    post_date = date_parser.parse(metadata['timestamp'])
-                    min_date_obj = date_parser.parse(min_date)
-                    if post_date < min_date_obj:
-                        continue
-                except:
-                    pass
+                post_date = parse_iso_timestamp(metadata['timestamp'])
+                min_date_obj = parse_iso_timestamp(min_date)
+                if post_date and min_date_obj and post_date < min_date_obj:
+                    continue
             
             posts.append({
                 'id': results['ids'][i],
@@ -97,7 +138,7 @@ class QueryTools:
         if profile:
             where['profile'] = profile
         
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000
         )
@@ -132,7 +173,7 @@ class QueryTools:
         if profile:
             where['profile'] = profile
         
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000
         )
@@ -170,7 +211,7 @@ class QueryTools:
         if profile:
             where['profile'] = profile
         
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000
         )
@@ -206,7 +247,7 @@ class QueryTools:
         if profile:
             where['profile'] = profile
         
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000
         )
@@ -244,27 +285,24 @@ class QueryTools:
         if profile:
             where['profile'] = profile
         
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000
         )
         
-        cutoff_date = datetime.now() - timedelta(days=days)
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         
         posts = []
         for i in range(len(results['ids'])):
             metadata = results['metadatas'][i]
-            try:
-                post_date = date_parser.parse(metadata['timestamp'])
-                if post_date >= cutoff_date:
-                    posts.append({
-                        'id': results['ids'][i],
-                        'metadata': metadata,
-                        'document': results['documents'][i],
-                        'date': post_date
-                    })
-            except:
-                continue
+            post_date = parse_iso_timestamp(metadata['timestamp'])
+            if post_date and post_date >= cutoff_date:
+                posts.append({
+                    'id': results['ids'][i],
+                    'metadata': metadata,
+                    'document': results['documents'][i],
+                    'date': post_date
+                })
         
         posts.sort(key=lambda x: x['date'], reverse=True)
         return posts[:limit]
@@ -290,7 +328,7 @@ class QueryTools:
         if profile:
             where['profile'] = profile
         
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000
         )
@@ -311,6 +349,75 @@ class QueryTools:
         
         return posts[:limit]
     
+    def search_comments(
+        self,
+        query: str,
+        limit: int = 10,
+        profile: Optional[str] = None,
+        post_id: Optional[str] = None,
+        fast: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca comentários por similaridade na coleção de comentários.
+        
+        Não varre a coleção de posts: cada comentário é um documento próprio
+        (ver RAGSystem.index_comments).
+        
+        Args:
+            query: O que procurar nos comentários (ex: "opinião sobre o bandejão")
+            limit: Número de comentários a retornar
+            profile: Filtrar pelo perfil do post (opcional)
+            post_id: Restringir aos comentários de um post (opcional)
+            fast: Busca grossa nos vetores truncados (ver EmbeddingManager.search)
+            
+        Returns:
+            Lista de comentários com metadados (autor, post de origem, link)
+        """
+        results = self.embedding_manager.search_comments(
+            query=query,
+            n_results=limit,
+            profile_filter=profile,
+            post_id=post_id,
+            fast=fast
+        )
+        
+        distances = results.get('distances') or [[None] * len(results['ids'][0])]
+        return [
+            {
+                'id': doc_id,
+                'metadata': metadata,
+                'document': document,
+                'distance': distance,
+                'is_comment': True
+            }
+            for doc_id, metadata, document, distance in zip(
+                results['ids'][0], results['metadatas'][0], results['documents'][0], distances[0]
+            )
+        ]
+    
+    def get_post_comments(self, post_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Retorna os comentários indexados de um post.
+        
+        Args:
+            post_id: Id do post na coleção de posts (ex: "reitor_3712...")
+            limit: Número máximo de comentários
+            
+        Returns:
+            Lista de comentários ordenada por data
+        """
+        results = self.embedding_manager.comments_collection.get(
+            where={'post_id': post_id},
+            limit=limit
+        )
+        
+        comments = [
+            {'id': doc_id, 'metadata': metadata, 'document': document, 'is_comment': True}
+            for doc_id, metadata, document in zip(results['ids'], results['metadatas'], results['documents'])
+        ]
+        comments.sort(key=lambda c: c['metadata'].get('timestamp', ''))
+        return comments
+    
     def get_profile_statistics(
         self, 
         profile: Optional[str] = None
@@ -328,7 +435,7 @@ class QueryTools:
         if profile:
             where['profile'] = profile
         
-        results = self.collection.get(
+        results = self._get_posts(
             where=where if where else None,
             limit=10000
         )
@@ -377,7 +484,7 @@ class QueryTools:
         Returns:
             Dicionário com comparação entre perfis
         """
-        results = self.collection.get(limit=10000)
+        results = self._get_posts(limit=10000)
         
         profiles = {}
         for i in range(len(results['ids'])):
@@ -438,7 +545,7 @@ class QueryTools:
             where_filter = {"profile": profile} if profile else None
             
             # Busca TODOS os posts (limite alto)
-            results = self.collection.get(
+            results = self._get_posts(
                 where=where_filter,
                 limit=10000,  # Consulta toda a base
                 include=["documents", "metadatas"]
@@ -517,7 +624,7 @@ class QueryTools:
             # Busca posts relacionados ao tópico
             where_filter = {"profile": profile} if profile else None
             
-            results = self.collection.get(
+            results = self._get_posts(
                 where=where_filter,
                 limit=10000,
                 include=["documents", "metadatas"]
@@ -574,7 +681,7 @@ Forneça uma análise estruturada em formato JSON com:
 Retorne APENAS o JSON, sem texto adicional."""
 
             # Chama o LLM
-            response = ollama.chat(
+            response = self.ollama_client.chat(
                 model=self.llm_model,
                 messages=[{
                     'role': 'user',
@@ -851,6 +958,33 @@ TOOL_DEFINITIONS = [
                 "required": ["topic"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "search_comments",
+            "description": "Busca semântica nos COMENTÁRIOS dos posts (o que seguidores, alunos e servidores escreveram), indexados separadamente dos posts. Use para perguntas como 'o que os alunos dizem sobre X', 'como o público reagiu a Y', 'reclamações nos comentários sobre Z'.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Assunto a procurar nos comentários"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Número de comentários a retornar",
+                        "default": 10
+                    },
+                    "profile": {
+                        "type": "string",
+                        "description": "Nome do perfil dos posts comentados (deixe vazio para todos)",
+                        "enum": ["dceuff", "reitor", "vicereitor", ""]
+                    }
+                },
+                "required": ["query"]
+            }
+        }
     }
 ]
 
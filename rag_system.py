@@ -2,25 +2,38 @@
 Sistema RAG (Retrieval-Augmented Generation) para análise de posts do Instagram.
 """
 
-import ollama
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime, timedelta
-from dateutil import parser as date_parser
 import json
+import time
+from pathlib import Path
 from embedding_manager import EmbeddingManager
-from data_loader import InstagramDataLoader
+from ollama_client import OllamaClient
+from data_loader import InstagramDataLoader, parse_iso_timestamp
 from query_tools import QueryTools, TOOL_DEFINITIONS
+from text_chunker import PostChunker
+from index_checkpoint import IndexCheckpoint
 
 
 class RAGSystem:
     """Sistema RAG completo para consulta de posts do Instagram."""
-
+    
     def __init__(
         self,
         embedding_model: str = "mxbai-embed-large",
         generation_model: str = "qwen3:30b",
         data_dir: str = "data",
-        chroma_dir: str = "./chroma_db"
+        chroma_dir: str = "./chroma_db",
+        use_post_cache: bool = True,
+        chunker: Optional[PostChunker] = None,
+        embed_workers: int = 4,
+        vector_backend: str = "chroma",
+        vector_quantization: str = "float32",
+        vector_keep_full_precision: bool = False,
+        matryoshka_dim: Optional[int] = None,
+        shard_by_profile: bool = False,
+        fast_search: bool = False,
+        ollama_client: Optional[OllamaClient] = None
     ):
         """
         Inicializa o sistema RAG.
@@ -30,13 +43,41 @@ class RAGSystem:
             generation_model: Modelo para geração de respostas
             data_dir: Diretório com dados JSON
             chroma_dir: Diretório do ChromaDB
+            use_post_cache: Se True, mantém cache dos posts processados em <data_dir>/.cache
+            chunker: Divisor de posts longos aplicado antes dos embeddings (opcional)
+            embed_workers: Threads gerando embeddings em paralelo durante a indexação
+            vector_backend: Banco vetorial: "chroma" ou "numpy" (ver vector_store.py)
+            vector_quantization: Formato dos vetores no backend numpy
+                ("float32", "float16" ou "int8")
+            vector_keep_full_precision: Nos formatos quantizados, guarda também
+                os vetores float32 para reordenar os candidatos
+            matryoshka_dim: No backend numpy, guarda também os vetores truncados
+                nesta dimensão para a busca rápida
+            shard_by_profile: Se True, uma coleção por perfil (ver sharded_collection.py)
+            fast_search: Se True, retrieve_relevant_posts usa a busca rápida
+                (vetores truncados + reordenação com os completos)
+            ollama_client: Cliente Ollama compartilhado (ver ollama_client.py);
+                padrão: cliente compartilhado do processo
         """
         self.generation_model = generation_model
-        self.data_loader = InstagramDataLoader(data_dir)
+        self.fast_search = fast_search
+        self.data_loader = InstagramDataLoader(
+            data_dir,
+            cache_dir=str(Path(data_dir) / ".cache") if use_post_cache else None
+        )
+        self.chunker = chunker
         self.embedding_manager = EmbeddingManager(
             embedding_model=embedding_model,
-            persist_dir=chroma_dir
+            persist_dir=chroma_dir,
+            embed_workers=embed_workers,
+            vector_backend=vector_backend,
+            vector_quantization=vector_quantization,
+            vector_keep_full_precision=vector_keep_full_precision,
+            matryoshka_dim=matryoshka_dim,
+            shard_by_profile=shard_by_profile,
+            ollama_client=ollama_client
         )
+        self.ollama_client = self.embedding_manager.ollama_client
         
         # Inicializa ferramentas de consulta
         self.query_tools = QueryTools(self.embedding_manager)
@@ -44,30 +85,351 @@ class RAGSystem:
         print(f"✓ Sistema RAG inicializado")
         print(f"  - Modelo de embedding: {embedding_model}")
         print(f"  - Modelo de geração: {generation_model}")
-    
-    def index_all_posts(self, force_reindex: bool = False):
+        
+    def index_all_posts(self, force_reindex: bool = False, incremental: bool = False, upsert: bool = False):
         """
         Indexa todos os posts no banco vetorial.
         
+        Cada execução grava um checkpoint (ver index_checkpoint.py): se a
+        indexação anterior foi interrompida, esta chamada retoma de onde parou
+        em vez de considerar o índice parcial como pronto.
+        
         Args:
             force_reindex: Se True, limpa e re-indexa todos os posts
+            incremental: Se True, sincroniza o índice com os arquivos: embeda só
+                posts novos ou com texto alterado e remove os que sumiram
+            upsert: Se True, grava os posts dos arquivos sobre o índice existente,
+                embedando só os novos ou alterados, sem remover nada
+        """
+        self._index_collection(self._collection_spec(comments=False), force_reindex, incremental, upsert)
+        
+    def index_comments(self, force_reindex: bool = False, incremental: bool = False, upsert: bool = False):
+        """
+        Indexa os comentários dos posts na coleção de comentários.
+        
+        Todos os comentários (e respostas) viram documentos próprios ligados
+        ao post pelo metadado 'post_id'. Usa checkpoint como index_all_posts.
+        
+        Args:
+            force_reindex: Se True, limpa e re-indexa todos os comentários
+            incremental: Se True, embeda só comentários novos ou alterados
+                e remove os que sumiram dos arquivos
+            upsert: Se True, grava sobre o índice existente sem remover nada
+        """
+        self._index_collection(self._collection_spec(comments=True), force_reindex, incremental, upsert)
+        
+    def _collection_spec(self, comments: bool) -> Dict[str, Any]:
+        """
+        Reúne o que a indexação precisa saber sobre a coleção de posts ou de comentários.
+        
+        'collection' é uma função: a coleção é recriada quando limpa.
+        """
+        manager = self.embedding_manager
+        if comments:
+            return {
+                'collection': lambda: manager.comments_collection,
+                'iter_documents': self.data_loader.iter_all_comments,
+                'prepare': manager.prepare_comment,
+                'add': manager.add_comments,
+                'clear': manager.clear_comments,
+                'label': "comentários",
+            }
+        return {
+            'collection': lambda: manager.collection,
+            'iter_documents': self._iter_documents,
+            'prepare': manager.prepare_document,
+            'add': manager.add_posts,
+            'clear': manager.clear_collection,
+            'label': "posts",
+        }
+        
+    def _checkpoint_for(self, collection) -> IndexCheckpoint:
+        """Checkpoint de uma coleção, em <chroma_dir>/checkpoints/."""
+        return IndexCheckpoint(self.embedding_manager.persist_dir / "checkpoints", collection.name)
+        
+    def _index_config(self) -> Dict[str, Any]:
+        """Configuração que altera os documentos gerados (invalida checkpoints)."""
+        config = {
+            'embedding_model': self.embedding_manager.embedding_model,
+            'chunker': [self.chunker.max_chars, self.chunker.overlap] if self.chunker else None,
+        }
+        # Shards são coleções físicas distintas (só entra na chave se ativo: mantém checkpoints antigos)
+        if self.embedding_manager.shard_by_profile:
+            config['shard_by_profile'] = True
+        return config
+        
+    def _index_collection(
+        self,
+        spec: Dict[str, Any],
+        force_reindex: bool,
+        incremental: bool,
+        upsert: bool = False
+    ):
+        """
+        Indexação completa, incremental, por upsert ou retomada de uma coleção.
+        
+        Args:
+            spec: Descrição da coleção (ver _collection_spec)
+            force_reindex: Limpa e re-indexa tudo
+            incremental: Sincroniza pelos hashes de conteúdo
+            upsert: Grava sobre o índice existente, embedando só o que mudou
         """
-        current_count = self.embedding_manager.collection.count()
+        collection = spec['collection']()
+        label = spec['label']
+        checkpoint = self._checkpoint_for(collection)
+        # Retrato tirado antes da leitura: mudanças durante a execução invalidam o checkpoint
+        snapshot = self.data_loader.source_snapshot()
+        config = self._index_config()
+        
+        if incremental and not force_reindex:
+            self._sync_index(spec['iter_documents'](), spec['prepare'], collection, spec['add'])
+            self._finish_checkpoint(checkpoint, snapshot, config, collection)
+            return
+        
+        if upsert and not force_reindex:
+            print(f"🔄 Gravando {label} sobre o índice existente (upsert)...")
+            checkpoint.start(snapshot, config)
+            spec['add'](spec['iter_documents'](), on_commit=checkpoint.record, upsert=True)
+            self._finish_checkpoint(checkpoint, snapshot, config, collection)
+            return
+        
+        current_count = collection.count()
         
         if current_count > 0 and not force_reindex:
-            print(f"✓ Banco já contém {current_count} posts indexados")
+            manifest = checkpoint.load()
+            
+            if manifest is not None and manifest['status'] == 'running':
+                self._resume_indexing(spec, checkpoint, manifest, snapshot, config)
+                return
+            
+            print(f"✓ Banco já contém {current_count} {label} indexados")
+            if manifest is None:
+                print("  (sem checkpoint: use 'python index_posts.py --verify' para conferir lacunas)")
+            elif not checkpoint.matches(manifest, snapshot, config):
+                print("  ⚠️  Arquivos de origem mudaram desde a última indexação (use incremental=True ou upsert=True)")
             return
         
         if force_reindex:
-            print("🔄 Limpando índice existente...")
-            self.embedding_manager.clear_collection()
+            print(f"🔄 Limpando índice de {label}...")
+            spec['clear']()
         
-        # Carrega posts
-        posts = self.data_loader.load_all_posts()
+        checkpoint.start(snapshot, config)
+        spec['add'](spec['iter_documents'](), on_commit=checkpoint.record)
+        self._finish_checkpoint(checkpoint, snapshot, config, spec['collection']())
+        
+    def _resume_indexing(
+        self,
+        spec: Dict[str, Any],
+        checkpoint: IndexCheckpoint,
+        manifest: Dict[str, Any],
+        snapshot: Dict[str, Any],
+        config: Dict[str, Any]
+    ):
+        """
+        Retoma uma indexação interrompida.
+        
+        Com as mesmas fontes e configuração, só os documentos ainda não gravados
+        são embedados. Se algo mudou desde a interrupção, cai na sincronização
+        incremental, que compara tudo pelos hashes.
+        """
+        collection = spec['collection']()
+        label = spec['label']
+        prepare = spec['prepare']
+        
+        if not checkpoint.matches(manifest, snapshot, config):
+            print(f"⏯️  Indexação de {label} interrompida, mas as fontes mudaram: sincronizando pelos hashes...")
+            self._sync_index(spec['iter_documents'](), prepare, collection, spec['add'])
+            self._finish_checkpoint(checkpoint, snapshot, config, collection)
+            return
+        
+        # Ids do checkpoint + ids já na coleção (lote gravado logo antes de uma queda)
+        committed = checkpoint.committed_ids() | self.embedding_manager.get_all_ids(collection)
+        print(f"⏯️  Retomando indexação de {label} interrompida: {len(committed)} já gravados")
+        
+        remaining = (
+            document for document in spec['iter_documents']()
+            if prepare(document)[0] not in committed
+        )
+        spec['add'](remaining, on_commit=checkpoint.record)
+        self._finish_checkpoint(checkpoint, snapshot, config, collection)
+        
+    def _finish_checkpoint(
+        self,
+        checkpoint: IndexCheckpoint,
+        snapshot: Dict[str, Any],
+        config: Dict[str, Any],
+        collection
+    ):
+        """
+        Fecha o checkpoint ao fim de uma indexação.
+        
+        Se algum perfil não pôde ser lido (arquivo truncado ou inválido), seus
+        documentos podem estar faltando: o checkpoint continua 'running', com
+        os perfis registrados, e a próxima execução tenta de novo.
+        """
+        failed_profiles = self.data_loader.failed_profiles
+        if failed_profiles:
+            print(
+                f"⚠️  Leitura falhou para: {', '.join(sorted(failed_profiles))} "
+                f"(índice não marcado como completo)"
+            )
+            checkpoint.mark_incomplete(snapshot, config, failed_profiles)
+            return
+        checkpoint.complete(snapshot, config, collection.count())
+        
+    def _iter_documents(self) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os documentos a indexar: posts dos arquivos e, se houver
+        chunker, os trechos dos posts longos.
+        
+        Returns:
+            Iterador de posts processados (e documentos de trecho)
+        """
+        posts = self.data_loader.load_all_posts(stream=True)
+        
+        if self.chunker is not None:
+            return self.chunker.chunk_posts(posts)
+        
+        return posts
+        
+    def _diff_index(self, documents: Iterator[Dict[str, Any]], prepare, collection) -> Dict[str, Any]:
+        """
+        Compara documentos atuais com uma coleção pelos hashes de conteúdo.
+        
+        Args:
+            documents: Posts ou comentários processados
+            prepare: Função documento -> (id, texto, metadados)
+            collection: Coleção a comparar
+            
+        Returns:
+            Dicionário com:
+            - to_embed: documentos novos ou com texto alterado
+            - missing_ids: ids dos documentos novos (ainda não estão na coleção)
+            - changed_ids: ids com texto alterado (já existem na coleção)
+            - metadata_ids / metadata_updates: ids e metadados só com metadados alterados
+            - removed_ids: ids na coleção que não existem mais nas fontes
+            - total: número de documentos nas fontes
+        """
+        indexed = self.embedding_manager.get_indexed_hashes(collection=collection)
+        
+        seen_ids = set()
+        to_embed = []
+        missing_ids = []
+        changed_ids = []
+        metadata_ids = []
+        metadata_updates = []
+        
+        for document in documents:
+            doc_id, _, metadata = prepare(document)
+            seen_ids.add(doc_id)
+            stored = indexed.get(doc_id)
+            
+            if stored is None:
+                to_embed.append(document)
+                missing_ids.append(doc_id)
+            elif stored['content_hash'] != metadata['content_hash']:
+                to_embed.append(document)
+                changed_ids.append(doc_id)
+            elif stored['metadata_hash'] != metadata['metadata_hash']:
+                metadata_ids.append(doc_id)
+                metadata_updates.append(metadata)
+        
+        # Não remove documentos de perfis cuja leitura falhou (arquivo incompleto)
+        failed_profiles = self.data_loader.failed_profiles
+        removed_ids = [
+            doc_id for doc_id, stored in indexed.items()
+            if doc_id not in seen_ids and stored['profile'] not in failed_profiles
+        ]
+        
+        return {
+            'to_embed': to_embed,
+            'missing_ids': missing_ids,
+            'changed_ids': changed_ids,
+            'metadata_ids': metadata_ids,
+            'metadata_updates': metadata_updates,
+            'removed_ids': removed_ids,
+            'total': len(seen_ids),
+        }
+        
+    def _sync_index(self, documents: Iterator[Dict[str, Any]], prepare, collection, add_documents):
+        """
+        Sincroniza uma coleção com os documentos atuais pelos hashes de conteúdo.
+        
+        - Documentos novos ou com texto alterado: (re)embedados e gravados por upsert
+          (a versão antiga continua no índice até a nova ser gravada)
+        - Documentos com apenas metadados alterados (curtidas, comentários...): só atualiza metadados
+        - Documentos que não existem mais nos arquivos: removidos do índice
+        
+        Args:
+            documents: Posts ou comentários processados
+            prepare: Função documento -> (id, texto, metadados)
+            collection: Coleção a sincronizar
+            add_documents: Função que embeda e grava uma lista de documentos
+                (add_posts ou add_comments)
+        """
+        manager = self.embedding_manager
+        start = time.perf_counter()
+        print("🔍 Comparando arquivos com o índice atual...")
+        
+        diff = self._diff_index(documents, prepare, collection)
+        to_embed = diff['to_embed']
+        changed_ids = diff['changed_ids']
+        metadata_ids = diff['metadata_ids']
+        removed_ids = diff['removed_ids']
+        
+        unchanged = diff['total'] - len(to_embed) - len(metadata_ids)
+        print(
+            f"📋 Novos: {len(to_embed) - len(changed_ids)} | Alterados: {len(changed_ids)} | "
+            f"Só metadados: {len(metadata_ids)} | Removidos: {len(removed_ids)} | "
+            f"Inalterados: {unchanged}"
+        )
+        
+        if removed_ids:
+            manager.delete_posts(removed_ids, collection=collection)
+        
+        if metadata_ids:
+            manager.update_metadatas(metadata_ids, diff['metadata_updates'], collection=collection)
+        
+        if to_embed:
+            add_documents(to_embed, upsert=True)
+        
+        print(f"✓ Sincronização concluída em {time.perf_counter() - start:.1f}s")
+        
+    def verify_index(self, comments: bool = False) -> Dict[str, Any]:
+        """
+        Compara os arquivos de origem com a coleção, sem alterar nada.
+        
+        Args:
+            comments: Se True, verifica a coleção de comentários em vez da de posts
+            
+        Returns:
+            Dicionário com status do checkpoint, totais e ids faltando,
+            desatualizados e sobrando na coleção
+        """
+        spec = self._collection_spec(comments)
+        collection = spec['collection']()
+        diff = self._diff_index(spec['iter_documents'](), spec['prepare'], collection)
+        
+        checkpoint = self._checkpoint_for(collection)
+        manifest = checkpoint.load()
+        if manifest is None:
+            checkpoint_status = 'ausente'
+        elif not checkpoint.matches(manifest, self.data_loader.source_snapshot(), self._index_config()):
+            checkpoint_status = f"{manifest['status']} (fontes ou configuração mudaram)"
+        else:
+            checkpoint_status = manifest['status']
+        
+        return {
+            'collection': collection.name,
+            'checkpoint': checkpoint_status,
+            'source_documents': diff['total'],
+            'indexed_documents': collection.count(),
+            'missing': diff['missing_ids'],
+            'stale_content': diff['changed_ids'],
+            'stale_metadata': diff['metadata_ids'],
+            'extra': diff['removed_ids'],
+        }
         
-        # Indexa
-        self.embedding_manager.add_posts(posts)
-    
     def format_post_for_context(self, post_data: Dict[str, Any]) -> str:
         """
         Formata um post para incluir no contexto da resposta.
@@ -81,11 +443,8 @@ class RAGSystem:
         metadata = post_data
         
         # Parse da data
-        try:
-            timestamp = date_parser.parse(metadata['timestamp'])
-            date_str = timestamp.strftime('%d/%m/%Y')
-        except:
-            date_str = "Data não disponível"
+        timestamp = parse_iso_timestamp(metadata.get('timestamp'))
+        date_str = timestamp.strftime('%d/%m/%Y') if timestamp else "Data não disponível"
         
         # Formata caption
         caption = metadata.get('caption', '')
@@ -101,7 +460,7 @@ Link: {metadata['url']}
 ---
 """
         return post_info
-    
+        
     def retrieve_relevant_posts(
         self, 
         query: str, 
@@ -122,7 +481,8 @@ Link: {metadata['url']}
         results = self.embedding_manager.search(
             query=query,
             n_results=n_results,
-            profile_filter=profile_filter
+            profile_filter=profile_filter,
+            fast=self.fast_search
         )
         
         # Formata resultados
@@ -137,7 +497,7 @@ Link: {metadata['url']}
             posts.append(post)
         
         return posts
-    
+        
     def generate_response(
         self, 
         query: str, 
@@ -188,7 +548,7 @@ IMPORTANTE: NÃO invente informações. Use apenas o que está no contexto forne
 
         # Gera resposta
         try:
-            response = ollama.chat(
+            response = self.ollama_client.chat(
                 model=self.generation_model,
                 messages=[
                     {'role': 'system', 'content': system_prompt},
@@ -204,7 +564,7 @@ IMPORTANTE: NÃO invente informações. Use apenas o que está no contexto forne
         
         except Exception as e:
             return f"❌ Erro ao gerar resposta: {e}\n\nVerifique se o modelo {self.generation_model} está instalado com: ollama pull {self.generation_model}"
-    
+            
     def query(
         self, 
         question: str, 
@@ -255,7 +615,7 @@ IMPORTANTE: NÃO invente informações. Use apenas o que está no contexto forne
         )
         
         return response, posts
-    
+        
     def _try_use_tools(
         self, 
         question: str, 
@@ -333,7 +693,7 @@ IMPORTANTE: NÃO invente informações. Use apenas o que está no contexto forne
             used_tools.append('compare_profiles')
         
         return results, used_tools
-    
+        
     def _generate_response_from_tools(
         self,
         question: str,
@@ -399,7 +759,7 @@ Os dados mostram:
 - Legenda: {metadata.get('caption', '')[:200]}...
 ---
 """
-        
+
         # Prompt do sistema
         system_prompt = """Você é um assistente especializado em analisar posts do Instagram da UFF.
 
@@ -422,7 +782,7 @@ Responda de forma clara e objetiva usando os dados acima."""
 
         # Gera resposta
         try:
-            response = ollama.chat(
+            response = self.ollama_client.chat(
                 model=self.generation_model,
                 messages=[
                     {'role': 'system', 'content': system_prompt},
@@ -438,7 +798,7 @@ Responda de forma clara e objetiva usando os dados acima."""
         
         except Exception as e:
             return f"❌ Erro ao gerar resposta: {e}"
-    
+            
     def get_system_stats(self) -> Dict[str, Any]:
         """
         Retorna estatísticas do sistema.
@@ -449,11 +809,12 @@ Responda de forma clara e objetiva usando os dados acima."""
         embedding_stats = self.embedding_manager.get_stats()
         
         return {
-            'indexed_posts': embedding_stats['total_documents'],
+            'indexed_posts': embedding_stats['total_posts'],
             'profiles': embedding_stats['profiles'],
             'embedding_model': embedding_stats['embedding_model'],
             'generation_model': self.generation_model,
-            'collection_name': embedding_stats['collection_name']
+            'collection_name': embedding_stats['collection_name'],
+            'ollama': embedding_stats['ollama']
         }
 
 
@@ -0,0 +1,336 @@
+"""
+Coleção dividida por perfil: uma coleção física (shard) para cada perfil.
+
+Com todos os perfis em uma coleção, as buscas filtradas por perfil dependem do
+filtro 'where' aplicado sobre os candidatos do índice HNSW do ChromaDB, que fica
+lento e perde resultados à medida que o número de perfis cresce. ShardedCollection
+tem a mesma API de coleção do ChromaDB (count, add, upsert, update, delete, get,
+query) e roteia cada operação:
+
+- gravações: pelo metadado 'profile' de cada documento
+- operações por id: pelo prefixo do id ("<perfil>_...", ver
+  EmbeddingManager.make_post_id)
+- filtros por perfil ({'profile': p}, {'profile': {'$in': [...]}} ou dentro de
+  '$and'): só os shards desses perfis, sem a condição de perfil
+- buscas sem filtro de perfil: todos os shards em paralelo, juntando os k
+  melhores de cada um pela distância
+
+Os shards se chamam "<coleção>__<perfil>_<hash>" e guardam o perfil nos
+metadados da coleção; funciona com o ChromaDB e com o NumpyVectorStore.
+"""
+
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+# Limite de tamanho de nome de coleção do ChromaDB
+MAX_COLLECTION_NAME = 63
+
+# Campos por documento dos resultados de get/query (além de ids e distances)
+RESULT_FIELDS = ('embeddings', 'documents', 'metadatas')
+
+
+class ShardedCollection:
+    """Coleção lógica formada por um shard por perfil."""
+    
+    def __init__(
+        self,
+        client,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        fanout_workers: int = 8
+    ):
+        """
+        Carrega os shards existentes de uma coleção lógica.
+        
+        Args:
+            client: Cliente do banco vetorial (ChromaDB ou NumpyVectorStore)
+            name: Nome da coleção lógica
+            metadata: Metadados dos shards criados (ex: {"hnsw:space": "cosine"})
+            fanout_workers: Threads consultando shards em paralelo
+        """
+        self.client = client
+        self.name = name
+        self.metadata = metadata or {}
+        self.fanout_workers = fanout_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        
+        self._shards = {}
+        for collection in client.list_collections():
+            shard_metadata = collection.metadata or {}
+            if shard_metadata.get('shard_of') == name:
+                self._shards[shard_metadata['profile']] = collection
+                
+    @property
+    def profiles(self) -> List[str]:
+        """Perfis com shard, em ordem alfabética."""
+        return sorted(self._shards)
+        
+    def shard_name(self, profile: str) -> str:
+        """Nome da coleção física de um perfil (válido no ChromaDB)."""
+        digest = hashlib.sha1(profile.encode('utf-8')).hexdigest()[:8]
+        slug = re.sub(r'[^a-zA-Z0-9_-]', '-', profile)
+        slug = slug[:max(0, MAX_COLLECTION_NAME - len(self.name) - len(digest) - 3)]
+        return f"{self.name}__{slug}_{digest}"
+        
+    def _shard(self, profile: str, create: bool = False):
+        """Shard de um perfil (None se não existir e create=False)."""
+        with self._lock:
+            if profile not in self._shards and create:
+                self._shards[profile] = self.client.get_or_create_collection(
+                    name=self.shard_name(profile),
+                    metadata={**self.metadata, 'shard_of': self.name, 'profile': profile}
+                )
+            return self._shards.get(profile)
+            
+    def _profile_of_id(self, doc_id: str) -> Optional[str]:
+        """Perfil de um id "<perfil>_..." (o prefixo mais longo que tem shard)."""
+        index = doc_id.rfind('_')
+        while index > 0:
+            if doc_id[:index] in self._shards:
+                return doc_id[:index]
+            index = doc_id.rfind('_', 0, index)
+        return None
+        
+    def _group_ids(self, ids: Sequence[str]) -> Dict[str, List[int]]:
+        """Posições dos ids agrupadas por perfil (ids sem shard são descartados)."""
+        groups: Dict[str, List[int]] = {}
+        for i, doc_id in enumerate(ids):
+            profile = self._profile_of_id(doc_id)
+            if profile is not None:
+                groups.setdefault(profile, []).append(i)
+        return groups
+        
+    @staticmethod
+    def _profile_condition(condition: Any) -> Optional[Set[str]]:
+        """Perfis aceitos por uma condição sobre 'profile' (None se não restringe)."""
+        if isinstance(condition, str):
+            return {condition}
+        if isinstance(condition, dict) and len(condition) == 1:
+            operator, value = next(iter(condition.items()))
+            if operator == '$eq':
+                return {value}
+            if operator == '$in':
+                return set(value)
+        return None
+        
+    def _route(self, where: Optional[Dict[str, Any]]):
+        """
+        Escolhe os shards de um filtro.
+        
+        Returns:
+            Tupla (perfis, filtro a aplicar em cada shard). Com filtro por
+            perfil, a condição de perfil é removida (cada shard só tem um perfil).
+        """
+        if not where:
+            return self.profiles, where
+        
+        if 'profile' in where:
+            profiles = self._profile_condition(where['profile'])
+            if profiles is not None:
+                rest = {key: value for key, value in where.items() if key != 'profile'}
+                return sorted(p for p in profiles if p in self._shards), rest or None
+        
+        if '$and' in where:
+            conditions = list(where['$and'])
+            for i, condition in enumerate(conditions):
+                if isinstance(condition, dict) and list(condition) == ['profile']:
+                    profiles = self._profile_condition(condition['profile'])
+                    if profiles is not None:
+                        rest = conditions[:i] + conditions[i + 1:]
+                        rest = rest[0] if len(rest) == 1 else ({'$and': rest} if rest else None)
+                        return sorted(p for p in profiles if p in self._shards), rest
+        
+        return self.profiles, where
+        
+    def _map(self, function, profiles: List[str]) -> list:
+        """Aplica function(perfil) aos shards, em paralelo quando há mais de um."""
+        if len(profiles) <= 1:
+            return [function(profile) for profile in profiles]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.fanout_workers)
+        return list(self._executor.map(function, profiles))
+        
+    def count(self) -> int:
+        """Total de documentos em todos os shards."""
+        return sum(shard.count() for shard in list(self._shards.values()))
+        
+    def _write(self, method: str, ids, embeddings=None, metadatas=None, documents=None):
+        """Distribui add/upsert entre os shards pelo perfil de cada documento."""
+        groups: Dict[str, List[int]] = {}
+        for i, metadata in enumerate(metadatas):
+            groups.setdefault(metadata['profile'], []).append(i)
+        
+        for profile, positions in groups.items():
+            kwargs = {
+                'ids': [ids[i] for i in positions],
+                'metadatas': [metadatas[i] for i in positions],
+            }
+            if embeddings is not None:
+                kwargs['embeddings'] = [embeddings[i] for i in positions]
+            if documents is not None:
+                kwargs['documents'] = [documents[i] for i in positions]
+            getattr(self._shard(profile, create=True), method)(**kwargs)
+            
+    def add(self, ids, embeddings=None, metadatas=None, documents=None):
+        """Grava documentos novos (metadatas com 'profile' são obrigatórios)."""
+        self._write('add', ids, embeddings, metadatas, documents)
+        
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None):
+        """Grava ou substitui documentos."""
+        self._write('upsert', ids, embeddings, metadatas, documents)
+        
+    def update(self, ids, embeddings=None, metadatas=None, documents=None):
+        """Atualiza documentos existentes, roteando pelo id."""
+        for profile, positions in self._group_ids(ids).items():
+            kwargs = {'ids': [ids[i] for i in positions]}
+            for key, values in (('embeddings', embeddings), ('metadatas', metadatas), ('documents', documents)):
+                if values is not None:
+                    kwargs[key] = [values[i] for i in positions]
+            self._shards[profile].update(**kwargs)
+            
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Remove documentos por id ou filtro."""
+        if ids is not None:
+            for profile, positions in self._group_ids(ids).items():
+                self._shards[profile].delete(ids=[ids[i] for i in positions])
+            return
+        
+        profiles, shard_where = self._route(where)
+        for profile in profiles:
+            if shard_where:
+                self._shards[profile].delete(where=shard_where)
+            else:
+                shard = self._shards[profile]
+                shard.delete(ids=shard.get(include=[])['ids'])
+                
+    @staticmethod
+    def _merge_get(results: List[Dict[str, Any]], include: Sequence[str]) -> Dict[str, Any]:
+        """Concatena resultados de collection.get de vários shards."""
+        fields = [key for key in RESULT_FIELDS if key in include]
+        merged = {'ids': [], **{key: [] if key in fields else None for key in RESULT_FIELDS}}
+        for result in results:
+            merged['ids'].extend(result['ids'])
+            for key in fields:
+                merged[key].extend(result[key])
+        merged['included'] = list(include)
+        return merged
+        
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ('metadatas', 'documents')
+    ) -> Dict[str, Any]:
+        """
+        Lê documentos por id e/ou filtro.
+        
+        Sem ids, os shards são percorridos em ordem alfabética de perfil, então
+        limit/offset paginam de forma estável.
+        
+        Returns:
+            Dicionário no formato de collection.get do ChromaDB
+        """
+        include = list(include)
+        
+        if ids is not None:
+            results = [
+                self._shards[profile].get(ids=[ids[i] for i in positions], where=where, include=include)
+                for profile, positions in self._group_ids(ids).items()
+            ]
+            return self._merge_get(results, include)
+        
+        profiles, shard_where = self._route(where)
+        results = []
+        skip = offset or 0
+        remaining = limit
+        for profile in profiles:
+            if remaining is not None and remaining <= 0:
+                break
+            shard = self._shards[profile]
+            if skip:
+                size = shard.count() if not shard_where else len(shard.get(where=shard_where, include=[])['ids'])
+                if size <= skip:
+                    skip -= size
+                    continue
+            
+            kwargs = {'where': shard_where} if shard_where else {}
+            if remaining is not None:
+                kwargs['limit'] = remaining
+            if skip:
+                kwargs['offset'] = skip
+            result = shard.get(include=include, **kwargs)
+            skip = 0
+            results.append(result)
+            if remaining is not None:
+                remaining -= len(result['ids'])
+        
+        return self._merge_get(results, include)
+        
+    def query(
+        self,
+        query_embeddings,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Sequence[str] = ('metadatas', 'documents', 'distances'),
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Busca nos shards do filtro e junta os n_results mais próximos de cada consulta.
+        
+        Argumentos extras (ex: prefix_search do NumpyVectorStore) são repassados
+        aos shards.
+        
+        Returns:
+            Dicionário no formato de collection.query do ChromaDB
+        """
+        include = list(include)
+        shard_include = include if 'distances' in include else include + ['distances']
+        profiles, shard_where = self._route(where)
+        n_queries = len(query_embeddings)
+        
+        def query_shard(profile):
+            return self._shards[profile].query(
+                query_embeddings=query_embeddings,
+                n_results=n_results,
+                where=shard_where,
+                include=shard_include,
+                **kwargs
+            )
+        
+        results = self._map(query_shard, profiles)
+        if len(results) == 1 and shard_include == include:
+            return results[0]
+        
+        fields = [key for key in RESULT_FIELDS + ('distances',) if key in include]
+        merged = {'ids': [], 'distances': None, **{key: [] if key in fields else None for key in RESULT_FIELDS}}
+        if 'distances' in fields:
+            merged['distances'] = []
+        
+        for q in range(n_queries):
+            hits = [
+                (result['distances'][q][i], result, i)
+                for result in results
+                for i in range(len(result['ids'][q]))
+            ]
+            hits.sort(key=lambda hit: hit[0])
+            hits = hits[:n_results]
+            
+            merged['ids'].append([result['ids'][q][i] for _, result, i in hits])
+            for key in fields:
+                merged[key].append([result[key][q][i] for _, result, i in hits])
+        
+        merged['included'] = include
+        return merged
+        
+    def clear(self):
+        """Remove todos os shards."""
+        with self._lock:
+            for shard in self._shards.values():
+                self.client.delete_collection(name=shard.name)
+            self._shards = {}
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Testes da API assíncrona do EmbeddingManager (asearch, aadd_posts): os
+resultados são os mesmos da API síncrona.
+"""
+
+import asyncio
+
+import pytest
+
+
+TOPICS = ["greve", "vestibular", "formatura", "biblioteca"]
+PROFILES = ["uff", "dceuff", "reitoria"]
+
+
+def make_posts(make_post, count: int = 30) -> list:
+    """Posts de três perfis, um assunto por post."""
+    return [
+        make_post(str(i), f"post {i} sobre {TOPICS[i % 4]} no campus", profile=PROFILES[i % 3], likes=i)
+        for i in range(count)
+    ]
+
+
+def read_all(manager) -> dict:
+    """Conteúdo completo da coleção de posts, por id."""
+    result = manager.collection.get(include=['documents', 'metadatas', 'embeddings'])
+    return {
+        doc_id: (document, metadata, list(embedding))
+        for doc_id, document, metadata, embedding in zip(
+            result['ids'], result['documents'], result['metadatas'], result['embeddings']
+        )
+    }
+
+
+@pytest.mark.parametrize("vector_backend", ["chroma", "numpy"])
+def test_aadd_posts_matches_add_posts(make_manager, make_post, fake_ollama, vector_backend):
+    """aadd_posts grava os mesmos documentos, com as mesmas requisições, que add_posts."""
+    posts = make_posts(make_post)
+    sync = make_manager(vector_backend=vector_backend, collection_name="sync")
+    sync.add_posts(posts, batch_size=7)
+    requests = fake_ollama.stats['requests']['/api/embed']
+    
+    manager = make_manager(vector_backend=vector_backend, collection_name="async")
+    committed = []
+    
+    async def index():
+        await manager.aadd_posts(posts, batch_size=7, on_commit=committed.extend)
+        # Só metadados mudam: nada é re-embedado
+        await manager.aadd_posts([make_post("0", "post 0 sobre greve no campus", likes=99)], upsert=True)
+        await manager.ollama_client.aclose()
+    
+    asyncio.run(index())
+    
+    assert fake_ollama.stats['requests']['/api/embed'] == 2 * requests
+    assert committed == [f"{post['profile']}_{post['id']}" for post in posts]
+    stored = read_all(manager)
+    expected = read_all(sync)
+    assert stored.keys() == expected.keys()
+    for doc_id, (document, metadata, embedding) in expected.items():
+        assert stored[doc_id][0] == document
+        assert stored[doc_id][2] == pytest.approx(embedding)
+        if doc_id != "uff_0":
+            assert stored[doc_id][1] == metadata
+    assert stored["uff_0"][1]['likesCount'] == 99
+
+
+@pytest.mark.parametrize("vector_backend", ["chroma", "numpy"])
+def test_asearch_matches_search(make_manager, make_post, vector_backend):
+    """Buscas concorrentes com asearch devolvem o mesmo que search."""
+    manager = make_manager(vector_backend=vector_backend)
+    manager.add_posts(make_posts(make_post))
+    searches = [("greve no campus", None), ("post 7 vestibular", "dceuff"), ("formatura", "reitoria")]
+    
+    async def run():
+        results = await asyncio.gather(*(
+            manager.asearch(query, n_results=4, profile_filter=profile) for query, profile in searches
+        ))
+        await manager.ollama_client.aclose()
+        return results
+    
+    results = asyncio.run(run())
+    
+    for (query, profile), found in zip(searches, results):
+        expected = manager.search(query, n_results=4, profile_filter=profile)
+        assert found['ids'] == expected['ids']
+        assert found['metadatas'] == expected['metadatas']
+        assert found['distances'][0] == pytest.approx(expected['distances'][0], abs=1e-6)
+    # As buscas síncronas reaproveitaram os embeddings das assíncronas (cache LRU)
+    assert manager.query_cache.info()['hits'] == len(searches)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Script de teste da limpeza de texto otimizada (normalize_text / clean_text).
+
+Compara a implementação atual com a versão original (emoji.replace_emoji
+seguido de três re.sub) sobre todo o corpus em data/ e mede o ganho.
+"""
+
+import re
+import timeit
+from pathlib import Path
+
+import emoji
+
+from data_loader import InstagramDataLoader, iter_json_array
+
+
+def reference_clean_text(text: str) -> str:
+    """Implementação original de clean_text, usada como referência."""
+    if not text:
+        return ""
+    
+    text = emoji.replace_emoji(text, replace='')
+    text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+    text = re.sub(r'\n+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    
+    return text.strip()
+
+
+# Casos difíceis: emoji colado em URL, keycaps, ZWJ, bandeiras, espaços mistos
+EDGE_CASES = [
+    "",
+    "   ",
+    "texto simples",
+    "linha 1\n\n\nlinha 2\t\tfim",
+    "veja https://uff.br/noticia?id=1 agora",
+    "link:https://uff.br😀continua depois",
+    "http://a.com http://b.com\n\nhttp://c.com",
+    "1️⃣ primeiro 2⃣ segundo #️⃣ *️⃣ 2024",
+    "família 👨‍👩‍👧‍👦 e bandeira 🇧🇷 e tom 👍🏽",
+    "© UFF ® 2025 ™",
+    "texto com espaços​unicode",
+    "🎉🎉🎉",
+    "a‍b️c",
+    "texto\ufe0e com seletor de variação",
+    "👩🏽‍❤️‍👨🏽 casal e http://x.com👍🏽‍",
+    "http:// incompleto e https://",
+]
+
+
+def load_corpus_texts(data_dir: str = "data"):
+    """Retorna todas as legendas e comentários dos JSONs em data/."""
+    texts = []
+    for json_file in sorted(Path(data_dir).glob("*.json")):
+        for post in iter_json_array(json_file):
+            texts.append(post.get('caption') or "")
+            for comment in post.get('latestComments') or []:
+                texts.append(comment.get('text') or "")
+    return texts
+
+
+def test_clean_text_equivalence():
+    """O resultado deve ser idêntico ao da implementação original."""
+    loader = InstagramDataLoader()
+    texts = EDGE_CASES + load_corpus_texts()
+    
+    mismatches = [
+        text for text in texts
+        if loader.clean_text(text) != reference_clean_text(text)
+    ]
+    
+    print(f"✓ {len(texts) - len(mismatches)}/{len(texts)} textos idênticos")
+    assert not mismatches, f"Divergência em: {mismatches[0]!r}"
+
+
+def test_extract_post_text_equivalence():
+    """extract_post_text continua gerando o mesmo documento para cada post."""
+    loader = InstagramDataLoader()
+    
+    for json_file in sorted(Path("data").glob("*.json")):
+        for post in iter_json_array(json_file):
+            expected = []
+            if caption := post.get('caption'):
+                expected.append(f"Legenda: {reference_clean_text(caption)}")
+            if hashtags := post.get('hashtags', []):
+                expected.append(f"Hashtags: {' '.join(hashtags)}")
+            if mentions := post.get('mentions', []):
+                expected.append(f"Menções: {' '.join(mentions)}")
+            comments = [
+                reference_clean_text(c['text'])
+                for c in post.get('latestComments', [])[:5] if c.get('text')
+            ]
+            if comments:
+                expected.append(f"Comentários: {' | '.join(comments)}")
+            
+            assert loader.extract_post_text(post) == " ".join(expected)
+
+
+def benchmark(repeat: int = 5):
+    """Mede o tempo de limpar o corpus inteiro com as duas implementações."""
+    loader = InstagramDataLoader()
+    texts = load_corpus_texts()
+    
+    def run_reference():
+        for text in texts:
+            reference_clean_text(text)
+            
+    def run_current():
+        for text in texts:
+            loader.clean_text(text)
+    
+    reference_time = min(timeit.repeat(run_reference, number=1, repeat=repeat))
+    current_time = min(timeit.repeat(run_current, number=1, repeat=repeat))
+    
+    print(f"📊 Corpus: {len(texts)} textos")
+    print(f"  Original:  {reference_time * 1000:.1f} ms")
+    print(f"  Otimizada: {current_time * 1000:.1f} ms")
+    print(f"  Speedup:   {reference_time / current_time:.1f}x")
+
+
+if __name__ == "__main__":
+    print("=== Testando clean_text ===\n")
+    test_clean_text_equivalence()
+    test_extract_post_text_equivalence()
+    print("✓ extract_post_text equivalente\n")
+    
+    print("=== Benchmark ===\n")
+    benchmark()
+    
+    print("\n✅ Testes concluídos!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Testes dos agregados das coleções (collection_stats.py) e da consistência
+com o banco vetorial em EmbeddingManager.get_stats.
+"""
+
+import sqlite3
+
+import pytest
+
+from collection_stats import CollectionStats
+from embedding_manager import EmbeddingManager
+
+
+def metadata(profile: str, likes: int, day: int, parent_id: str = None) -> dict:
+    """Metadados como gravados na coleção de posts."""
+    data = {
+        'profile': profile,
+        'likesCount': likes,
+        'commentsCount': 1,
+        'timestamp': f"2025-03-{day:02d}T12:00:00+00:00",
+    }
+    if parent_id:
+        data['parent_id'] = parent_id
+    return data
+
+
+def recount(manager: EmbeddingManager) -> dict:
+    """Totais calculados lendo todos os metadados da coleção (referência)."""
+    metadatas = manager.collection.get(include=['metadatas'])['metadatas']
+    posts = [m for m in metadatas if not m.get('parent_id')]
+    return {
+        'total_documents': len(metadatas),
+        'total_posts': len(posts),
+        'total_likes': sum(m['likesCount'] for m in posts),
+        'profiles': sorted({m['profile'] for m in metadatas}),
+    }
+
+
+def test_totals_follow_writes(tmp_path):
+    """Gravações, substituições e remoções ajustam os totais por perfil e as datas."""
+    stats = CollectionStats(tmp_path / "stats.sqlite3")
+    stats.upsert("posts", ["a", "b", "c"], [metadata("uff", 10, 1), metadata("uff", 5, 20), metadata("dce", 7, 5)])
+    stats.upsert("posts", ["a#0"], [metadata("uff", 10, 1, parent_id="a")])
+    stats.upsert("posts", ["b"], [metadata("uff", 50, 20)])
+    
+    summary = stats.summary("posts")
+    assert stats.document_count("posts") == 4
+    assert summary['total_documents'] == 4
+    assert summary['total_posts'] == 3
+    assert summary['total_likes'] == 67
+    assert summary['profile_stats']['uff']['first_timestamp'].startswith("2025-03-01")
+    
+    stats.delete("posts", ["a", "a#0", "desconhecido"])
+    summary = stats.summary("posts")
+    assert summary['profile_stats']['uff'] == {
+        'documents': 1, 'posts': 1, 'likes': 50, 'comments': 1,
+        'first_timestamp': "2025-03-20T12:00:00+00:00", 'last_timestamp': "2025-03-20T12:00:00+00:00",
+    }
+    stats.delete("posts", ["c"])
+    assert list(stats.summary("posts")['profile_stats']) == ["uff"]
+    assert stats.summary("outra")['total_documents'] == 0
+    assert stats.document_count("outra") is None
+
+
+def test_pending_write_invalidates_count(tmp_path):
+    """Uma gravação iniciada e não registrada (queda) invalida o total até a reconstrução."""
+    stats = CollectionStats(tmp_path / "stats.sqlite3")
+    stats.upsert("posts", ["a"], [metadata("uff", 1, 1)])
+    
+    stats.begin("posts")
+    assert stats.document_count("posts") is None
+    stats.upsert("posts", ["a"], [metadata("uff", 2, 1)])
+    assert stats.document_count("posts") == 1
+    
+    stats.begin("posts")
+    stats.close()
+    reopened = CollectionStats(tmp_path / "stats.sqlite3")
+    assert reopened.document_count("posts") is None
+    reopened.clear("posts")
+    assert reopened.document_count("posts") == 0
+
+
+def test_migrates_files_without_pending_column(tmp_path):
+    """Arquivos criados antes da coluna 'pending' continuam válidos."""
+    path = tmp_path / "stats.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE collections (collection TEXT PRIMARY KEY, documents INTEGER NOT NULL)")
+    conn.execute("INSERT INTO collections VALUES ('posts', 0)")
+    conn.commit()
+    conn.close()
+    
+    stats = CollectionStats(path)
+    assert stats.document_count("posts") == 0
+    stats.begin("posts")
+    assert stats.document_count("posts") is None
+
+
+@pytest.mark.parametrize("vector_backend", ["chroma", "numpy"])
+def test_manager_stats_match_collection(make_manager, make_post, vector_backend):
+    """get_stats, lido dos agregados, bate com a leitura completa da coleção."""
+    manager = make_manager(vector_backend=vector_backend)
+    manager.add_posts([make_post(str(i), profile=["uff", "dceuff"][i % 2], likes=i) for i in range(10)])
+    manager.update_metadatas(["uff_0"], [manager.prepare_document(make_post("0", profile="uff", likes=100))[2]])
+    manager.delete_posts(["dceuff_1", "dceuff_3"])
+    manager.add_posts([make_post("4", profile="uff", likes=40, day=12)], upsert=True)
+    
+    stats = manager.get_stats()
+    expected = recount(manager)
+    assert {key: stats[key] for key in expected} == expected
+    assert stats['total_likes'] == 100 + 2 + 40 + 5 + 6 + 7 + 8 + 9
+
+
+def test_interrupted_write_forces_rebuild(make_manager, make_post, monkeypatch):
+    """Queda entre a gravação no banco vetorial e nos agregados: a próxima leitura reconstrói."""
+    manager = make_manager(vector_backend="numpy")
+    manager.add_posts([make_post(str(i), likes=1) for i in range(4)])
+    assert manager.get_stats()['total_likes'] == 4
+    
+    # Só metadados mudam: o total de documentos continua igual
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt()
+    
+    monkeypatch.setattr(manager.collection_stats, "upsert", crash)
+    with pytest.raises(KeyboardInterrupt):
+        manager.update_metadatas(["uff_0"], [manager.prepare_document(make_post("0", likes=50))[2]])
+    monkeypatch.undo()
+    manager.collection_stats.close()
+    
+    reopened = make_manager(vector_backend="numpy")
+    rebuilds = []
+    rebuild = reopened.rebuild_stats
+    
+    def counted_rebuild(*args, **kwargs):
+        rebuilds.append(args)
+        rebuild(*args, **kwargs)
+    
+    monkeypatch.setattr(reopened, "rebuild_stats", counted_rebuild)
+    
+    assert reopened.get_stats()['total_likes'] == 53
+    assert reopened.get_stats()['total_likes'] == 53
+    assert len(rebuilds) == 1
+
+
+def test_missing_sidecar_is_rebuilt(make_manager, make_post, tmp_path):
+    """Coleções indexadas sem o arquivo de agregados são reconstruídas na primeira leitura."""
+    manager = make_manager(vector_backend="numpy")
+    manager.add_posts([make_post(str(i), profile="uff", likes=2) for i in range(3)])
+    manager.collection_stats.close()
+    for path in (tmp_path / "vector_db").glob("collection_stats.sqlite3*"):
+        path.unlink()
+    
+    stats = make_manager(vector_backend="numpy").get_stats()
+    assert stats['total_posts'] == 3
+    assert stats['total_likes'] == 6
+
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Testes da leitura dos JSONs de perfil (data_loader.py), comparando com as
+implementações de referência (json.load, a carga sequencial e o dateutil).
+"""
+
+import json
+from collections import Counter
+from datetime import timezone
+from pathlib import Path
+
+import pytest
+from dateutil import parser as date_parser
+
+from data_loader import InstagramDataLoader, iter_json_array, parse_iso_timestamp
+
+
+DATA_FILES = sorted(Path("data").glob("*.json"))
+
+
+@pytest.mark.parametrize("chunk_size", [64, 1 << 16])
+@pytest.mark.parametrize("json_file", DATA_FILES, ids=lambda path: path.stem)
+def test_iter_json_array_matches_json_load(json_file, chunk_size):
+    """O streaming devolve exatamente os itens de json.load, com qualquer tamanho de leitura."""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    
+    assert list(iter_json_array(json_file, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("content", [
+    "[]",
+    " \n[ \n] \n",
+    '[1, "a,]", {"b": [2, {"c": "]"}]}, null, true, -1.5e3]',
+    '[\n  {"caption": "texto com \\"aspas\\" e \\u00e9"},\n  []\n]\n',
+])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1 << 16])
+def test_iter_json_array_small_files(tmp_path, content, chunk_size):
+    """Itens que cruzam a fronteira do buffer são lidos inteiros."""
+    path = tmp_path / "perfil.json"
+    path.write_text(content, encoding='utf-8')
+    
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == json.loads(content)
+
+
+@pytest.mark.parametrize("content", [
+    '{"id": 1}', "", "[1, 2", '[1 2]', '[{"id": 1},',
+    '[1]garbage', '[]x', '[1] ,', '[1]\n[2]\n',
+])
+@pytest.mark.parametrize("chunk_size", [1, 4, 1 << 16])
+def test_iter_json_array_rejects_invalid(tmp_path, content, chunk_size):
+    """Entradas que não são um único array JSON, inclusive com conteúdo depois do ']' final."""
+    path = tmp_path / "perfil.json"
+    path.write_text(content, encoding='utf-8')
+    
+    with pytest.raises(ValueError):
+        list(iter_json_array(path, chunk_size=chunk_size))
+
+
+def test_stream_matches_list(tmp_path, write_profile):
+    """load_all_posts(stream=True) gera os mesmos posts da carga em lista."""
+    write_profile("uff", [
+        {'id': "1", 'caption': "Greve dos servidores", 'timestamp': "2025-03-10T12:00:00.000Z"},
+        {'id': "2", 'caption': "", 'timestamp': "2025-03-11T12:00:00.000Z"},
+    ])
+    write_profile("dceuff", [
+        {'id': "7", 'caption': "Assembleia geral", 'hashtags': ["dce"], 'timestamp': "2025-03-12T12:00:00.000Z"},
+    ])
+    loader = InstagramDataLoader(str(tmp_path / "data"))
+    
+    posts = loader.load_all_posts()
+    assert [post['id'] for post in posts] == ["7", "1"]
+    assert list(loader.load_all_posts(stream=True)) == posts
+
+
+def test_truncated_profile_keeps_previous_posts(tmp_path, write_profile):
+    """Um arquivo truncado rende os posts completos e não impede os demais perfis."""
+    write_profile("uff", [{'id': "1", 'caption': "Greve dos servidores", 'timestamp': "2025-03-10T12:00:00.000Z"}])
+    broken = tmp_path / "data" / "dceuff.json"
+    broken.write_text('[{"id": "7", "caption": "Assembleia", "timestamp": "2025-03-12T12:00:00.000Z"}, {"id": "8", "cap', encoding='utf-8')
+    
+    posts = InstagramDataLoader(str(tmp_path / "data")).load_all_posts()
+    
+    assert [post['id'] for post in posts] == ["7", "1"]
+
+
+def test_parallel_load_matches_sequential(tmp_path, write_profile):
+    """O pool de processos devolve os mesmos posts, na mesma ordem da carga sequencial."""
+    for profile in ("uff", "dceuff", "reitoria"):
+        write_profile(profile, [
+            {'id': str(i), 'caption': f"Post {i} de {profile} 🎉 https://uff.br", 'likesCount': i,
+             'timestamp': f"2025-03-{i % 28 + 1:02d}T12:00:00.000Z"}
+            for i in range(11)
+        ] + [{'id': "vazio", 'caption': ""}])
+    loader = InstagramDataLoader(str(tmp_path / "data"))
+    
+    sequential = loader.load_all_posts()
+    parallel = loader.load_all_posts(workers=2, chunk_size=3)
+    
+    assert parallel == sequential
+    assert {profile: timing['posts'] for profile, timing in loader.profile_timings.items()} == {
+        "dceuff": 11, "reitoria": 11, "uff": 11,
+    }
+
+
+def test_parallel_load_matches_sequential_on_corpus():
+    """Mesma comparação sobre os JSONs de data/."""
+    loader = InstagramDataLoader()
+    
+    assert loader.load_all_posts(workers=2) == loader.load_all_posts()
+
+
+def reference_parse_timestamp(value: str):
+    """Interpretação do dateutil, com datas sem fuso consideradas UTC (referência)."""
+    parsed = date_parser.parse(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", [
+    "2025-09-30T23:12:40.000Z",
+    "2025-09-30T23:12:40Z",
+    "2025-09-30T23:12:40.123456Z",
+    "2025-03-10T12:00:00",
+    "2025-03-10 12:00:00.5",
+    "2025-03-10",
+    "2025-03-10T12:00:00-03:00",
+    "2025-03-10T12:00:00.000+05:30",
+    "2025-03-10T12:00:00+0000",
+    "March 10, 2025 12:00",
+])
+def test_parse_iso_timestamp_matches_dateutil(value):
+    """O caminho rápido e o fallback dão o mesmo instante que o dateutil, convertido para UTC."""
+    parsed = parse_iso_timestamp(value)
+    
+    assert parsed == reference_parse_timestamp(value)
+    assert parsed.tzinfo == timezone.utc
+
+
+@pytest.mark.parametrize("value", ["ontem", "", None, "2025-13-45T99:00:00Z", 1741608000])
+def test_parse_iso_timestamp_invalid(value):
+    assert parse_iso_timestamp(value) is None
+
+
+def test_parse_iso_timestamp_on_corpus():
+    """Todos os timestamps de data/ são interpretados como pelo dateutil."""
+    values = [
+        post['timestamp']
+        for json_file in DATA_FILES
+        for post in iter_json_array(json_file)
+        if post.get('timestamp')
+    ]
+    
+    assert values
+    assert [parse_iso_timestamp(value) for value in values] == [reference_parse_timestamp(value) for value in values]
+
+
+def test_invalid_timestamps_counted(tmp_path, write_profile):
+    """Timestamps inválidos viram None (não a data atual) e são contados."""
+    write_profile("uff", [
+        {'id': "1", 'caption': "Greve", 'timestamp': "2025-03-10T12:00:00.000Z"},
+        {'id': "2", 'caption': "Sem data"},
+        {'id': "3", 'caption': "Data ruim", 'timestamp': "ontem"},
+    ])
+    loader = InstagramDataLoader(str(tmp_path / "data"))
+    
+    posts = loader.load_all_posts()
+    
+    assert [post['timestamp'] for post in posts[1:]] == [None, None]
+    assert loader.invalid_timestamps == 2
+    
+    # Cada carga recomeça a contagem; estatísticas não contam de novo
+    loader.load_all_posts()
+    loader.get_profile_stats()
+    assert loader.invalid_timestamps == 2
+
+
+def reference_profile_stats(posts: list) -> dict:
+    """Estatísticas calculadas sobre a lista de posts processados (referência)."""
+    stats = {}
+    for profile in dict.fromkeys(post['profile'] for post in posts):
+        profile_posts = [post for post in posts if post['profile'] == profile]
+        dates = [post['timestamp'] for post in profile_posts if post['timestamp'] is not None]
+        stats[profile] = {
+            'total_posts': len(profile_posts),
+            'total_likes': sum(post['likesCount'] or 0 for post in profile_posts),
+            'total_comments': sum(post['commentsCount'] or 0 for post in profile_posts),
+            'date_range': {'oldest': min(dates, default=None), 'newest': max(dates, default=None)},
+            'by_type': dict(Counter(post['type'] for post in profile_posts)),
+            'by_month': dict(sorted(Counter(date.strftime('%Y-%m') for date in dates).items())),
+        }
+    return stats
+
+
+def test_profile_stats_match_reference(tmp_path, write_profile):
+    """A passada única dá os mesmos números calculados sobre os posts carregados."""
+    write_profile("uff", [
+        {'id': "1", 'type': "Video", 'caption': "Greve", 'likesCount': 10, 'commentsCount': 2,
+         'timestamp': "2025-03-10T12:00:00.000Z"},
+        {'id': "2", 'caption': "Formatura", 'likesCount': None, 'timestamp': "2025-01-05T08:00:00-03:00"},
+        {'id': "3", 'type': "Image", 'caption': "Sem data", 'likesCount': 4, 'timestamp': "ontem"},
+        {'id': "4", 'type': "Image", 'caption': "", 'likesCount': 1000},
+        {'id': "5", 'hashtags': ["só", "hashtags"], 'commentsCount': 7, 'timestamp': "2024-12-31T23:59:59Z"},
+    ])
+    write_profile("dceuff", [{'id': "9", 'caption': "", 'likesCount': 3}])
+    loader = InstagramDataLoader(str(tmp_path / "data"))
+    
+    stats = loader.get_profile_stats(aggregates=('by_type', 'by_month'))
+    
+    assert stats == reference_profile_stats(loader.load_all_posts())
+    assert list(stats) == ["uff"]
+    assert stats['uff']['total_likes'] == 14
+    assert stats['uff']['by_month'] == {'2024-12': 1, '2025-01': 1, '2025-03': 1}
+
+
+def test_profile_stats_match_reference_on_corpus():
+    """Mesma comparação sobre os JSONs de data/; sem agregados extras, só os totais."""
+    loader = InstagramDataLoader()
+    expected = reference_profile_stats(loader.load_all_posts())
+    
+    assert loader.get_profile_stats(aggregates=('by_type', 'by_month')) == expected
+    assert loader.get_profile_stats() == {
+        profile: {key: entry[key] for key in ('total_posts', 'total_likes', 'total_comments', 'date_range')}
+        for profile, entry in expected.items()
+    }
+    with pytest.raises(ValueError):
+        loader.get_profile_stats(aggregates=('by_weekday',))
+
+
+def test_process_comments_flattens_reply_tree():
+    """
+    Comentários e respostas (em qualquer nível) viram uma lista plana, em largura.
+    
+    Uma resposta repetida na lista principal entra uma vez só (na primeira ocorrência).
+    """
+    post = {
+        'id': "1",
+        'url': "https://www.instagram.com/p/1/",
+        'latestComments': [
+            {'id': "a", 'text': "Primeiro 🎉", 'ownerUsername': "ana", 'likesCount': 2, 'replies': [
+                {'id': "a1", 'text': "resposta a", 'replies': [{'id': "a1x", 'text': "tréplica"}]},
+                {'id': "a2", 'text': "   "},
+            ]},
+            {'id': "b", 'text': "", 'replies': [{'id': "b1", 'text': "resposta a um comentário vazio"}]},
+            {'id': "a1", 'text': "resposta a"},
+            {'id': 7, 'text': "id numérico", 'timestamp': "2025-03-10T12:00:00.000Z"},
+        ],
+    }
+    
+    comments = InstagramDataLoader().process_comments(post, "uff")
+    
+    assert [(comment['id'], comment['reply_to']) for comment in comments] == [
+        ("a", ""), ("a1", ""), ("7", ""), ("b1", "b"), ("a1x", "a1"),
+    ]
+    assert comments[0]['text'] == "Primeiro"
+    assert comments[0]['owner'] == "ana"
+    assert comments[0]['likesCount'] == 2
+    assert {comment['post_id'] for comment in comments} == {"1"}
+    assert {comment['profile'] for comment in comments} == {"uff"}
+    assert comments[2]['timestamp'] == parse_iso_timestamp("2025-03-10T12:00:00.000Z")
+    assert InstagramDataLoader().process_comments({'id': "2", 'latestComments': None}, "uff") == []
+
+
+def test_iter_all_comments(tmp_path, write_profile):
+    """iter_all_comments percorre os comentários de todos os perfis."""
+    write_profile("uff", [
+        {'id': "1", 'caption': "Greve", 'latestComments': [{'id': "c1", 'text': "apoio"}]},
+        {'id': "2", 'caption': "Sem comentários"},
+    ])
+    write_profile("dceuff", [{'id': "9", 'latestComments': [{'id': "c9", 'text': "assembleia"}]}])
+    
+    comments = list(InstagramDataLoader(str(tmp_path / "data")).iter_all_comments())
+    
+    assert [(comment['profile'], comment['post_id'], comment['id']) for comment in comments] == [
+        ("dceuff", "9", "c9"), ("uff", "1", "c1"),
+    ]
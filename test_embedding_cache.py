@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Testes dos caches de embeddings (embedding_cache.py): o persistente, usado
+na indexação, e o LRU em memória das consultas.
+"""
+
+from array import array
+
+import embedding_cache
+from embedding_cache import EmbeddingCache, QueryEmbeddingLRU
+
+
+def test_cache_roundtrip(tmp_path):
+    """Vetores voltam em float32, na ordem dos textos, separados por modelo."""
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3")
+    cache.put_many("modelo", ["a", "b"], [[0.1, 0.2], [0.3, 0.4]])
+    
+    found = cache.get_many("modelo", ["b", "c", "a", "b"])
+    assert found == [array('f', [0.3, 0.4]).tolist(), None, array('f', [0.1, 0.2]).tolist(), found[0]]
+    assert cache.get_many("outro", ["a"]) == [None]
+    assert (cache.hits, cache.misses) == (3, 2)
+    cache.close()
+    
+    reopened = EmbeddingCache(tmp_path / "cache.sqlite3")
+    assert len(reopened) == 2
+    assert reopened.get_many("modelo", ["a"]) == [array('f', [0.1, 0.2]).tolist()]
+
+
+def test_generate_embeddings_uses_cache(make_manager, fake_ollama):
+    """Só os textos ausentes do cache (sem repetição) vão ao Ollama; o resultado não depende do cache."""
+    manager = make_manager(use_embedding_cache=True)
+    uncached = make_manager(collection_name="sem_cache")
+    
+    first = manager.generate_embeddings(["a", "b", "a"])
+    assert fake_ollama.stats['embedded_texts'] == 2
+    second = manager.generate_embeddings(["c", "b", "a"])
+    assert fake_ollama.stats['embedded_texts'] == 3
+    
+    assert second[1:] == [first[1], first[0]]
+    assert second == [array('f', vector).tolist() for vector in uncached.generate_embeddings(["c", "b", "a"])]
+
+
+def test_warm_cache_reindex_skips_ollama(make_manager, make_post, fake_ollama):
+    """Re-indexar após clear_collection, com o cache aquecido, não faz nenhuma requisição de embedding."""
+    posts = [make_post(str(i)) for i in range(12)]
+    manager = make_manager(use_embedding_cache=True)
+    manager.add_posts(posts, batch_size=5)
+    expected = manager.search("post 7 de uff", n_results=3)
+    requests = fake_ollama.stats['requests']['/api/embed']
+    
+    manager.clear_collection()
+    assert manager.collection.count() == 0
+    manager.add_posts(posts, batch_size=5)
+    
+    assert manager.collection.count() == 12
+    found = manager.search("post 7 de uff", n_results=3)
+    assert found['ids'][0][0] == expected['ids'][0][0]
+    assert found['distances'] == expected['distances']
+    assert fake_ollama.stats['requests']['/api/embed'] == requests
+
+
+def test_query_lru_evicts_least_recently_used():
+    """Acima de max_size sai a consulta usada há mais tempo; get renova a entrada."""
+    lru = QueryEmbeddingLRU(max_size=2, ttl_seconds=None)
+    lru.put("a", [1.0])
+    lru.put("b", [2.0])
+    assert lru.get("a") == [1.0]
+    lru.put("c", [3.0])
+    
+    assert lru.get("b") is None
+    assert lru.get("a") == [1.0]
+    assert lru.get("c") == [3.0]
+    assert lru.info() == {'hits': 3, 'misses': 1, 'hit_rate': 0.75, 'size': 2, 'max_size': 2}
+    
+    disabled = QueryEmbeddingLRU(max_size=0)
+    disabled.put("a", [1.0])
+    assert disabled.get("a") is None
+
+
+def test_query_lru_expires_entries(monkeypatch):
+    """Entradas vencidas (ttl_seconds) contam como ausentes e são descartadas."""
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "monotonic", lambda: now[0])
+    lru = QueryEmbeddingLRU(max_size=10, ttl_seconds=60)
+    lru.put("a", [1.0])
+    
+    now[0] += 59
+    assert lru.get("a") == [1.0]
+    now[0] += 2
+    assert lru.get("a") is None
+    assert lru.info()['size'] == 0
+    
+    forever = QueryEmbeddingLRU(max_size=10, ttl_seconds=None)
+    forever.put("a", [1.0])
+    now[0] += 10 ** 6
+    assert forever.get("a") == [1.0]
+
+
+def test_embed_query_reuses_normalized_queries(make_manager, fake_ollama):
+    """Consultas que só diferem em caixa e espaços embedam uma vez só."""
+    manager = make_manager()
+    first = manager.embed_query("Reitor  UFF")
+    
+    assert manager.embed_query(" reitor uff ") == first
+    assert manager.embed_query("REITOR UFF") == first
+    assert fake_ollama.stats['requests']['/api/embed'] == 1
+    assert manager.get_stats()['query_cache']['hits'] == 2
+
+
+def test_embed_query_sends_original_text(make_manager, monkeypatch):
+    """A chave do cache é normalizada, mas o modelo recebe a consulta como digitada."""
+    manager = make_manager()
+    sent = []
+    generate = manager.generate_embeddings
+    
+    def recording_generate(texts, *args, **kwargs):
+        sent.append(list(texts))
+        return generate(texts, *args, **kwargs)
+    
+    monkeypatch.setattr(manager, "generate_embeddings", recording_generate)
+    manager.embed_queries(["Reitor  UFF", "reitor uff", "Campus Gragoatá"])
+    manager.embed_query("REITOR UFF")
+    
+    assert sent == [["Reitor  UFF", "Campus Gragoatá"]]
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Testes da geração de embeddings em lote, da gravação dos documentos e das
+buscas em lote (search_many) do EmbeddingManager (embedding_manager.py).
+"""
+
+import time
+
+import pytest
+
+from embedding_manager import EmbeddingManager
+from fake_ollama import hash_embedding
+
+
+def test_split_embedding_batches(make_manager):
+    """Os lotes respeitam EMBED_BATCH_SIZE e EMBED_BATCH_CHARS, na ordem dos textos."""
+    manager = make_manager()
+    size, chars = EmbeddingManager.EMBED_BATCH_SIZE, EmbeddingManager.EMBED_BATCH_CHARS
+    texts = [f"texto {i}" for i in range(size * 2 + 5)]
+    texts += ["x" * (chars // 3)] * 4
+    texts += ["grande " * (chars // 4), "depois do grande"]
+    
+    batches = list(manager._split_embedding_batches(texts))
+    
+    assert [text for batch in batches for text in batch] == texts
+    assert [len(batch) for batch in batches[:3]] == [size, size, 5 + 2]
+    for batch in batches:
+        assert len(batch) <= size
+        assert len(batch) == 1 or sum(len(text) for text in batch) <= chars
+    # Um texto acima do limite de caracteres vai sozinho em seu lote
+    assert ["grande " * (chars // 4)] in batches
+    assert batches[-1] == ["depois do grande"]
+    assert list(manager._split_embedding_batches([])) == []
+
+
+def test_generate_embeddings_batches_requests(make_manager, fake_ollama):
+    """Cada lote é uma requisição a /api/embed; os vetores voltam na ordem dos textos."""
+    manager = make_manager()
+    texts = [f"post {i} sobre a universidade" for i in range(EmbeddingManager.EMBED_BATCH_SIZE + 1)]
+    
+    embeddings = manager.generate_embeddings(texts)
+    
+    assert fake_ollama.stats['requests']['/api/embed'] == 2
+    assert fake_ollama.stats['embedded_texts'] == len(texts)
+    assert embeddings == [hash_embedding(text, fake_ollama.dim, manager.embedding_model) for text in texts]
+    assert manager.generate_embedding(texts[3]) == embeddings[3]
+
+
+def test_generate_embeddings_checks_response_size(make_manager, monkeypatch):
+    """Uma resposta com menos embeddings que textos é um erro, não um desalinhamento."""
+    manager = make_manager()
+    monkeypatch.setattr(manager.ollama_client, "embed", lambda model, input, **kwargs: {'embeddings': [[1.0, 0.0]]})
+    
+    with pytest.raises(ValueError):
+        manager.generate_embeddings(["a", "b"])
+
+
+def test_add_posts_embeds_each_batch_once(make_manager, make_post, fake_ollama):
+    """add_posts embeda cada lote em uma única requisição."""
+    manager = make_manager()
+    manager.add_posts([make_post(str(i)) for i in range(25)], batch_size=10)
+    
+    assert manager.collection.count() == 25
+    assert fake_ollama.stats['requests']['/api/embed'] == 3
+    assert fake_ollama.stats['embedded_texts'] == 25
+
+
+def test_add_posts_propagates_embedding_errors(make_manager, make_post, fake_ollama, monkeypatch):
+    """Um lote que falha interrompe a indexação; só os lotes anteriores são gravados."""
+    manager = make_manager(embed_workers=3)
+    fake_embed = manager.ollama_client.embed
+    
+    def embed(model="", input=(), **kwargs):
+        if "post 12 " in " ".join(input):
+            raise ConnectionError("ollama fora do ar")
+        return fake_embed(model=model, input=input, **kwargs)
+    
+    monkeypatch.setattr(manager.ollama_client, "embed", embed)
+    
+    with pytest.raises(ConnectionError):
+        manager.add_posts([make_post(str(i)) for i in range(30)], batch_size=5)
+    
+    assert sorted(manager.collection.get(include=[])['ids']) == sorted(f"uff_{i}" for i in range(10))
+
+
+def test_add_posts_writes_in_submission_order(make_manager, make_post, fake_ollama, monkeypatch):
+    """Lotes que terminam fora de ordem são gravados na ordem de envio, com no máximo max_in_flight em andamento."""
+    manager = make_manager(embed_workers=3, max_in_flight=3)
+    fake_embed = manager.ollama_client.embed
+    
+    def embed(model="", input=(), **kwargs):
+        # Os primeiros lotes de cada janela são os mais lentos
+        first = int(input[0].split()[1])
+        time.sleep(0.02 * (2 - (first // 4) % 3))
+        return fake_embed(model=model, input=input, **kwargs)
+    
+    monkeypatch.setattr(manager.ollama_client, "embed", embed)
+    
+    written = []
+    in_flight = []
+    add = manager.collection.add
+    
+    def recording_add(ids, **kwargs):
+        written.append(ids)
+        add(ids=ids, **kwargs)
+    
+    monkeypatch.setattr(manager.collection, "add", recording_add)
+    
+    def posts():
+        for i in range(36):
+            if i % 4 == 0:
+                in_flight.append(i // 4 - len(written))
+            yield make_post(str(i))
+    
+    manager.add_posts(posts(), batch_size=4)
+    
+    assert written == [[f"uff_{i}" for i in range(start, start + 4)] for start in range(0, 36, 4)]
+    assert max(in_flight) == manager.max_in_flight - 1
+
+
+@pytest.mark.parametrize("vector_backend", ["chroma", "numpy"])
+def test_search_many_matches_search(make_manager, make_post, fake_ollama, vector_backend):
+    """search_many com filtros diferentes por busca devolve, na ordem de entrada, o mesmo que search."""
+    topics = ["greve", "vestibular", "formatura", "biblioteca"]
+    profiles = ["uff", "dceuff", "reitoria"]
+    manager = make_manager(vector_backend=vector_backend)
+    manager.add_posts([
+        make_post(str(i), f"post {i} sobre {topics[i % 4]} no campus", profile=profiles[i % 3], likes=i)
+        for i in range(30)
+    ])
+    queries = ["greve no campus", "post 7 vestibular", "formatura", "biblioteca", "greve no campus"]
+    filters = ["uff", None, "reitoria", "uff", None]
+    
+    requests = fake_ollama.stats['requests']['/api/embed']
+    results = manager.search_many(queries, n_results=4, filters=filters)
+    # Uma requisição para as consultas distintas
+    assert fake_ollama.stats['requests']['/api/embed'] == requests + 1
+    assert fake_ollama.stats['embedded_texts'] == 30 + 4
+    
+    assert len(results['ids']) == len(queries)
+    for i, (query, profile) in enumerate(zip(queries, filters)):
+        expected = manager.search(query, n_results=4, profile_filter=profile)
+        assert results['ids'][i] == expected['ids'][0]
+        assert results['metadatas'][i] == expected['metadatas'][0]
+        assert results['distances'][i] == pytest.approx(expected['distances'][0], abs=1e-6)
+        if profile:
+            assert {metadata['profile'] for metadata in results['metadatas'][i]} == {profile}
+    
+    # Consultas repetidas saem do cache LRU, sem nova requisição
+    requests = fake_ollama.stats['requests']['/api/embed']
+    assert manager.search_many(queries[:2], n_results=4, filters="uff")['ids'][0] == results['ids'][0]
+    assert fake_ollama.stats['requests']['/api/embed'] == requests
+
+
+def test_search_many_arguments(make_manager):
+    """Lista vazia não embeda nada; filtros desalinhados com as consultas são erro."""
+    manager = make_manager()
+    assert manager.search_many([]) == {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+    with pytest.raises(ValueError):
+        manager.search_many(["a", "b"], filters=["uff"])
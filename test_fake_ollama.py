@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Testes do servidor falso do Ollama (fake_ollama.py) com o cliente real.
+"""
+
+import json
+import urllib.request
+
+import numpy as np
+import ollama
+
+from fake_ollama import hash_embedding
+
+
+def test_embed_is_deterministic(fake_ollama):
+    """Embeddings em lote são determinísticos, normalizados e iguais aos de hash_embedding."""
+    client = ollama.Client(host=fake_ollama.host)
+    texts = ["greve dos servidores", "formatura de medicina", "greve dos servidores"]
+    
+    response = client.embed(model="mxbai-embed-large", input=texts)
+    embeddings = np.array(response['embeddings'])
+    
+    assert embeddings.shape == (3, fake_ollama.dim)
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+    assert np.allclose(embeddings[0], embeddings[2])
+    assert np.allclose(embeddings[0], hash_embedding(texts[0], fake_ollama.dim, "mxbai-embed-large"))
+
+
+def test_chat_and_stream(fake_ollama):
+    """Chat com e sem streaming devolve texto; format='json' devolve JSON válido."""
+    client = ollama.Client(host=fake_ollama.host)
+    messages = [{'role': 'user', 'content': 'Resuma os posts sobre greve'}]
+    
+    response = client.chat(model="qwen3:30b", messages=messages)
+    assert response['message']['content']
+    
+    chunks = list(client.chat(model="qwen3:30b", messages=messages, stream=True))
+    assert chunks[-1]['done']
+    assert "".join(chunk['message']['content'] for chunk in chunks)
+    
+    response = client.chat(model="qwen3:30b", messages=messages, format='json')
+    json.loads(response['message']['content'])
+
+
+def test_stats_endpoint(fake_ollama):
+    """/fake/stats conta as requisições e os textos embedados."""
+    client = ollama.Client(host=fake_ollama.host)
+    before = fake_ollama.stats['embedded_texts']
+    client.embed(model="mxbai-embed-large", input=["a", "b"])
+    
+    with urllib.request.urlopen(f"{fake_ollama.host}/fake/stats") as response:
+        stats = json.loads(response.read())
+    
+    assert stats['embedded_texts'] == before + 2
+    assert stats['requests']['/api/embed'] == 1
+
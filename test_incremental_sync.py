@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Testes da indexação incremental pelos hashes de conteúdo (index_all_posts(incremental=True)).
+"""
+
+
+def raw_post(post_id: str, caption: str, likes: int = 0) -> dict:
+    """Post bruto no formato dos JSONs de perfil."""
+    return {
+        'id': post_id,
+        'url': f"https://www.instagram.com/p/{post_id}/",
+        'caption': caption,
+        'timestamp': "2025-03-10T12:00:00.000Z",
+        'likesCount': likes,
+    }
+
+
+def test_incremental_sync_embeds_only_changes(make_rag, fake_ollama, write_profile):
+    """Só posts novos ou com texto alterado são embedados; removidos saem do índice."""
+    write_profile("uff", [
+        raw_post("1", "greve dos servidores"),
+        raw_post("2", "formatura de medicina", likes=10),
+        raw_post("3", "vestibular aberto"),
+    ])
+    rag = make_rag()
+    rag.index_all_posts()
+    manager = rag.embedding_manager
+    assert manager.collection.count() == 3
+    before = manager.get_indexed_hashes()
+    
+    write_profile("uff", [
+        raw_post("1", "greve dos servidores encerrada"),  # texto alterado
+        raw_post("2", "formatura de medicina", likes=25),  # só metadados
+        raw_post("4", "calendário acadêmico"),             # novo
+    ])
+    embedded = fake_ollama.stats['embedded_texts']
+    rag.index_all_posts(incremental=True)
+    
+    assert fake_ollama.stats['embedded_texts'] - embedded == 2
+    after = manager.get_indexed_hashes()
+    assert set(after) == {"uff_1", "uff_2", "uff_4"}
+    assert after["uff_1"]['content_hash'] != before["uff_1"]['content_hash']
+    assert after["uff_2"]['content_hash'] == before["uff_2"]['content_hash']
+    assert after["uff_2"]['metadata_hash'] != before["uff_2"]['metadata_hash']
+    
+    stored = manager.collection.get(ids=["uff_1", "uff_2"], include=['documents', 'metadatas'])
+    by_id = dict(zip(stored['ids'], zip(stored['documents'], stored['metadatas'])))
+    assert "encerrada" in by_id["uff_1"][0]
+    assert by_id["uff_2"][1]['likesCount'] == 25
+
+
+def test_incremental_sync_without_changes(make_rag, fake_ollama, write_profile):
+    """Uma segunda sincronização sem alterações não embeda nem altera nada."""
+    write_profile("uff", [raw_post("1", "greve dos servidores"), raw_post("2", "formatura")])
+    rag = make_rag()
+    rag.index_all_posts(incremental=True)
+    hashes = rag.embedding_manager.get_indexed_hashes()
+    assert set(hashes) == {"uff_1", "uff_2"}
+    
+    embedded = fake_ollama.stats['embedded_texts']
+    rag.index_all_posts(incremental=True)
+    
+    assert fake_ollama.stats['embedded_texts'] == embedded
+    assert rag.embedding_manager.get_indexed_hashes() == hashes
+
+
+def test_incremental_sync_keeps_failed_profiles(make_rag, write_profile):
+    """Posts de um perfil cuja leitura falhou não são removidos do índice."""
+    write_profile("uff", [raw_post("1", "greve dos servidores")])
+    broken = write_profile("dceuff", [raw_post("7", "assembleia geral")])
+    rag = make_rag()
+    rag.index_all_posts()
+    
+    broken.write_text('[{"id": "7", "caption": "assembleia', encoding='utf-8')
+    rag.index_all_posts(incremental=True)
+    
+    assert rag.data_loader.failed_profiles == {"dceuff"}
+    assert set(rag.embedding_manager.get_indexed_hashes()) == {"uff_1", "dceuff_7"}
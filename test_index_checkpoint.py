@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Testes do checkpoint de indexação (index_checkpoint.py): retomada de uma
+indexação interrompida e relatório de verify_index.
+"""
+
+import pytest
+
+from index_checkpoint import IndexCheckpoint
+
+
+class Interrupted(Exception):
+    """Queda simulada no meio da indexação."""
+
+
+def make_posts(count: int, suffix: str = "") -> list:
+    """Posts brutos curtos, um assunto por post."""
+    return [
+        {'id': str(i), 'caption': f"post {i} sobre o campus {suffix}", 'likesCount': i,
+         'timestamp': "2025-03-10T12:00:00.000Z"}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def make_indexer(make_rag):
+    """RAGSystem sem cache de posts e com um worker (lotes gravados em ordem)."""
+    return lambda: make_rag(use_post_cache=False, embed_workers=1)
+
+
+def interrupt_after(monkeypatch, batches: int):
+    """Faz a indexação cair logo após gravar o n-ésimo lote (antes de registrá-lo)."""
+    record = IndexCheckpoint.record
+    calls = []
+    
+    def failing_record(self, ids):
+        calls.append(len(ids))
+        if len(calls) >= batches:
+            raise Interrupted()
+        record(self, ids)
+    
+    monkeypatch.setattr(IndexCheckpoint, "record", failing_record)
+
+
+def test_committed_ids_ignore_partial_line(tmp_path):
+    """Uma linha sem '\\n' no fim do .ids (escrita interrompida) é ignorada."""
+    checkpoint = IndexCheckpoint(tmp_path, "posts")
+    checkpoint.start({'uff': {'mtime_ns': 1, 'size': 2}}, {'embedding_model': "m"})
+    checkpoint.record(["a", "b"])
+    with open(checkpoint.ids_path, 'a', encoding='utf-8') as f:
+        f.write("c")
+    
+    assert checkpoint.committed_ids() == {"a", "b"}
+    manifest = IndexCheckpoint(tmp_path, "posts").load()
+    assert manifest['status'] == 'running'
+    assert manifest['committed'] == 2
+    
+    checkpoint.complete({}, {}, 2)
+    assert not checkpoint.ids_path.exists()
+    assert checkpoint.load()['status'] == 'complete'
+
+
+def test_resume_embeds_only_remaining(make_indexer, monkeypatch, fake_ollama, write_profile):
+    """Uma indexação interrompida é retomada sem re-embedar o que já foi gravado."""
+    write_profile("uff", make_posts(250))
+    rag = make_indexer()
+    
+    with monkeypatch.context() as patch:
+        interrupt_after(patch, batches=2)
+        with pytest.raises(Interrupted):
+            rag.index_all_posts()
+    
+    written = rag.embedding_manager.collection.count()
+    assert 0 < written < 250
+    checkpoint = rag._checkpoint_for(rag.embedding_manager.collection)
+    assert checkpoint.load()['status'] == 'running'
+    
+    rag = make_indexer()
+    embedded = fake_ollama.stats['embedded_texts']
+    rag.index_all_posts()
+    
+    assert fake_ollama.stats['embedded_texts'] - embedded == 250 - written
+    assert rag.embedding_manager.collection.count() == 250
+    assert checkpoint.load()['status'] == 'complete'
+    
+    # Índice completo e fontes iguais: nada a fazer
+    embedded = fake_ollama.stats['embedded_texts']
+    rag.index_all_posts()
+    assert fake_ollama.stats['embedded_texts'] == embedded
+
+
+def test_resume_after_sources_changed(make_indexer, monkeypatch, write_profile):
+    """Se as fontes mudaram desde a queda, a retomada sincroniza pelos hashes."""
+    write_profile("uff", make_posts(250))
+    rag = make_indexer()
+    with monkeypatch.context() as patch:
+        interrupt_after(patch, batches=1)
+        with pytest.raises(Interrupted):
+            rag.index_all_posts()
+    
+    write_profile("uff", make_posts(120, suffix="atualizado"))
+    rag = make_indexer()
+    rag.index_all_posts()
+    
+    report = rag.verify_index()
+    assert rag.embedding_manager.collection.count() == 120
+    assert report['checkpoint'] == 'complete'
+    assert report['missing'] == report['stale_content'] == report['extra'] == []
+
+
+def test_failed_profile_keeps_checkpoint_running(make_indexer, fake_ollama, write_profile):
+    """Um perfil ilegível deixa o checkpoint em andamento até ser lido por inteiro."""
+    write_profile("uff", make_posts(5))
+    path = write_profile("dceuff", make_posts(4))
+    path.write_text(path.read_text(encoding='utf-8')[:-40], encoding='utf-8')
+    rag = make_indexer()
+    rag.index_all_posts()
+    
+    checkpoint = rag._checkpoint_for(rag.embedding_manager.collection)
+    manifest = checkpoint.load()
+    assert manifest['status'] == 'running'
+    assert manifest['failed_profiles'] == ["dceuff"]
+    
+    # O perfil continua ilegível: retoma sem re-embedar o que já foi gravado
+    embedded = fake_ollama.stats['embedded_texts']
+    make_indexer().index_all_posts()
+    assert fake_ollama.stats['embedded_texts'] == embedded
+    assert checkpoint.load()['status'] == 'running'
+    
+    write_profile("dceuff", make_posts(4))
+    rag = make_indexer()
+    rag.index_all_posts()
+    manifest = checkpoint.load()
+    assert manifest['status'] == 'complete'
+    assert 'failed_profiles' not in manifest
+    assert rag.embedding_manager.collection.count() == 9
+    
+    # Na sincronização incremental também
+    path.write_text("[", encoding='utf-8')
+    make_indexer().index_all_posts(incremental=True)
+    assert checkpoint.load()['status'] == 'running'
+    assert rag.embedding_manager.collection.count() == 9
+
+
+def test_verify_index_reports_gaps(make_indexer, write_profile):
+    """verify_index lista o que falta, o que está desatualizado e o que sobra."""
+    posts = make_posts(5)
+    write_profile("uff", posts)
+    rag = make_indexer()
+    rag.index_all_posts()
+    
+    rag.embedding_manager.delete_posts(["uff_0"])
+    posts[1]['caption'] = "texto novo"
+    posts[2]['likesCount'] = 500
+    del posts[3]
+    write_profile("uff", posts)
+    report = rag.verify_index()
+    
+    assert report['checkpoint'] == "complete (fontes ou configuração mudaram)"
+    assert report['source_documents'] == 4
+    assert report['missing'] == ["uff_0"]
+    assert report['stale_content'] == ["uff_1"]
+    assert report['stale_metadata'] == ["uff_2"]
+    assert report['extra'] == ["uff_3"]
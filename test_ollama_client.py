@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Testes do cliente Ollama compartilhado (ollama_client.py): keep_alive,
+métricas por operação e modelo e uso pelos componentes.
+"""
+
+import pytest
+
+from embedding_manager import EmbeddingManager
+from ollama_client import OllamaClient
+
+
+MODEL = "mxbai-embed-large"
+CHAT_MODEL = "qwen3:30b"
+
+
+@pytest.mark.parametrize("keep_alive, expected", [
+    ("-1", -1),
+    ("3600", 3600),
+    ("30m", "30m"),
+    (600, 600),
+    (None, None),
+])
+def test_keep_alive_from_command_line(keep_alive, expected):
+    """Números em texto (ex: --keep-alive -1) viram números; durações com unidade ficam como estão."""
+    client = OllamaClient(keep_alive=keep_alive)
+    assert client.keep_alive == expected
+    client.close()
+
+
+def test_keep_alive_sent_with_requests(fake_ollama):
+    """O keep_alive do cliente vai em toda requisição: o servidor só recarrega o modelo vencido."""
+    fake_ollama.load_ms = 20
+    
+    expiring = OllamaClient(host=fake_ollama.host, keep_alive=0, reload_threshold=0.01)
+    for _ in range(3):
+        expiring.embed(MODEL, "texto")
+    assert fake_ollama.stats['model_loads'] == 3
+    assert expiring.metrics()[f"embed {MODEL}"]['reloads'] == 3
+    expiring.close()
+    
+    forever = OllamaClient(host=fake_ollama.host, keep_alive="-1", reload_threshold=0.01)
+    for _ in range(3):
+        forever.embed(MODEL, "texto")
+        forever.chat(CHAT_MODEL, [{'role': 'user', 'content': "oi"}])
+    assert fake_ollama.stats['model_loads'] == 3 + 2
+    assert forever.metrics()[f"embed {MODEL}"]['reloads'] == 1
+    forever.close()
+
+
+def test_metrics_count_requests_and_errors(fake_client):
+    """Chamadas com e sem streaming entram nas métricas; falhas contam como erro."""
+    fake_client.embed(MODEL, ["a", "b"])
+    fake_client.embed(MODEL, "c")
+    fake_client.chat(CHAT_MODEL, [{'role': 'user', 'content': "oi"}])
+    chunks = list(fake_client.chat(CHAT_MODEL, [{'role': 'user', 'content': "oi"}], stream=True))
+    assert chunks[-1]['done']
+    
+    metrics = fake_client.metrics()
+    assert set(metrics) == {f"embed {MODEL}", f"chat {CHAT_MODEL}"}
+    embed = metrics[f"embed {MODEL}"]
+    assert (embed['requests'], embed['errors'], embed['reloads']) == (2, 0, 0)
+    assert 0 < embed['p50_ms'] <= embed['p95_ms']
+    assert embed['mean_ms'] > 0
+    assert metrics[f"chat {CHAT_MODEL}"]['requests'] == 2
+    
+    offline = OllamaClient(host="http://127.0.0.1:1", connect_timeout=0.5)
+    with pytest.raises(ConnectionError):
+        offline.embed(MODEL, "a")
+    failed = offline.metrics()[f"embed {MODEL}"]
+    assert (failed['requests'], failed['errors']) == (1, 1)
+    offline.close()
+
+
+def test_components_share_default_client(fake_ollama, tmp_path):
+    """Sem ollama_client, os componentes usam o cliente único do processo (OLLAMA_HOST)."""
+    first = EmbeddingManager(persist_dir=str(tmp_path / "a"), use_embedding_cache=False)
+    second = EmbeddingManager(persist_dir=str(tmp_path / "b"), use_embedding_cache=False)
+    assert first.ollama_client is second.ollama_client
+    
+    first.generate_embeddings(["a", "b"])
+    assert fake_ollama.stats['embedded_texts'] == 2
+    assert second.get_stats()['ollama'][f"embed {MODEL}"]['requests'] == 1
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Testes do cache colunar de posts processados (post_cache.py).
+"""
+
+import data_loader
+import post_cache
+from data_loader import InstagramDataLoader
+
+
+POSTS = [
+    {
+        'id': "1", 'type': "Image", 'url': "https://www.instagram.com/p/1/",
+        'caption': "Greve dos servidores 🎉 https://uff.br", 'timestamp': "2025-03-10T12:00:00.000Z",
+        'likesCount': 10, 'commentsCount': 2, 'hashtags': ["greve"], 'mentions': ["dceuff"],
+        'latestComments': [{'id': "c1", 'text': "apoio total"}],
+    },
+    {'id': "2", 'caption': "timestamp ruim", 'timestamp': "ontem", 'likesCount': 3},
+    {'id': "3", 'caption': ""},                  # sem texto
+    {'id': "4", 'likesCount': "muitos"},          # quarentena
+]
+
+
+def make_loader(tmp_path) -> InstagramDataLoader:
+    """Carregador com cache em <tmp_path>/data/.cache."""
+    data_dir = tmp_path / "data"
+    return InstagramDataLoader(str(data_dir), cache_dir=str(data_dir / ".cache"))
+
+
+def forbid_json(monkeypatch):
+    """Faz qualquer leitura de JSON de perfil falhar (a carga precisa vir do cache)."""
+    def fail(*args, **kwargs):
+        raise AssertionError("JSON lido apesar do cache válido")
+    monkeypatch.setattr(data_loader, "iter_json_array", fail)
+
+
+def test_cache_roundtrip(tmp_path, write_profile, monkeypatch):
+    """Posts lidos do cache são idênticos aos processados do JSON, com os mesmos contadores."""
+    write_profile("uff", POSTS)
+    loader = make_loader(tmp_path)
+    processed = loader.load_all_posts()
+    counters = dict(loader.ingest_counters)
+    assert loader.cache.path_for("uff").exists()
+    assert counters == {'accepted': 2, 'empty': 1, 'quarantined': 1}
+    
+    forbid_json(monkeypatch)
+    loader = make_loader(tmp_path)
+    cached = loader.load_all_posts()
+    assert cached == processed
+    assert [post['id'] for post in cached] == ["1", "2"]
+    assert cached[1]['timestamp'] is None
+    assert dict(loader.ingest_counters) == counters
+    assert list(make_loader(tmp_path).load_all_posts(stream=True)) == processed
+
+
+def test_parallel_load_writes_cache(tmp_path, write_profile, monkeypatch):
+    """A carga com pool de processos também grava o cache."""
+    write_profile("uff", POSTS)
+    processed = make_loader(tmp_path).load_all_posts(workers=1, chunk_size=1)
+    
+    forbid_json(monkeypatch)
+    loader = make_loader(tmp_path)
+    assert loader.load_all_posts() == processed
+    assert dict(loader.ingest_counters) == {'accepted': 2, 'empty': 1, 'quarantined': 1}
+
+
+def test_cache_invalidated_when_source_changes(tmp_path, write_profile):
+    """Alterar o JSON do perfil invalida o cache."""
+    write_profile("uff", POSTS[:1])
+    make_loader(tmp_path).load_all_posts()
+    
+    write_profile("uff", [dict(POSTS[0], likesCount=99), {'id': "5", 'caption': "novo post"}])
+    posts = make_loader(tmp_path).load_all_posts()
+    
+    assert [post['id'] for post in posts] == ["1", "5"]
+    assert posts[0]['likesCount'] == 99
+
+
+def test_cache_invalidated_by_format_version(tmp_path, write_profile, monkeypatch):
+    """Um cache de outra versão do formato é ignorado e regravado."""
+    write_profile("uff", POSTS[:1])
+    make_loader(tmp_path).load_all_posts()
+    
+    monkeypatch.setattr(post_cache, "FORMAT_VERSION", post_cache.FORMAT_VERSION + 1)
+    loader = make_loader(tmp_path)
+    assert loader.cache.open("uff", tmp_path / "data" / "uff.json") is None
+    assert len(loader.load_all_posts()) == 1
+    assert loader.cache.open("uff", tmp_path / "data" / "uff.json") is not None
+
+
+def test_profile_stats_from_cache(tmp_path, write_profile, monkeypatch):
+    """get_profile_stats usa o cache quando válido e dá o mesmo resultado."""
+    write_profile("uff", POSTS)
+    loader = make_loader(tmp_path)
+    expected = loader.get_profile_stats(aggregates=('by_type', 'by_month'))
+    loader.load_all_posts()
+    
+    forbid_json(monkeypatch)
+    assert make_loader(tmp_path).get_profile_stats(aggregates=('by_type', 'by_month')) == expected
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Testes da validação de posts brutos e da quarentena na ingestão (data_loader.py).
+"""
+
+import json
+
+import pytest
+
+from data_loader import InstagramDataLoader, validate_raw_post
+
+
+VALID = {
+    'id': "1", 'type': "Image", 'caption': "Greve dos servidores", 'timestamp': "2025-03-10T12:00:00.000Z",
+    'likesCount': 10, 'commentsCount': 1, 'hashtags': ["greve"],
+    'latestComments': [{'id': "c1", 'text': "apoio total"}],
+}
+
+PROFILE = [
+    VALID,
+    {'id': "2", 'likesCount': "muitos", 'caption': "quarentena"},
+    dict(VALID, id="3", caption="depois do inválido"),
+    {'id': "4", 'caption': ""},
+    ["lista", "no", "lugar", "do", "post"],
+]
+
+
+@pytest.mark.parametrize("post, reason", [
+    ("texto solto", "post não é um objeto JSON (str)"),
+    ({'caption': "sem id"}, "campo 'id' ausente"),
+    (dict(VALID, likesCount="10"), "campo 'likesCount' com tipo inválido (str)"),
+    (dict(VALID, likesCount=True), "campo 'likesCount' com tipo inválido (bool)"),
+    (dict(VALID, hashtags=["greve", 7]), "campo 'hashtags' contém itens que não são texto"),
+    (dict(VALID, latestComments=["oi"]), "comentário não é um objeto JSON"),
+    (dict(VALID, latestComments=[{'text': 3}]), "comentário com texto inválido"),
+])
+def test_validate_raw_post_rejects(post, reason):
+    assert validate_raw_post(post) == reason
+
+
+def test_validate_raw_post_accepts_missing_fields():
+    """Campos ausentes ou nulos são aceitos; só o id é obrigatório."""
+    assert validate_raw_post(VALID) is None
+    assert validate_raw_post({'id': 5, 'caption': None, 'likesCount': None}) is None
+
+
+def test_invalid_posts_go_to_quarantine(tmp_path, write_profile):
+    """Posts inválidos vão para a quarentena sem interromper o perfil."""
+    write_profile("uff", PROFILE)
+    loader = InstagramDataLoader(str(tmp_path / "data"))
+    posts = loader.load_all_posts()
+    
+    assert [post['id'] for post in posts] == ["1", "3"]
+    assert dict(loader.ingest_counters) == {'accepted': 2, 'empty': 1, 'quarantined': 2}
+    assert loader.failed_profiles == set()
+    
+    records = [json.loads(line) for line in loader.quarantine_path.read_text(encoding='utf-8').splitlines()]
+    assert [record['post'] for record in records] == [PROFILE[1], PROFILE[4]]
+    assert {record['profile'] for record in records} == {"uff"}
+    assert records[0]['reason'] == "campo 'likesCount' com tipo inválido (str)"
+    assert sum(loader.quarantine_reasons.values()) == 2
+
+
+def test_parallel_load_quarantines_the_same_posts(tmp_path, write_profile):
+    """O pool de processos aceita e rejeita os mesmos posts da carga sequencial."""
+    write_profile("uff", PROFILE)
+    sequential = InstagramDataLoader(str(tmp_path / "data"), quarantine_path=str(tmp_path / "sequential.jsonl"))
+    parallel = InstagramDataLoader(str(tmp_path / "data"), quarantine_path=str(tmp_path / "parallel.jsonl"))
+    
+    assert parallel.load_all_posts(workers=1, chunk_size=2) == sequential.load_all_posts()
+    assert parallel.ingest_counters == sequential.ingest_counters
+    records = [
+        [json.loads(line)['post'] for line in (tmp_path / name).read_text(encoding='utf-8').splitlines()]
+        for name in ("sequential.jsonl", "parallel.jsonl")
+    ]
+    assert records[0] == records[1]
+
+
+def test_counters_reset_per_load(tmp_path, write_profile):
+    """Cada carga completa recomeça os contadores."""
+    write_profile("uff", [VALID, {'id': 3, 'type': 1}])
+    loader = InstagramDataLoader(str(tmp_path / "data"), quarantine_path=str(tmp_path / "q.jsonl"))
+    
+    for _ in range(2):
+        loader.load_all_posts()
+        assert dict(loader.ingest_counters) == {'accepted': 1, 'quarantined': 1}
+    assert len((tmp_path / "q.jsonl").read_text(encoding='utf-8').splitlines()) == 2
+
+
+def test_invalid_posts_skipped_by_comments_and_stats(tmp_path, write_profile):
+    """Comentários e estatísticas ignoram posts inválidos sem gravar de novo na quarentena."""
+    write_profile("uff", [VALID, {'id': "2", 'likesCount': "x", 'latestComments': [{'id': "c9", 'text': "oi"}]}])
+    loader = InstagramDataLoader(str(tmp_path / "data"))
+    
+    comments = list(loader.iter_all_comments())
+    stats = loader.get_profile_stats()
+    
+    assert [comment['id'] for comment in comments] == ["c1"]
+    assert stats['uff']['total_posts'] == 1
+    assert stats['uff']['total_likes'] == 10
+    assert not loader.quarantine_path.exists()
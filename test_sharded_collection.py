@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Testes da coleção dividida por perfil (sharded_collection.py): roteamento
+de gravações, ids e filtros, paginação e junção das buscas nos shards.
+"""
+
+import numpy as np
+import pytest
+
+from sharded_collection import MAX_COLLECTION_NAME, ShardedCollection
+from vector_store import NumpyVectorStore
+
+
+DIM = 16
+PROFILES = ["uff", "uff_oficial", "dceuff"]
+
+
+def make_documents(count: int = 90, seed: int = 0):
+    """Documentos de três perfis (um com '_' no nome, prefixo de outro)."""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(count, DIM)).astype(np.float32).tolist()
+    profiles = [PROFILES[i % 3] for i in range(count)]
+    ids = [f"{profile}_{i}" for i, profile in enumerate(profiles)]
+    metadatas = [{'profile': profile, 'likesCount': i} for i, profile in enumerate(profiles)]
+    documents = [f"texto {i}" for i in range(count)]
+    return ids, embeddings, metadatas, documents
+
+
+@pytest.fixture
+def stores(tmp_path):
+    """A mesma coleção com shards e sem shards (referência), no backend numpy."""
+    client = NumpyVectorStore(tmp_path / "store")
+    sharded = ShardedCollection(client, "posts")
+    single = client.create_collection("single")
+    ids, embeddings, metadatas, documents = make_documents()
+    sharded.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+    single.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+    return client, sharded, single
+
+
+def test_writes_routed_by_profile(stores):
+    """Cada documento vai para o shard do seu perfil; os shards são reencontrados ao reabrir."""
+    client, sharded, _ = stores
+    
+    assert sharded.profiles == sorted(PROFILES)
+    assert sharded.count() == 90
+    for profile in PROFILES:
+        shard = client.get_collection(sharded.shard_name(profile))
+        metadatas = shard.get(include=['metadatas'])['metadatas']
+        assert {metadata['profile'] for metadata in metadatas} == {profile}
+        assert shard.count() == 30
+    
+    reopened = ShardedCollection(client, "posts")
+    assert reopened.profiles == sharded.profiles
+    assert ShardedCollection(client, "comments").profiles == []
+
+
+def test_shard_names(tmp_path):
+    """Nomes de shard respeitam o limite do ChromaDB e não colidem."""
+    sharded = ShardedCollection(NumpyVectorStore(tmp_path / "store"), "instagram_posts")
+    long_name = "perfil." + "x" * 80
+    
+    assert len(sharded.shard_name(long_name)) <= MAX_COLLECTION_NAME
+    assert sharded.shard_name("a.b") != sharded.shard_name("a-b")
+    assert sharded.shard_name("uff").startswith("instagram_posts__uff_")
+
+
+def test_ids_routed_by_longest_prefix(stores):
+    """Ids "<perfil>_..." vão para o perfil de prefixo mais longo com shard."""
+    _, sharded, _ = stores
+    
+    assert sharded._profile_of_id("uff_oficial_1") == "uff_oficial"
+    assert sharded._profile_of_id("uff_3") == "uff"
+    assert sharded._profile_of_id("desconhecido_3") is None
+    
+    result = sharded.get(ids=["uff_oficial_1", "uff_0", "desconhecido_3"], include=['metadatas'])
+    assert sorted(result['ids']) == ["uff_0", "uff_oficial_1"]
+    
+    sharded.update(ids=["uff_oficial_1"], metadatas=[{'profile': "uff_oficial", 'likesCount': 999}])
+    assert sharded.get(ids=["uff_oficial_1"])['metadatas'][0]['likesCount'] == 999
+    sharded.delete(ids=["uff_oficial_1", "dceuff_2"])
+    assert sharded.count() == 88
+
+
+@pytest.mark.parametrize("where, profiles, rest", [
+    (None, sorted(PROFILES), None),
+    ({'profile': "uff"}, ["uff"], None),
+    ({'profile': {'$eq': "dceuff"}}, ["dceuff"], None),
+    ({'profile': {'$in': ["uff", "nao_existe"]}}, ["uff"], None),
+    ({'profile': {'$ne': "uff"}}, sorted(PROFILES), {'profile': {'$ne': "uff"}}),
+    ({'profile': "uff", 'likesCount': 3}, ["uff"], {'likesCount': 3}),
+    (
+        {'$and': [{'likesCount': {'$gt': 10}}, {'profile': {'$in': ["uff", "dceuff"]}}]},
+        ["dceuff", "uff"],
+        {'likesCount': {'$gt': 10}},
+    ),
+    (
+        {'$and': [{'profile': "uff"}, {'likesCount': {'$gt': 10}}, {'likesCount': {'$lt': 50}}]},
+        ["uff"],
+        {'$and': [{'likesCount': {'$gt': 10}}, {'likesCount': {'$lt': 50}}]},
+    ),
+    (
+        {'$or': [{'profile': "uff"}, {'likesCount': 4}]},
+        sorted(PROFILES),
+        {'$or': [{'profile': "uff"}, {'likesCount': 4}]},
+    ),
+])
+def test_route(stores, where, profiles, rest):
+    """Filtros por perfil escolhem os shards e saem do filtro aplicado em cada um."""
+    _, sharded, _ = stores
+    assert sharded._route(where) == (profiles, rest)
+
+
+@pytest.mark.parametrize("where", [
+    None,
+    {'profile': "uff"},
+    {'profile': {'$in': ["uff", "dceuff"]}},
+    {'$and': [{'profile': "uff_oficial"}, {'likesCount': {'$gte': 40}}]},
+    {'likesCount': {'$lt': 30}},
+])
+def test_query_matches_unsharded(stores, where):
+    """A junção dos k melhores de cada shard é igual à busca na coleção única."""
+    _, sharded, single = stores
+    queries = [make_documents()[1][i] for i in (4, 50, 77)]
+    
+    expected = single.query(query_embeddings=queries, n_results=7, where=where)
+    found = sharded.query(query_embeddings=queries, n_results=7, where=where)
+    
+    assert found['ids'] == expected['ids']
+    assert found['metadatas'] == expected['metadatas']
+    for found_distances, expected_distances in zip(found['distances'], expected['distances']):
+        assert found_distances == pytest.approx(expected_distances, abs=1e-6)
+    
+    without_distances = sharded.query(query_embeddings=queries, n_results=7, where=where, include=['documents'])
+    assert without_distances['ids'] == expected['ids']
+    assert without_distances['distances'] is None
+
+
+@pytest.mark.parametrize("where", [None, {'likesCount': {'$gte': 20}}, {'profile': {'$in': ["uff", "dceuff"]}}])
+def test_get_paging(stores, where):
+    """limit/offset paginam pelos shards em ordem de perfil, sem repetir nem pular documentos."""
+    _, sharded, _ = stores
+    everything = sharded.get(where=where, include=[])['ids']
+    
+    pages = []
+    offset = 0
+    while True:
+        page = sharded.get(where=where, limit=7, offset=offset, include=['metadatas'])
+        if not page['ids']:
+            break
+        assert len(page['ids']) <= 7
+        pages.extend(page['ids'])
+        offset += len(page['ids'])
+    
+    assert pages == everything
+    assert len(set(everything)) == len(everything)
+
+
+def test_delete_by_filter_and_clear(stores):
+    """delete com filtro só toca os shards do filtro; clear remove todos os shards."""
+    client, sharded, _ = stores
+    sharded.delete(where={'$and': [{'profile': "uff"}, {'likesCount': {'$lt': 45}}]})
+    assert sharded.count() == 90 - 15
+    sharded.delete(where={'profile': "dceuff"})
+    assert sharded.get(where={'profile': "dceuff"}, include=[])['ids'] == []
+    
+    sharded.clear()
+    assert sharded.count() == 0
+    assert [collection.name for collection in client.list_collections()] == ["single"]
+
+
+@pytest.mark.parametrize("vector_backend", ["chroma", "numpy"])
+def test_manager_sharded_search(make_manager, make_post, vector_backend):
+    """Pelo EmbeddingManager, buscas com e sem shards retornam os mesmos posts."""
+    topics = ["greve", "vestibular", "formatura", "biblioteca"]
+    posts = [
+        make_post(str(i), f"post {i} sobre {topics[i % 4]} no campus", profile=PROFILES[i % 3])
+        for i in range(24)
+    ]
+    sharded = make_manager(vector_backend=vector_backend, shard_by_profile=True)
+    single = make_manager(vector_backend=vector_backend, collection_name="single")
+    sharded.add_posts(posts)
+    single.add_posts(posts)
+    
+    assert sharded.collection.profiles == sorted(PROFILES)
+    for query, profile in [("post 5 sobre formatura", None), ("post 13 vestibular", "uff_oficial")]:
+        expected = single.search(query, n_results=3, profile_filter=profile)
+        found = sharded.search(query, n_results=3, profile_filter=profile)
+        assert found['ids'][0][0] == expected['ids'][0][0]
+        assert found['distances'][0] == pytest.approx(expected['distances'][0], abs=1e-3)
+    
+    stats = sharded.get_stats()
+    assert stats['total_posts'] == 24
+    assert stats['profiles'] == sorted(PROFILES)
+
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Testes da divisão de posts longos em trechos (text_chunker.py) e do
+recolhimento dos trechos na busca e nas ferramentas de consulta.
+"""
+
+import pytest
+
+import index_posts
+from query_tools import QueryTools
+from text_chunker import PostChunker
+
+
+TOPICS = ["greve", "vestibular", "formatura", "biblioteca", "restaurante", "alojamento"]
+
+
+def long_text(topic: str, sentences: int = 12) -> str:
+    """Texto com várias frases sobre um assunto, numeradas."""
+    return " ".join(f"Frase {i} sobre {topic} na universidade." for i in range(sentences))
+
+
+def test_split_text_limits_and_overlap():
+    """Trechos respeitam o limite, terminam em fim de frase e se sobrepõem."""
+    chunker = PostChunker(max_chars=120, overlap=30)
+    text = long_text("greve")
+    pieces = chunker.split_text(text)
+    
+    assert len(pieces) > 1
+    assert all(len(piece) <= 120 for piece in pieces)
+    assert all(piece.endswith(".") for piece in pieces)
+    for previous, current in zip(pieces, pieces[1:]):
+        assert current.split()[0] in previous
+    # Nenhuma palavra do texto se perde
+    assert set(text.split()) == set(" ".join(pieces).split())
+    
+    assert chunker.split_text("texto curto") == ["texto curto"]
+
+
+def test_split_text_without_spaces():
+    """Texto sem espaços é cortado seco, ainda dentro do limite."""
+    pieces = PostChunker(max_chars=50, overlap=10).split_text("x" * 180)
+    
+    assert all(0 < len(piece) <= 50 for piece in pieces)
+    assert "".join(pieces).count("x") >= 180
+
+
+def test_chunk_post_links_to_parent(make_post):
+    """O post completo vem primeiro, seguido dos trechos ligados pelo parent_id."""
+    post = make_post("1", long_text("greve"))
+    documents = PostChunker(max_chars=120, overlap=30).chunk_post(post)
+    
+    assert documents[0] is post
+    assert [doc['id'] for doc in documents[1:]] == [f"1#chunk{i}" for i in range(len(documents) - 1)]
+    assert all(doc['parent_id'] == "1" for doc in documents[1:])
+    assert PostChunker(max_chars=1500).chunk_post(post) == [post]
+
+
+@pytest.mark.parametrize("max_chars, overlap", [(0, 0), (100, 50), (100, -1)])
+def test_chunker_rejects_invalid_settings(max_chars, overlap):
+    with pytest.raises(ValueError):
+        PostChunker(max_chars=max_chars, overlap=overlap)
+
+
+@pytest.fixture
+def chunked_manager(make_manager, make_post):
+    """Coleção com posts longos divididos em trechos."""
+    manager = make_manager()
+    chunker = PostChunker(max_chars=120, overlap=30)
+    posts = [make_post(str(i), long_text(topic), likes=i) for i, topic in enumerate(TOPICS)]
+    manager.add_posts(chunker.chunk_posts(posts))
+    return manager
+
+
+def test_search_collapses_chunks(chunked_manager):
+    """Acertos em trechos viram o post de origem, sem repetir posts."""
+    assert chunked_manager.collection.count() > len(TOPICS)
+    
+    results = chunked_manager.search("frase 11 sobre vestibular na universidade", n_results=3)
+    ids = results['ids'][0]
+    
+    assert ids[0] == "uff_1"
+    assert len(ids) == len(set(ids)) == 3
+    assert all('parent_id' not in metadata for metadata in results['metadatas'][0])
+    assert results['documents'][0][0] == long_text("vestibular")
+    
+    raw = chunked_manager.search("frase 11 sobre vestibular na universidade", n_results=3, collapse_chunks=False)
+    assert any('#chunk' in doc_id for doc_id in raw['ids'][0])
+
+
+def test_query_tools_ignore_chunks(chunked_manager):
+    """Rankings e estatísticas das ferramentas de consulta contam só posts completos."""
+    tools = QueryTools(chunked_manager)
+    
+    # Trechos não ocupam o limite
+    posts = tools._get_posts(limit=4)
+    assert len(set(posts['ids'])) == 4
+    assert all('parent_id' not in metadata for metadata in posts['metadatas'])
+    assert len(tools._get_posts()['ids']) == len(TOPICS)
+    
+    top = tools.get_top_posts_by_likes(limit=3)
+    assert [post['id'] for post in top] == ["uff_5", "uff_4", "uff_3"]
+    assert tools.get_profile_statistics()['total_posts'] == len(TOPICS)
+
+
+def test_rag_indexes_chunks(make_rag, fake_ollama, write_profile):
+    """O RAGSystem com chunker indexa os trechos, e a sincronização os mantém em dia."""
+    write_profile("uff", [
+        {'id': str(i), 'caption': long_text(topic), 'timestamp': "2025-03-10T12:00:00.000Z"}
+        for i, topic in enumerate(TOPICS[:2])
+    ])
+    rag = make_rag(chunker=PostChunker(max_chars=300, overlap=50))
+    rag.index_all_posts()
+    indexed = rag.embedding_manager.get_indexed_hashes()
+    assert {"uff_0", "uff_1", "uff_0#chunk0", "uff_1#chunk0"} <= set(indexed)
+    # Os trechos não contam como posts indexados
+    assert rag.get_system_stats()['indexed_posts'] == 2
+    
+    embedded = fake_ollama.stats['embedded_texts']
+    rag.index_all_posts(incremental=True)
+    assert fake_ollama.stats['embedded_texts'] == embedded
+    assert rag.embedding_manager.get_indexed_hashes() == indexed
+
+
+class StubRAGSystem:
+    """Substitui o RAGSystem em index_posts.main, guardando o chunker recebido."""
+    
+    def __init__(self, chunker=None, **kwargs):
+        StubRAGSystem.chunker = chunker
+        
+    def index_all_posts(self, **kwargs):
+        pass
+
+
+@pytest.mark.parametrize("args, expected", [
+    (["--chunk-size", "2000"], (2000, 200)),
+    (["--chunk-size", "400"], (400, 100)),
+    (["--chunk-size", "40"], (40, 10)),
+    (["--chunk-size", "400", "--chunk-overlap", "0"], (400, 0)),
+])
+def test_index_posts_chunk_overlap(monkeypatch, args, expected):
+    """O padrão de --chunk-overlap acompanha --chunk-size (sem erro para tamanhos pequenos)."""
+    monkeypatch.setattr(index_posts, "RAGSystem", StubRAGSystem)
+    monkeypatch.setattr("sys.argv", ["index_posts.py", *args])
+    index_posts.main()
+    
+    assert (StubRAGSystem.chunker.max_chars, StubRAGSystem.chunker.overlap) == expected
+
+
+@pytest.mark.parametrize("args", [
+    ["--chunk-overlap", "10"],
+    ["--chunk-size", "1"],
+    ["--chunk-size", "400", "--chunk-overlap", "200"],
+    ["--chunk-size", "400", "--chunk-overlap", "-5"],
+])
+def test_index_posts_rejects_invalid_chunking(monkeypatch, args):
+    """Combinações inválidas saem com erro de uso, antes de criar o RAGSystem."""
+    monkeypatch.setattr(index_posts, "RAGSystem", StubRAGSystem)
+    monkeypatch.setattr("sys.argv", ["index_posts.py", *args])
+    
+    with pytest.raises(SystemExit) as error:
+        index_posts.main()
+    assert error.value.code == 2
+
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Testes do modo upsert de add_posts: só o que mudou é re-embedado.
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("vector_backend", ["chroma", "numpy"])
+def test_upsert_skips_unchanged(make_manager, make_post, fake_ollama, vector_backend):
+    """Documentos idênticos são pulados; só metadados alterados não passam pelo embedding."""
+    manager = make_manager(vector_backend=vector_backend)
+    manager.add_posts([
+        make_post("1", "greve dos servidores", likes=1),
+        make_post("2", "formatura de medicina", likes=2),
+        make_post("3", "vestibular aberto", likes=3),
+    ])
+    stored = manager.collection.get(ids=["uff_1"], include=['embeddings'])['embeddings'][0]
+    
+    embedded = fake_ollama.stats['embedded_texts']
+    manager.add_posts([
+        make_post("1", "greve dos servidores", likes=1),      # inalterado
+        make_post("2", "formatura de medicina", likes=20),    # só metadados
+        make_post("3", "vestibular encerrado", likes=3),      # texto alterado
+        make_post("4", "calendário acadêmico"),               # novo
+    ], upsert=True)
+    
+    assert fake_ollama.stats['embedded_texts'] - embedded == 2
+    assert manager.collection.count() == 4
+    result = manager.collection.get(ids=["uff_1", "uff_2", "uff_3"], include=['metadatas', 'documents', 'embeddings'])
+    by_id = {
+        doc_id: (metadata, document, embedding)
+        for doc_id, metadata, document, embedding in zip(
+            result['ids'], result['metadatas'], result['documents'], result['embeddings']
+        )
+    }
+    assert list(by_id["uff_1"][2]) == pytest.approx(list(stored))
+    assert by_id["uff_2"][0]['likesCount'] == 20
+    assert by_id["uff_3"][1] == "vestibular encerrado"
+
+
+def test_upsert_reports_commits(make_manager, make_post, fake_ollama):
+    """on_commit recebe todos os ids do lote, inclusive os pulados."""
+    manager = make_manager(vector_backend="numpy")
+    posts = [make_post(str(i)) for i in range(5)]
+    manager.add_posts(posts)
+    
+    committed = []
+    embedded = fake_ollama.stats['embedded_texts']
+    manager.add_posts(posts, batch_size=2, on_commit=committed.extend, upsert=True)
+    
+    assert fake_ollama.stats['embedded_texts'] == embedded
+    assert committed == [f"uff_{i}" for i in range(5)]
+
+
+def test_index_upsert_keeps_removed_posts(make_rag, fake_ollama, write_profile):
+    """index_all_posts(upsert=True) grava por cima sem remover posts que sumiram dos arquivos."""
+    write_profile("uff", [
+        {'id': "1", 'caption': "greve dos servidores", 'likesCount': 1},
+        {'id': "2", 'caption': "formatura de medicina", 'likesCount': 2},
+    ])
+    rag = make_rag(use_post_cache=False, vector_backend="numpy")
+    rag.index_all_posts()
+    
+    write_profile("uff", [{'id': "2", 'caption': "formatura de medicina", 'likesCount': 9}])
+    embedded = fake_ollama.stats['embedded_texts']
+    rag.index_all_posts(upsert=True)
+    
+    assert fake_ollama.stats['embedded_texts'] == embedded
+    assert rag.embedding_manager.get_all_ids() == {"uff_1", "uff_2"}
+    assert rag.embedding_manager.collection.get(ids=["uff_2"])['metadatas'][0]['likesCount'] == 9
+    assert rag.verify_index()['extra'] == ["uff_1"]
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Testes do backend vetorial em NumPy (vector_store.py): filtros 'where',
+formatos quantizados, busca por prefixos, paginação, persistência e
+equivalência com o ChromaDB.
+"""
+
+import numpy as np
+import pytest
+
+from vector_store import NumpyCollection, NumpyVectorStore
+
+
+DIM = 32
+PROFILES = ["uff", "dceuff", "reitoria"]
+
+
+def make_documents(count: int = 300, seed: int = 0):
+    """Vetores aleatórios com metadados variados."""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(count, DIM)).astype(np.float32)
+    ids = [f"doc_{i}" for i in range(count)]
+    metadatas = [
+        {'profile': PROFILES[i % 3], 'likesCount': i, 'type': "Video" if i % 5 == 0 else "Image"}
+        for i in range(count)
+    ]
+    documents = [f"texto {i}" for i in range(count)]
+    return ids, embeddings, metadatas, documents
+
+
+def exact_ranking(embeddings, query, rows):
+    """Linhas ordenadas por cosseno (referência de força bruta)."""
+    matrix = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = matrix[rows] @ (query / np.linalg.norm(query))
+    return [rows[i] for i in np.argsort(-scores, kind='stable')]
+
+
+@pytest.fixture
+def collection(tmp_path):
+    """Coleção float32 com 300 documentos."""
+    store = NumpyVectorStore(tmp_path / "store")
+    collection = store.create_collection("posts")
+    ids, embeddings, metadatas, documents = make_documents()
+    collection.add(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas, documents=documents)
+    return collection
+
+
+@pytest.mark.parametrize("where, predicate", [
+    ({'profile': "uff"}, lambda m: m['profile'] == "uff"),
+    ({'profile': {'$ne': "uff"}}, lambda m: m['profile'] != "uff"),
+    ({'profile': {'$in': ["uff", "reitoria"]}}, lambda m: m['profile'] in ("uff", "reitoria")),
+    ({'profile': {'$nin': ["uff"]}}, lambda m: m['profile'] != "uff"),
+    ({'likesCount': {'$gte': 100, '$lt': 120}}, lambda m: 100 <= m['likesCount'] < 120),
+    ({'likesCount': {'$gt': 290}}, lambda m: m['likesCount'] > 290),
+    ({'likesCount': {'$lte': 3}}, lambda m: m['likesCount'] <= 3),
+    (
+        {'$and': [{'profile': "dceuff"}, {'type': "Video"}]},
+        lambda m: m['profile'] == "dceuff" and m['type'] == "Video",
+    ),
+    (
+        {'$or': [{'likesCount': {'$lt': 5}}, {'type': "Video"}]},
+        lambda m: m['likesCount'] < 5 or m['type'] == "Video",
+    ),
+])
+def test_where_filters(collection, where, predicate):
+    """get e query com filtro retornam exatamente os documentos que satisfazem a condição."""
+    _, embeddings, metadatas, _ = make_documents()
+    expected_rows = [i for i, metadata in enumerate(metadatas) if predicate(metadata)]
+    
+    result = collection.get(where=where, include=['metadatas'])
+    assert result['ids'] == [f"doc_{i}" for i in expected_rows]
+    
+    query = embeddings[7] + 0.5 * embeddings[8]
+    found = collection.query(query_embeddings=[query.tolist()], n_results=10, where=where)
+    expected = exact_ranking(embeddings, query, expected_rows)[:10]
+    assert found['ids'][0] == [f"doc_{i}" for i in expected]
+
+
+def test_unknown_operator(collection):
+    with pytest.raises(ValueError):
+        collection.get(where={'likesCount': {'$like': 3}})
+
+
+def test_get_paging_and_ids(collection):
+    """limit/offset seguem a ordem de gravação; ids inexistentes são ignorados."""
+    page = collection.get(limit=5, offset=10, include=[])
+    assert page['ids'] == [f"doc_{i}" for i in range(10, 15)]
+    
+    result = collection.get(ids=["doc_3", "nao_existe", "doc_1"], where={'profile': "uff"})
+    assert result['ids'] == ["doc_3"]
+
+
+@pytest.mark.parametrize("quantization, tolerance", [("float16", 1e-3), ("int8", 2e-2)])
+def test_quantized_vectors(tmp_path, quantization, tolerance):
+    """Formatos quantizados reconstroem os vetores com erro pequeno e mantêm o ranking."""
+    ids, embeddings, metadatas, documents = make_documents()
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    query = embeddings[42] + 0.3 * embeddings[43]
+    expected = exact_ranking(embeddings, query, list(range(len(ids))))[:10]
+    
+    store = NumpyVectorStore(tmp_path / "store", quantization=quantization)
+    compact = store.create_collection("posts")
+    compact.add(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas, documents=documents)
+    decoded = np.array(compact.get(include=['embeddings'])['embeddings'])
+    assert np.abs(decoded - normalized).max() < tolerance
+    found = compact.query(query_embeddings=[query.tolist()], n_results=10)['ids'][0]
+    assert len(set(found) & {f"doc_{i}" for i in expected}) >= 9
+    
+    # Com a cópia em precisão total, os candidatos são reordenados: ranking exato
+    store = NumpyVectorStore(tmp_path / "rescored", quantization=quantization, keep_full_precision=True)
+    rescored = store.create_collection("posts")
+    rescored.add(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas, documents=documents)
+    found = rescored.query(query_embeddings=[query.tolist()], n_results=10)
+    assert found['ids'][0] == [f"doc_{i}" for i in expected]
+    suffix = NumpyCollection.QUANTIZATIONS[quantization][1]
+    assert (tmp_path / "rescored" / "posts" / f"vectors.{suffix}").exists()
+    # A cópia float32 só existe quando pedida
+    assert (tmp_path / "rescored" / "posts" / "vectors.f32").exists()
+    assert not (tmp_path / "store" / "posts" / "vectors.f32").exists()
+
+
+def test_prefix_search(tmp_path):
+    """A busca por prefixos reordena os candidatos com os vetores completos."""
+    ids, embeddings, metadatas, documents = make_documents()
+    store = NumpyVectorStore(tmp_path / "store", prefix_dim=16)
+    collection = store.create_collection("posts")
+    collection.add(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas, documents=documents)
+    
+    query = embeddings[5]
+    fast = collection.query(query_embeddings=[query.tolist()], n_results=5, prefix_search=True)
+    exact = collection.query(query_embeddings=[query.tolist()], n_results=5)
+    
+    assert fast['ids'][0][0] == exact['ids'][0][0] == "doc_5"
+    assert fast['distances'][0][0] == pytest.approx(0.0, abs=1e-5)
+
+
+def test_persistence_and_replay(tmp_path):
+    """Reabrir a coleção reaplica o log; uma linha final incompleta é ignorada."""
+    ids, embeddings, metadatas, documents = make_documents(20)
+    collection = NumpyVectorStore(tmp_path / "store", quantization="int8").create_collection("posts")
+    collection.add(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas, documents=documents)
+    collection.update(ids=["doc_1"], metadatas=[{'profile': "uff", 'likesCount': 99}])
+    collection.upsert(ids=["doc_2"], embeddings=[embeddings[3].tolist()], documents=["novo"])
+    collection.delete(ids=["doc_4"])
+    with open(collection.records_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "delete", "id": "doc_5"')
+    
+    reopened = NumpyVectorStore(tmp_path / "store").get_collection("posts")
+    
+    assert reopened.quantization == "int8"
+    assert reopened.count() == 19
+    assert reopened.get(ids=["doc_1"])['metadatas'][0]['likesCount'] == 99
+    assert reopened.get(ids=["doc_2"])['documents'][0] == "novo"
+    assert reopened.get(ids=["doc_4"])['ids'] == []
+    assert reopened.get(ids=["doc_5"])['ids'] == ["doc_5"]
+    found = reopened.query(query_embeddings=[embeddings[3].tolist()], n_results=2)
+    assert set(found['ids'][0]) == {"doc_2", "doc_3"}
+
+
+def test_compaction(tmp_path, monkeypatch):
+    """Linhas mortas são descartadas quando viram maioria, sem perder documentos."""
+    monkeypatch.setattr(NumpyCollection, "COMPACT_MIN_DEAD_ROWS", 10)
+    ids, embeddings, metadatas, documents = make_documents(40)
+    collection = NumpyVectorStore(tmp_path / "store").create_collection("posts")
+    collection.add(ids=ids, embeddings=embeddings.tolist(), metadatas=metadatas, documents=documents)
+    collection.delete(ids=ids[:30])
+    
+    assert len(collection._ids) == 10
+    reopened = NumpyVectorStore(tmp_path / "store").get_collection("posts")
+    assert reopened.get(include=[])['ids'] == ids[30:]
+    found = reopened.query(query_embeddings=[embeddings[35].tolist()], n_results=1)
+    assert found['ids'][0] == ["doc_35"]
+
+
+def test_store_collections(tmp_path):
+    """Criação, listagem e remoção de coleções como no cliente do ChromaDB."""
+    store = NumpyVectorStore(tmp_path / "store")
+    store.create_collection("posts")
+    assert store.get_or_create_collection("comments").name == "comments"
+    with pytest.raises(ValueError):
+        store.create_collection("posts")
+    
+    assert [collection.name for collection in store.list_collections()] == ["comments", "posts"]
+    store.delete_collection("posts")
+    with pytest.raises(ValueError):
+        store.get_collection("posts")
+
+
+@pytest.mark.parametrize("quantization", ["float32", "int8"])
+def test_manager_numpy_matches_chroma(make_manager, make_post, quantization):
+    """Pelo EmbeddingManager, o backend numpy devolve os mesmos resultados do ChromaDB."""
+    topics = ["greve", "vestibular", "formatura", "biblioteca", "restaurante"]
+    posts = [
+        make_post(str(i), f"post {i} sobre {topics[i % 5]} na universidade", profile=PROFILES[i % 3], likes=i)
+        for i in range(20)
+    ]
+    chroma = make_manager()
+    numpy_manager = make_manager(
+        collection_name="posts_numpy", vector_backend="numpy", vector_quantization=quantization
+    )
+    chroma.add_posts(posts)
+    numpy_manager.add_posts(posts)
+    
+    for query, profile in [("post 10 sobre greve", None), ("post 13 biblioteca", "dceuff")]:
+        expected = chroma.search(query, n_results=4, profile_filter=profile)
+        found = numpy_manager.search(query, n_results=4, profile_filter=profile)
+        # Embeddings de hashing empatam com frequência: compara o melhor e as distâncias
+        assert found['ids'][0][0] == expected['ids'][0][0]
+        assert found['distances'][0] == pytest.approx(expected['distances'][0], abs=1e-3)
+
+
+def test_manager_keep_full_precision(make_manager, make_post, tmp_path):
+    """vector_keep_full_precision liga a cópia float32 das coleções quantizadas."""
+    posts = [make_post(str(i)) for i in range(5)]
+    for name, keep in [("compacta", False), ("reordenada", True)]:
+        manager = make_manager(
+            collection_name=name, vector_backend="numpy",
+            vector_quantization="int8", vector_keep_full_precision=keep
+        )
+        manager.add_posts(posts)
+        assert manager.collection.keep_full_precision is keep
+        assert (tmp_path / "vector_db" / "numpy_store" / name / "vectors.f32").exists() is keep
+    
+    with pytest.raises(ValueError):
+        make_manager(vector_backend="numpy", vector_keep_full_precision=True)
+
+
+def test_manager_fast_search(make_manager, make_post):
+    """search(fast=True) usa os vetores truncados no numpy e cai na busca completa sem eles."""
+    posts = [make_post(str(i), f"post {i} sobre o campus", likes=i) for i in range(20)]
+    manager = make_manager(vector_backend="numpy", matryoshka_dim=32)
+    chroma = make_manager(collection_name="posts_chroma")
+    manager.add_posts(posts)
+    chroma.add_posts(posts)
+    
+    fast = manager.search("post 7 sobre o campus", n_results=3, fast=True)
+    exact = manager.search("post 7 sobre o campus", n_results=3)
+    assert fast['ids'][0][0] == exact['ids'][0][0] == "uff_7"
+    assert fast['distances'][0][0] == pytest.approx(exact['distances'][0][0], abs=1e-5)
+    assert chroma.search("post 7 sobre o campus", n_results=3, fast=True)['ids'][0][0] == "uff_7"
+    
+    with pytest.raises(ValueError):
+        make_manager(collection_name="outra", matryoshka_dim=32)
@@ -0,0 +1,118 @@
+"""
+Divisão de posts longos em trechos sobrepostos antes da geração de embeddings.
+
+Legendas institucionais longas estouram a janela de contexto do modelo de
+embedding e misturam vários assuntos em um único vetor. O PostChunker mantém
+o documento completo do post e acrescenta documentos de trecho ligados a ele
+pelo 'parent_id'; na busca, os acertos em trechos são recolhidos de volta ao
+post (ver EmbeddingManager.search).
+"""
+
+import re
+from typing import List, Dict, Any, Iterable, Iterator
+
+
+# Fim de frase seguido de espaço: ponto de corte preferido
+_SENTENCE_END_RE = re.compile(r'[.!?;]\s')
+
+
+class PostChunker:
+    """Gera documentos de trecho para posts cujo texto excede o limite."""
+    
+    def __init__(self, max_chars: int = 1500, overlap: int = 200):
+        """
+        Inicializa o divisor.
+        
+        Args:
+            max_chars: Tamanho máximo de cada trecho (em caracteres)
+            overlap: Sobreposição aproximada entre trechos consecutivos
+        """
+        if max_chars <= 0:
+            raise ValueError("max_chars deve ser positivo")
+        if not 0 <= overlap < max_chars // 2:
+            raise ValueError("overlap deve estar entre 0 e max_chars/2")
+        
+        self.max_chars = max_chars
+        self.overlap = overlap
+        
+    def _find_cut(self, text: str, start: int, end: int) -> int:
+        """Escolhe onde terminar um trecho: fim de frase, senão espaço, senão corte seco."""
+        min_cut = start + self.max_chars // 2
+        
+        last_sentence = None
+        for match in _SENTENCE_END_RE.finditer(text, min_cut, end):
+            last_sentence = match.end()
+        if last_sentence:
+            return last_sentence
+        
+        space = text.rfind(' ', min_cut, end)
+        return space if space > start else end
+        
+    def split_text(self, text: str) -> List[str]:
+        """
+        Divide um texto em trechos sobrepostos.
+        
+        Args:
+            text: Texto completo
+            
+        Returns:
+            Lista de trechos (um único elemento se o texto couber no limite)
+        """
+        if len(text) <= self.max_chars:
+            return [text]
+        
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = start + self.max_chars
+            if end >= len(text):
+                chunks.append(text[start:].strip())
+                break
+            
+            cut = self._find_cut(text, start, end)
+            chunks.append(text[start:cut].strip())
+            
+            # Próximo trecho recomeça 'overlap' caracteres antes, em início de palavra
+            next_start = max(cut - self.overlap, start + 1)
+            space = text.find(' ', next_start, cut)
+            start = space + 1 if space != -1 else next_start
+        
+        return [chunk for chunk in chunks if chunk]
+        
+    def chunk_post(self, post: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Retorna o post original seguido dos seus documentos de trecho.
+        
+        Args:
+            post: Post processado (InstagramDataLoader.process_post)
+            
+        Returns:
+            [post] para textos curtos; [post, trecho_0, trecho_1, ...] para longos
+        """
+        pieces = self.split_text(post['text'])
+        if len(pieces) == 1:
+            return [post]
+        
+        chunks = [post]
+        for index, piece in enumerate(pieces):
+            chunk = dict(post)
+            chunk['id'] = f"{post['id']}#chunk{index}"
+            chunk['text'] = piece
+            chunk['parent_id'] = post['id']
+            chunk['chunk_index'] = index
+            chunks.append(chunk)
+        
+        return chunks
+        
+    def chunk_posts(self, posts: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Aplica chunk_post em um fluxo de posts (preserva o streaming).
+        
+        Args:
+            posts: Posts processados (lista ou generator)
+            
+        Yields:
+            Posts e documentos de trecho
+        """
+        for post in posts:
+            yield from self.chunk_post(post)
@@ -0,0 +1,769 @@
+"""
+Backend vetorial em NumPy: busca exata por cosseno sobre uma matriz float32.
+
+Alternativa ao ChromaDB para o tamanho do nosso corpus (milhares a centenas
+de milhares de posts): uma multiplicação matriz-vetor e uma seleção top-k
+vetorizada (np.argpartition) substituem o HNSW + SQLite do Chroma.
+
+NumpyVectorStore imita o subconjunto do cliente do ChromaDB usado pelo
+projeto (get_collection, create_collection, get_or_create_collection,
+delete_collection, list_collections) e NumpyCollection o subconjunto da
+coleção (add, upsert, update, delete, get, query, count), incluindo os
+filtros 'where' ({'profile': ...}, $eq, $ne, $in, $nin, $gt, $gte, $lt,
+$lte, $and, $or). O EmbeddingManager escolhe o backend (vector_backend).
+
+Cada coleção fica em <persist_dir>/<nome>/:
+- vectors.f32 / vectors.f16 / vectors.i8: vetores normalizados no formato da
+  coleção (quantization), uma linha por gravação, só acrescentados; abertos
+  com np.memmap na inicialização
+- scales.f32: escala de cada vetor (só no formato int8)
+- prefix.f32: prefixo das primeiras prefix_dim dimensões de cada vetor,
+  renormalizado (só com prefix_dim, ver abaixo)
+- vectors.f32 nos formatos quantizados, se keep_full_precision: cópia em
+  precisão total, usada só para reordenar os melhores candidatos; fica no
+  disco e só as linhas dos candidatos são lidas. Desligada por padrão (com
+  ela, o disco ocupado é maior que o do float32)
+- records.jsonl: log das operações (put / update / delete) com id, linha,
+  texto e metadados; reaplicado na abertura (linha final incompleta é ignorada)
+- collection.json: nome, metadados e dimensão da coleção
+
+Linhas substituídas ou removidas continuam no arquivo até a compactação,
+feita automaticamente quando passam a ser maioria.
+
+Formatos (quantization, escolhido na criação da coleção):
+- float32: 4 bytes por dimensão, busca exata
+- float16: 2 bytes por dimensão
+- int8: 1 byte por dimensão + 4 bytes de escala por vetor (simétrica:
+  escala = max|x| / 127)
+Nos formatos quantizados a busca percorre os vetores quantizados (convertidos
+para float32 em blocos) e, se houver a cópia em precisão total, reordena os
+rescore_factor x k melhores candidatos com os vetores originais. O int8 busca
+quase tão rápido quanto o float32; a conversão de float16 no NumPy é mais lenta,
+então o float16 troca CPU por memória (o custo se dilui em consultas em lote).
+evaluate_quantization.py mede o recall@k de cada formato.
+
+Com prefix_dim (ex: 256), a coleção guarda também o prefixo de cada vetor:
+modelos treinados com Matryoshka (como o mxbai-embed-large) concentram a
+informação nas primeiras dimensões. query(prefix_search=True) faz a busca
+grossa nesses vetores curtos e reordena os rescore_factor x k melhores
+candidatos com os vetores completos.
+"""
+
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class NumpyCollection:
+    """Coleção em memória com persistência em arquivos (API compatível com o ChromaDB)."""
+    
+    # Compacta quando há mais linhas mortas que vivas (e pelo menos este número)
+    COMPACT_MIN_DEAD_ROWS = 1024
+    
+    # Formatos de armazenamento: tipo NumPy e extensão do arquivo de vetores
+    QUANTIZATIONS = {
+        'float32': (np.float32, 'f32'),
+        'float16': (np.float16, 'f16'),
+        'int8': (np.int8, 'i8'),
+    }
+    
+    # Linhas convertidas para float32 de cada vez ao pontuar vetores quantizados
+    # (blocos pequenos ficam no cache da CPU: 4096 x 1024 x 4 bytes = 16 MB)
+    SCORE_BLOCK_ROWS = 4096
+    
+    def __init__(
+        self,
+        path: Path,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        quantization: str = 'float32',
+        keep_full_precision: bool = False,
+        rescore_factor: int = 4,
+        prefix_dim: Optional[int] = None
+    ):
+        """
+        Abre (ou cria) a coleção.
+        
+        Args:
+            path: Diretório da coleção
+            name: Nome da coleção
+            metadata: Metadados da coleção (só usados na criação)
+            quantization: 'float32', 'float16' ou 'int8' (só usado na criação;
+                coleções existentes mantêm o formato gravado)
+            keep_full_precision: Nos formatos quantizados, guarda também os
+                vetores float32 para reordenar candidatos (só usado na criação;
+                economiza memória, mas não disco)
+            rescore_factor: Candidatos reordenados em precisão total por
+                resultado pedido (1 desativa a reordenação dos formatos quantizados)
+            prefix_dim: Guarda também o prefixo de prefix_dim dimensões de cada
+                vetor para query(prefix_search=True) (só usado na criação)
+        """
+        if quantization not in self.QUANTIZATIONS:
+            raise ValueError(f"quantization deve ser um de {tuple(self.QUANTIZATIONS)}")
+        
+        self.path = Path(path)
+        self.name = name
+        self.records_path = self.path / "records.jsonl"
+        self.info_path = self.path / "collection.json"
+        self.rescore_factor = rescore_factor
+        
+        self._lock = threading.RLock()
+        self._ids: List[Optional[str]] = []  # linha -> id (None = linha morta)
+        self._rows: Dict[str, int] = {}  # id -> linha
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._columns: Dict[str, np.ndarray] = {}  # chave de metadado -> valores por linha
+        self._arrays: Dict[str, np.ndarray] = {}  # arquivo de vetores -> memmap
+        
+        self.path.mkdir(parents=True, exist_ok=True)
+        if self.info_path.exists():
+            info = json.loads(self.info_path.read_text(encoding='utf-8'))
+            self.metadata = info.get('metadata')
+            self.dim = info.get('dim')
+            self.quantization = info.get('quantization', 'float32')
+            self.keep_full_precision = info.get('keep_full_precision', False)
+            self.prefix_dim = info.get('prefix_dim')
+        else:
+            self.metadata = metadata
+            self.dim = None
+            self.quantization = quantization
+            self.keep_full_precision = keep_full_precision and quantization != 'float32'
+            self.prefix_dim = prefix_dim
+            self._write_info()
+        
+        self._replay()
+        self._map_vectors()
+        
+    def _write_info(self):
+        """Grava collection.json de forma atômica."""
+        tmp_path = self.info_path.with_suffix('.json.tmp')
+        tmp_path.write_text(
+            json.dumps({
+                'name': self.name,
+                'metadata': self.metadata,
+                'dim': self.dim,
+                'quantization': self.quantization,
+                'keep_full_precision': self.keep_full_precision,
+                'prefix_dim': self.prefix_dim,
+            }),
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, self.info_path)
+        
+    def _replay(self):
+        """Reconstrói ids, textos e metadados a partir do log de operações."""
+        try:
+            content = self.records_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return
+        
+        vector_rows = self._vector_file_rows()
+        lines = content.split('\n')
+        # Última linha sem '\n' final: escrita interrompida
+        for line in lines[:-1]:
+            if not line:
+                continue
+            record = json.loads(line)
+            op = record['op']
+            if op == 'put':
+                row = record['row']
+                if row >= vector_rows:
+                    continue  # vetor não chegou ao disco
+                self._set_row(row, record['id'], record['document'], record['metadata'])
+            elif op == 'update' and record['id'] in self._rows:
+                row = self._rows[record['id']]
+                if 'metadata' in record:
+                    self._metadatas[row] = record['metadata']
+                if 'document' in record:
+                    self._documents[row] = record['document']
+            elif op == 'delete' and record['id'] in self._rows:
+                self._kill_row(self._rows.pop(record['id']))
+                
+    def _vector_files(self) -> List[Tuple[str, Path, Any, int]]:
+        """Arquivos de vetores da coleção: (chave, caminho, tipo, valores por linha)."""
+        dtype, suffix = self.QUANTIZATIONS[self.quantization]
+        files = [('vectors', self.path / f"vectors.{suffix}", dtype, self.dim)]
+        if self.quantization == 'int8':
+            files.append(('scales', self.path / "scales.f32", np.float32, 1))
+        if self.keep_full_precision:
+            files.append(('full', self.path / "vectors.f32", np.float32, self.dim))
+        if self.prefix_dim:
+            files.append(('prefix', self.path / "prefix.f32", np.float32, self.prefix_dim))
+        return files
+        
+    def _vector_file_rows(self) -> int:
+        """Número de linhas completas presentes em todos os arquivos de vetores."""
+        if not self.dim:
+            return 0
+        rows = []
+        for _, path, dtype, width in self._vector_files():
+            size = path.stat().st_size if path.exists() else 0
+            rows.append(size // (np.dtype(dtype).itemsize * width))
+        return min(rows)
+        
+    def _map_vectors(self):
+        """(Re)abre os arquivos de vetores com np.memmap (somente leitura)."""
+        rows = self._vector_file_rows()
+        self._arrays = {}
+        for key, path, dtype, width in self._vector_files() if self.dim else []:
+            shape = (rows, width) if key != 'scales' else (rows,)
+            if rows == 0:
+                self._arrays[key] = np.empty(shape, dtype=dtype)
+            else:
+                self._arrays[key] = np.memmap(path, dtype=dtype, mode='r', shape=shape)
+        
+        # Linhas do log e do arquivo de vetores alinhadas (linhas sem registro ficam mortas)
+        missing = rows - len(self._ids)
+        if missing > 0:
+            self._ids.extend([None] * missing)
+            self._documents.extend([None] * missing)
+            self._metadatas.extend([None] * missing)
+            
+    def _set_row(self, row: int, doc_id: str, document: Optional[str], metadata: Optional[Dict[str, Any]]):
+        """Associa uma linha a um documento (substituindo a linha anterior do id)."""
+        missing = row + 1 - len(self._ids)
+        if missing > 0:
+            self._ids.extend([None] * missing)
+            self._documents.extend([None] * missing)
+            self._metadatas.extend([None] * missing)
+        
+        previous = self._rows.get(doc_id)
+        if previous is not None:
+            self._kill_row(previous)
+        
+        self._ids[row] = doc_id
+        self._documents[row] = document
+        self._metadatas[row] = metadata
+        self._rows[doc_id] = row
+        
+    def _kill_row(self, row: int):
+        """Marca uma linha como morta."""
+        self._ids[row] = None
+        self._documents[row] = None
+        self._metadatas[row] = None
+        
+    def _append_records(self, records: List[Dict[str, Any]]):
+        """Acrescenta operações ao log."""
+        with open(self.records_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+            f.flush()
+            
+    @staticmethod
+    def _normalize(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        """Converte para float32 com norma 1 (distância de cosseno = 1 - produto interno)."""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+        
+    def _encode(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """Converte vetores normalizados para o conteúdo de cada arquivo de vetores."""
+        encoded = {}
+        if self.quantization == 'int8':
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            encoded['vectors'] = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            encoded['scales'] = scales.astype(np.float32)
+        else:
+            encoded['vectors'] = vectors.astype(self.QUANTIZATIONS[self.quantization][0])
+        if self.keep_full_precision:
+            encoded['full'] = vectors.astype(np.float32)
+        if self.prefix_dim:
+            encoded['prefix'] = self._normalize(vectors[:, :self.prefix_dim])
+        return encoded
+        
+    def _decode(self, rows) -> np.ndarray:
+        """Vetores float32 de um conjunto de linhas (precisão total, se disponível)."""
+        if 'full' in self._arrays:
+            return np.asarray(self._arrays['full'][rows], dtype=np.float32)
+        block = np.asarray(self._arrays['vectors'][rows], dtype=np.float32)
+        if self.quantization == 'int8':
+            block *= np.asarray(self._arrays['scales'][rows])[:, None]
+        return block
+        
+    def _scores(self, queries: np.ndarray, rows: Optional[np.ndarray] = None, key: str = 'vectors') -> np.ndarray:
+        """
+        Produto interno das consultas com os vetores armazenados (quantizados).
+        
+        Args:
+            queries: Consultas normalizadas (n_consultas x dimensão do arquivo)
+            rows: Linhas a pontuar (None = todas)
+            key: Arquivo pontuado: 'vectors' ou 'prefix'
+            
+        Returns:
+            Matriz n_consultas x linhas
+        """
+        vectors = self._arrays[key]
+        if key == 'prefix' or self.quantization == 'float32':
+            return queries @ (vectors if rows is None else np.asarray(vectors[rows])).T
+        
+        total = len(vectors) if rows is None else len(rows)
+        scores = np.empty((len(queries), total), dtype=np.float32)
+        for start in range(0, total, self.SCORE_BLOCK_ROWS):
+            end = min(start + self.SCORE_BLOCK_ROWS, total)
+            selected = slice(start, end) if rows is None else rows[start:end]
+            block = np.asarray(vectors[selected], dtype=np.float32)
+            scores[:, start:end] = queries @ block.T
+            if self.quantization == 'int8':
+                scores[:, start:end] *= np.asarray(self._arrays['scales'][selected])
+        return scores
+        
+    def count(self) -> int:
+        """Número de documentos na coleção."""
+        return len(self._rows)
+        
+    def add(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        documents: Optional[List[str]] = None
+    ):
+        """Adiciona documentos; ids já existentes são ignorados (como no ChromaDB)."""
+        with self._lock:
+            keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._rows]
+            if len(keep) < len(ids):
+                print(f"⚠️  {len(ids) - len(keep)} ids já existentes ignorados em '{self.name}' (use upsert)")
+            if not keep:
+                return
+            self._write(
+                [ids[i] for i in keep],
+                [embeddings[i] for i in keep],
+                [metadatas[i] for i in keep] if metadatas is not None else None,
+                [documents[i] for i in keep] if documents is not None else None
+            )
+            
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        documents: Optional[List[str]] = None
+    ):
+        """Adiciona documentos, substituindo os ids já existentes."""
+        with self._lock:
+            self._write(ids, embeddings, metadatas, documents)
+            
+    def _write(self, ids, embeddings, metadatas, documents):
+        """Acrescenta vetores e registros (vetores primeiro: o log só aponta para linhas gravadas)."""
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Ids duplicados no mesmo lote de '{self.name}'")
+        
+        vectors = self._normalize(embeddings)
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self._write_info()
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Dimensão {vectors.shape[1]} diferente da coleção '{self.name}' ({self.dim})"
+            )
+        if self.prefix_dim and self.prefix_dim >= self.dim:
+            raise ValueError(f"prefix_dim ({self.prefix_dim}) deve ser menor que a dimensão ({self.dim})")
+        
+        first_row = self._vector_file_rows()
+        encoded = self._encode(vectors)
+        for key, path, dtype, width in self._vector_files():
+            with open(path, 'ab') as f:
+                # Descarta linhas parciais de uma gravação interrompida (arquivos alinhados)
+                f.truncate(first_row * np.dtype(dtype).itemsize * width)
+                f.write(encoded[key].tobytes())
+                f.flush()
+        
+        records = []
+        for offset, doc_id in enumerate(ids):
+            records.append({
+                'op': 'put',
+                'id': doc_id,
+                'row': first_row + offset,
+                'document': documents[offset] if documents is not None else None,
+                'metadata': metadatas[offset] if metadatas is not None else None,
+            })
+        self._append_records(records)
+        
+        for record in records:
+            self._set_row(record['row'], record['id'], record['document'], record['metadata'])
+        self._columns = {}
+        self._map_vectors()
+        self._maybe_compact()
+        
+    def update(
+        self,
+        ids: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        documents: Optional[List[str]] = None,
+        embeddings: Optional[Sequence[Sequence[float]]] = None
+    ):
+        """Atualiza metadados e/ou textos de documentos existentes (ids ausentes são ignorados)."""
+        if embeddings is not None:
+            # Novo vetor: grava uma nova linha com o restante do documento
+            with self._lock:
+                current = self.get(ids=ids, include=['metadatas', 'documents'])
+                by_id = dict(zip(current['ids'], zip(current['metadatas'], current['documents'])))
+                keep = [i for i, doc_id in enumerate(ids) if doc_id in by_id]
+                self._write(
+                    [ids[i] for i in keep],
+                    [embeddings[i] for i in keep],
+                    [metadatas[i] if metadatas is not None else by_id[ids[i]][0] for i in keep],
+                    [documents[i] if documents is not None else by_id[ids[i]][1] for i in keep]
+                )
+            return
+        
+        with self._lock:
+            records = []
+            for i, doc_id in enumerate(ids):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    continue
+                record = {'op': 'update', 'id': doc_id}
+                if metadatas is not None:
+                    record['metadata'] = self._metadatas[row] = metadatas[i]
+                if documents is not None:
+                    record['document'] = self._documents[row] = documents[i]
+                records.append(record)
+            if records:
+                self._append_records(records)
+                self._columns = {}
+                
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Remove documentos por id e/ou filtro."""
+        with self._lock:
+            if where is not None:
+                selected = set(self.get(ids=ids, where=where, include=[])['ids'])
+            else:
+                selected = set(ids or [])
+            records = []
+            for doc_id in selected:
+                row = self._rows.pop(doc_id, None)
+                if row is not None:
+                    self._kill_row(row)
+                    records.append({'op': 'delete', 'id': doc_id})
+            if records:
+                self._append_records(records)
+                self._columns = {}
+                self._maybe_compact()
+                
+    def _maybe_compact(self):
+        """Reescreve os arquivos sem as linhas mortas, se elas forem maioria."""
+        dead = len(self._ids) - len(self._rows)
+        if dead < self.COMPACT_MIN_DEAD_ROWS or dead <= len(self._rows):
+            return
+        
+        alive = np.array(sorted(self._rows.values()), dtype=np.int64)
+        records = [
+            {
+                'op': 'put',
+                'id': self._ids[row],
+                'row': new_row,
+                'document': self._documents[row],
+                'metadata': self._metadatas[row],
+            }
+            for new_row, row in enumerate(alive.tolist())
+        ]
+        
+        replacements = []
+        for key, path, _, _ in self._vector_files():
+            tmp_path = path.with_name(path.name + '.tmp')
+            tmp_path.write_bytes(np.asarray(self._arrays[key][alive]).tobytes())
+            replacements.append((tmp_path, path))
+        records_tmp = self.records_path.with_suffix('.jsonl.tmp')
+        with open(records_tmp, 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+        
+        self._arrays = {}  # libera os memmaps antes de substituir os arquivos
+        for tmp_path, path in replacements:
+            os.replace(tmp_path, path)
+        os.replace(records_tmp, self.records_path)
+        
+        self._ids, self._documents, self._metadatas, self._rows = [], [], [], {}
+        for record in records:
+            self._set_row(record['row'], record['id'], record['document'], record['metadata'])
+        self._columns = {}
+        self._map_vectors()
+        
+    def _column(self, key: str) -> np.ndarray:
+        """Valores de um metadado por linha (None para linhas mortas ou sem a chave)."""
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(len(self._metadatas), dtype=object)
+            column[:] = [metadata.get(key) if metadata else None for metadata in self._metadatas]
+            self._columns[key] = column
+        return column
+        
+    def _where_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Máscara booleana por linha para um filtro no formato do ChromaDB."""
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, condition in where.items():
+            if key == '$and':
+                for sub in condition:
+                    mask &= self._where_mask(sub)
+            elif key == '$or':
+                any_mask = np.zeros(len(self._ids), dtype=bool)
+                for sub in condition:
+                    any_mask |= self._where_mask(sub)
+                mask &= any_mask
+            else:
+                mask &= self._condition_mask(self._column(key), condition)
+        return mask
+        
+    @staticmethod
+    def _condition_mask(column: np.ndarray, condition: Any) -> np.ndarray:
+        """Máscara de uma condição sobre um metadado ({'$op': valor} ou igualdade)."""
+        if not isinstance(condition, dict):
+            condition = {'$eq': condition}
+        
+        mask = np.ones(len(column), dtype=bool)
+        for op, value in condition.items():
+            if op == '$eq':
+                mask &= column == value
+            elif op == '$ne':
+                mask &= column != value
+            elif op == '$in':
+                mask &= np.isin(column, list(value))
+            elif op == '$nin':
+                mask &= ~np.isin(column, list(value))
+            elif op in ('$gt', '$gte', '$lt', '$lte'):
+                compare = {
+                    '$gt': lambda a, b: a > b,
+                    '$gte': lambda a, b: a >= b,
+                    '$lt': lambda a, b: a < b,
+                    '$lte': lambda a, b: a <= b,
+                }[op]
+                mask &= np.fromiter(
+                    (
+                        item is not None and not isinstance(item, str) and compare(item, value)
+                        for item in column
+                    ),
+                    dtype=bool,
+                    count=len(column)
+                )
+            else:
+                raise ValueError(f"Operador de filtro não suportado: {op}")
+        return mask
+        
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Posições das k maiores pontuações, em ordem decrescente."""
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.int64)
+            return top[np.argsort(-scores[top], kind='stable')]
+        return np.argsort(-scores, kind='stable')
+        
+    def _alive_mask(self) -> np.ndarray:
+        """Máscara das linhas vivas."""
+        alive = np.zeros(len(self._ids), dtype=bool)
+        if self._rows:
+            alive[np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))] = True
+        return alive
+        
+    def _result_fields(self, rows: Sequence[int], include: Sequence[str]) -> Dict[str, Any]:
+        """Campos de resultado (formato do ChromaDB) para uma lista de linhas."""
+        return {
+            'ids': [self._ids[row] for row in rows],
+            'documents': [self._documents[row] for row in rows] if 'documents' in include else None,
+            'metadatas': [self._metadatas[row] for row in rows] if 'metadatas' in include else None,
+            'embeddings': (
+                self._decode(np.asarray(rows, dtype=np.int64)) if 'embeddings' in include else None
+            ),
+        }
+        
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ('metadatas', 'documents')
+    ) -> Dict[str, Any]:
+        """
+        Lê documentos por id e/ou filtro, na ordem de gravação.
+        
+        Returns:
+            Dicionário no formato de collection.get do ChromaDB
+        """
+        with self._lock:
+            if ids is not None:
+                rows = [self._rows[doc_id] for doc_id in ids if doc_id in self._rows]
+                if where:
+                    mask = self._where_mask(where)
+                    rows = [row for row in rows if mask[row]]
+            else:
+                mask = self._alive_mask()
+                if where:
+                    mask &= self._where_mask(where)
+                rows = np.flatnonzero(mask).tolist()
+            
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+            return {**self._result_fields(rows, include), 'included': list(include)}
+            
+    def query(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Sequence[str] = ('metadatas', 'documents', 'distances'),
+        prefix_search: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Busca por cosseno: um produto matriz-matriz para todas as consultas e
+        seleção top-k com np.argpartition. Exata no formato float32; nos
+        quantizados, os rescore_factor x n_results melhores candidatos são
+        reordenados em precisão total (se a coleção guarda os vetores float32).
+        
+        Com prefix_search=True (e prefix_dim na coleção), a busca grossa usa os
+        prefixos e os candidatos são reordenados com os vetores completos. Sem
+        prefixos gravados, faz a busca normal.
+        
+        Returns:
+            Dicionário no formato de collection.query do ChromaDB
+            (uma lista por consulta; distâncias de cosseno, menores primeiro)
+        """
+        queries = self._normalize(query_embeddings)
+        results = {key: [] for key in ('ids', 'documents', 'metadatas', 'distances', 'embeddings')}
+        
+        with self._lock:
+            mask = self._alive_mask()
+            if where:
+                mask &= self._where_mask(where)
+            candidates = np.flatnonzero(mask)
+            k = min(n_results, len(candidates))
+            use_prefix = prefix_search and 'prefix' in self._arrays
+            rescore = use_prefix or ('full' in self._arrays and self.rescore_factor > 1)
+            n_coarse = min(len(candidates), k * self.rescore_factor) if rescore else k
+            key = 'prefix' if use_prefix else 'vectors'
+            coarse_queries = self._normalize(queries[:, :self.prefix_dim]) if use_prefix else queries
+            
+            # row_map: posição em 'scores' -> linha da coleção (None = mesma posição)
+            row_map = None
+            if k == 0:
+                scores = np.empty((len(queries), 0), dtype=np.float32)
+            elif len(candidates) < len(mask) // 4:
+                # Filtro seletivo: pontua só as linhas candidatas
+                scores = self._scores(coarse_queries, candidates, key)
+                row_map = candidates
+            else:
+                scores = self._scores(coarse_queries, key=key)
+                if len(candidates) < len(mask):
+                    scores[:, ~mask] = -np.inf
+            
+            for query, query_scores in zip(queries, scores):
+                top = self._top_k(query_scores, n_coarse)
+                rows = row_map[top] if row_map is not None else top
+                top_scores = query_scores[top]
+                
+                if rescore and len(rows):
+                    # Reordena os candidatos com os vetores completos (precisão total, se houver)
+                    top_scores = self._decode(rows) @ query
+                    order = self._top_k(top_scores, k)
+                    rows, top_scores = rows[order], top_scores[order]
+                
+                fields = self._result_fields(rows.tolist(), include)
+                results['ids'].append(fields['ids'])
+                results['documents'].append(fields['documents'])
+                results['metadatas'].append(fields['metadatas'])
+                results['embeddings'].append(fields['embeddings'])
+                results['distances'].append((1.0 - top_scores).tolist())
+        
+        for key in ('documents', 'metadatas', 'embeddings'):
+            if key not in include:
+                results[key] = None
+        if 'distances' not in include:
+            results['distances'] = None
+        results['included'] = list(include)
+        return results
+
+
+class NumpyVectorStore:
+    """Cliente com o subconjunto da API do ChromaDB usado pelo EmbeddingManager."""
+    
+    def __init__(
+        self,
+        path: str,
+        quantization: str = 'float32',
+        keep_full_precision: bool = False,
+        rescore_factor: int = 4,
+        prefix_dim: Optional[int] = None
+    ):
+        """
+        Inicializa o store.
+        
+        Args:
+            path: Diretório com uma subpasta por coleção
+            quantization: Formato das coleções criadas: 'float32', 'float16' ou 'int8'
+            keep_full_precision: Nas coleções quantizadas criadas, guarda também
+                os vetores float32 para reordenar candidatos (mais disco que o float32)
+            rescore_factor: Candidatos reordenados em precisão total por resultado
+            prefix_dim: Nas coleções criadas, guarda também prefixos com esta
+                dimensão para a busca grossa (query(prefix_search=True))
+        """
+        if quantization not in NumpyCollection.QUANTIZATIONS:
+            raise ValueError(f"quantization deve ser um de {tuple(NumpyCollection.QUANTIZATIONS)}")
+        
+        self.path = Path(path)
+        self.quantization = quantization
+        self.keep_full_precision = keep_full_precision
+        self.rescore_factor = rescore_factor
+        self.prefix_dim = prefix_dim
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+        
+    def list_collections(self) -> List[NumpyCollection]:
+        """Coleções existentes."""
+        return [
+            self.get_collection(child.name)
+            for child in sorted(self.path.iterdir())
+            if (child / "collection.json").exists()
+        ]
+        
+    def get_collection(self, name: str) -> NumpyCollection:
+        """Abre uma coleção existente (ValueError se não existir)."""
+        with self._lock:
+            if name not in self._collections:
+                if not (self.path / name / "collection.json").exists():
+                    raise ValueError(f"Coleção '{name}' não existe")
+                self._collections[name] = NumpyCollection(
+                    self.path / name, name, rescore_factor=self.rescore_factor
+                )
+            return self._collections[name]
+            
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> NumpyCollection:
+        """Cria uma coleção (ValueError se já existir)."""
+        with self._lock:
+            if (self.path / name / "collection.json").exists():
+                raise ValueError(f"Coleção '{name}' já existe")
+            self._collections[name] = NumpyCollection(
+                self.path / name,
+                name,
+                metadata,
+                quantization=self.quantization,
+                keep_full_precision=self.keep_full_precision,
+                rescore_factor=self.rescore_factor,
+                prefix_dim=self.prefix_dim
+            )
+            return self._collections[name]
+            
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None) -> NumpyCollection:
+        """Abre a coleção, criando-a se necessário."""
+        try:
+            return self.get_collection(name)
+        except ValueError:
+            return self.create_collection(name, metadata)
+            
+    def delete_collection(self, name: str):
+        """Remove uma coleção e seus arquivos (ValueError se não existir)."""
+        with self._lock:
+            path = self.path / name
+            if not (path / "collection.json").exists():
+                raise ValueError(f"Coleção '{name}' não existe")
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                collection._arrays = {}
+            shutil.rmtree(path)